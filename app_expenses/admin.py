@@ -8,10 +8,15 @@ class CurrencyAdmin(ModelAdmin):
 
 @register(FundAccount)
 class FundAccountAdmin(ModelAdmin):
-    list_display = ('user', 'name', 'balance', 'currency')
+    list_display = ('user', 'name', 'balance', 'opening_balance', 'currency')
     search_fields = ('name',)
     list_filter = ('user',)
 
+@register(BalanceCheckpoint)
+class BalanceCheckpointAdmin(ModelAdmin):
+    list_display = ('fund_account', 'date', 'balance')
+    list_filter = ('date',)
+
 @register(Category)
 class CategoryAdmin(ModelAdmin):
     list_display = ('user', 'name')
@@ -42,8 +47,23 @@ class ReportAdmin(ModelAdmin):
     search_fields = ('month', 'year', 'month_year')
     list_filter = ('user', 'year', 'is_dirty')
 
+@register(DailyRollup)
+class DailyRollupAdmin(ModelAdmin):
+    list_display = ('user', 'date', 'fund_account', 'category', 'type', 'total', 'trx_count')
+    list_filter = ('user', 'type')
+
+@register(ExportJob)
+class ExportJobAdmin(ModelAdmin):
+    list_display = ('user', 'date_from', 'date_to', 'compression', 'status', 'created_at', 'finished_at')
+    list_filter = ('user', 'status')
+
 @register(Loan)
 class LoanAdmin(ModelAdmin):
     list_display = ('user', 'type', 'from_entity', 'currency', 'amount', 'remaining_amount', 'completed', 'interest_rate', 'due_date')
     search_fields = ('from_entity', 'description')
-    list_filter = ('user', 'completed', 'type')
\ No newline at end of file
+    list_filter = ('user', 'completed', 'type')
+
+@register(DataVersion)
+class DataVersionAdmin(ModelAdmin):
+    list_display = ('key', 'version', 'updated_at')
+    search_fields = ('key',)
@@ -1,4 +1,6 @@
 from django.apps import AppConfig
+from django.core import checks
+from django.db.models.signals import post_migrate
 
 
 class AppExpensesConfig(AppConfig):
@@ -6,3 +8,10 @@ class AppExpensesConfig(AppConfig):
 
     def ready(self):
         import app_expenses.signals
+        from .auth_backends import create_user_email_constraint, check_shared_auth_caches
+        from .services.fund_account_services.balance_reconciliation import backfill_opening_balances
+        from .services.transaction_services.daily_rollup import backfill_daily_rollups
+        post_migrate.connect(create_user_email_constraint, sender=self)
+        post_migrate.connect(backfill_opening_balances, sender=self)
+        post_migrate.connect(backfill_daily_rollups, sender=self)
+        checks.register(check_shared_auth_caches)
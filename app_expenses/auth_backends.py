@@ -0,0 +1,99 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import CommandError
+from django.db import connections, models, DEFAULT_DB_ALIAS
+from django.db.models.functions import Lower
+
+User = get_user_model()
+
+# one account per email, case-insensitive; accounts without an email (e.g. createsuperuser) are left out
+USER_EMAIL_CONSTRAINT = models.UniqueConstraint(Lower('email'), condition=~models.Q(email=''), name='unique_user_email_ci')
+
+def users_by_email(email):
+    """Users with 'email', case-insensitive, looked up on the USER_EMAIL_CONSTRAINT index."""
+    # the condition is repeated, so the partial index is usable for the lookup
+    return User._default_manager.alias(email_lower=Lower('email')).filter(~models.Q(email=''), email_lower=Lower(models.Value(email)))
+
+def duplicate_user_emails(using=DEFAULT_DB_ALIAS):
+    """Emails held by more than one user, case-insensitive: {lowercased email: [usernames]}."""
+    users = User._default_manager.using(using).exclude(email='').annotate(email_lower=Lower('email'))
+    emails = users.values('email_lower').annotate(count=models.Count('pk')).filter(count__gt=1).values('email_lower')
+    duplicates = {}
+    for email, username in users.filter(email_lower__in=emails).order_by('email_lower', 'username').values_list('email_lower', 'username'):
+        duplicates.setdefault(email, []).append(username)
+    return duplicates
+
+def create_user_email_constraint(using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    post_migrate: add USER_EMAIL_CONSTRAINT to the user table, which belongs to django.contrib.auth.
+    Stops migrate with the list of users to fix while case-insensitive duplicate emails exist.
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if USER_EMAIL_CONSTRAINT.name in connection.introspection.get_constraints(cursor, User._meta.db_table):
+            return
+    duplicates = duplicate_user_emails(using)
+    if duplicates:
+        listed = '\n'.join(f"  {email}: {', '.join(usernames)}" for email, usernames in duplicates.items())
+        raise CommandError(
+            f"Cannot add the {USER_EMAIL_CONSTRAINT.name} constraint, these emails belong to more than one user "
+            f"(case-insensitive):\n{listed}\nGive these users distinct emails and run migrate again."
+        )
+    with connection.schema_editor() as schema_editor:
+        schema_editor.add_constraint(User, USER_EMAIL_CONSTRAINT)
+
+def _user_cache_key(user_id):
+    return f"auth_user:{user_id}"
+
+def forget_cached_user(user_id):
+    """Drop the user from the AUTH_USER_CACHE, called when the user row changes."""
+    if settings.AUTH_USER_CACHE:
+        caches[settings.AUTH_USER_CACHE].delete(_user_cache_key(user_id))
+
+def check_shared_auth_caches(app_configs=None, **kwargs):
+    """
+    System check: the user cache and cached sessions need a cache shared by all workers. In a
+    per-process cache the other workers keep a logged out session or a changed password.
+    """
+    aliases = {'AUTH_USER_CACHE': settings.AUTH_USER_CACHE}
+    if settings.SESSION_ENGINE in ('django.contrib.sessions.backends.cache', 'django.contrib.sessions.backends.cached_db'):
+        aliases['SESSION_CACHE_ALIAS'] = settings.SESSION_CACHE_ALIAS
+    return [
+        checks.Error(f"{setting} '{alias}' is a per-process LocMemCache.", hint="Use a cache shared by all workers (e.g. redis) or unset it.", id='app_expenses.E001')
+        for setting, alias in aliases.items() if alias and isinstance(caches[alias], LocMemCache)
+    ]
+
+class CachedUserBackend(ModelBackend):
+    """
+    ModelBackend whose get_user, run for request.user on every authenticated request, is served
+    from the AUTH_USER_CACHE when set. Saving or deleting the user drops the entry (see signals).
+    """
+    def get_user(self, user_id):
+        if not settings.AUTH_USER_CACHE:
+            return super().get_user(user_id)
+        cache = caches[settings.AUTH_USER_CACHE]
+        key = _user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
+
+class EmailBackend(CachedUserBackend):
+    """Authenticate with email and password, one indexed query."""
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if not email or password is None:
+            return None
+        user = users_by_email(email).first()
+        if user is None:
+            # hash anyway, so an unknown email takes as long as a wrong password
+            User().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
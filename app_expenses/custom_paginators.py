@@ -0,0 +1,132 @@
+import json
+import base64
+import binascii
+import uuid
+from datetime import date
+from django.db import connections
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(direction, row_date, row_id):
+    payload = json.dumps({'d': direction, 'dt': row_date.isoformat(), 'id': str(row_id)}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        direction = payload['d']
+        if direction not in ('next', 'prev'):
+            raise InvalidCursor("Invalid cursor direction.")
+        return direction, date.fromisoformat(payload['dt']), uuid.UUID(payload['id'])
+    except (ValueError, KeyError, TypeError, AttributeError, binascii.Error) as e:
+        raise InvalidCursor(str(e))
+
+
+class KeysetPage:
+    """
+    One page of a keyset paginated queryset. Exposes the same template friendly
+    helpers as django's Page (iteration, len, has_next/has_previous) plus opaque cursors.
+    """
+    def __init__(self, object_list, has_next, has_previous, paginator):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.paginator = paginator
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        last = self.object_list[-1]
+        return encode_cursor('next', last.date, last.pk)
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        first = self.object_list[0]
+        return encode_cursor('prev', first.date, first.pk)
+
+    @property
+    def approximate_total(self):
+        return self.paginator.approximate_total
+
+
+class KeysetPaginator:
+    """
+    Cursor based paginator keyed on (date, id), newest first. Every page is a single
+    indexed range scan of 'per_page + 1' rows, so the cost does not depend on how deep
+    the page is. Unlike django's Paginator no COUNT(*) is issued unless 'with_total' is set.
+    """
+    ordering = ('-date', '-id')
+
+    def __init__(self, queryset, per_page, with_total=False):
+        self.queryset = queryset.order_by(*self.ordering)
+        self.per_page = per_page
+        self.with_total = with_total
+        self._approximate_total = None
+
+    def get_page(self, cursor=None):
+        """Same contract as Paginator.get_page: an invalid cursor returns the first page."""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page(None)
+
+    def page(self, cursor=None):
+        if not cursor:
+            rows = list(self.queryset[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], len(rows) > self.per_page, False, self)
+
+        direction, row_date, row_id = decode_cursor(cursor)
+        if direction == 'next':
+            after = Q(date__lt=row_date) | Q(date=row_date, id__lt=row_id)
+            rows = list(self.queryset.filter(after)[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], len(rows) > self.per_page, True, self)
+
+        before = Q(date__gt=row_date) | Q(date=row_date, id__gt=row_id)
+        rows = list(self.queryset.filter(before).order_by('date', 'id')[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return KeysetPage(rows, True, has_previous, self)
+
+    @property
+    def approximate_total(self):
+        if not self.with_total:
+            return None
+        if self._approximate_total is None:
+            self._approximate_total = estimate_count(self.queryset)
+        return self._approximate_total
+
+
+def estimate_count(queryset):
+    """
+    PostgreSQL: planner row estimate from EXPLAIN (no table scan).
+    Other backends: fall back to an exact count.
+    """
+    if connections[queryset.db].vendor == 'postgresql':
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+    return queryset.count()
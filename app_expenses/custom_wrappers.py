@@ -1,53 +1,109 @@
+from decimal import Decimal
 from functools import wraps
 from django.db import transaction as db_transaction
+from django.db.models import F
 from django.core.exceptions import ValidationError
+from .models import identity_map
+
+def signed_amount(trx):
+    # effect of a transaction on its fund account balance
+    if trx.type == "credit":
+        return trx.amount
+    if trx.type == "debit":
+        return -trx.amount
+    return 0
+
+def add_report_delta(deltas, user_id, trx_date, trx_type, amount):
+    # accumulate a signed amount into the (credit, debit) delta of the report month
+    key = (user_id, trx_date.year, trx_date.month)
+    credit, debit = deltas.get(key, (0, 0))
+    if trx_type == "credit":
+        credit += amount
+    elif trx_type == "debit":
+        debit += amount
+    deltas[key] = (credit, debit)
+
+def add_rollup_delta(deltas, trx, sign=1):
+    # accumulate a transaction, or its removal with sign=-1, into the (amount, count) delta of its daily rollup
+    key = (trx.user_id, trx.date, trx.fund_account_id, trx.category_id, trx.type)
+    amount, count = deltas.get(key, (0, 0))
+    deltas[key] = (amount + sign * Decimal(str(trx.amount)), count + sign)
+
+def apply_balance_delta(fund_account, delta, check_balance=False):
+    """
+    Add 'delta' to the fund account balance with a single 'UPDATE ... SET balance = balance + delta'.
+    With 'check_balance' the sufficient balance condition is part of the same statement,
+    so concurrent writers can neither lose an update nor overdraw the account.
+    """
+    if not delta:
+        return
+    fund_accounts = fund_account.__class__.objects.filter(pk=fund_account.pk)
+    if check_balance and delta < 0:
+        fund_accounts = fund_accounts.filter(balance__gte=-delta)
+    if not fund_accounts.update(balance=F('balance') + delta):
+        raise ValidationError({'amount': 'Insufficient Balance'})
+    fund_account.refresh_from_db(fields=['balance'])
+    # the copy loaded earlier in the request shows the new balance too
+    mapped = identity_map.get(fund_account.__class__, fund_account.pk)
+    if mapped is not None and mapped is not fund_account:
+        mapped.balance = fund_account.balance
+
+def shift_balance_checkpoints(fund_account, from_date, delta):
+    # a transaction dated 'from_date' changes every closing balance from that day on
+    if delta:
+        fund_account.balance_checkpoints.filter(date__gte=from_date).update(balance=F('balance') + delta)
 
 def balance_updater(func):
     """
     Decorator to ensure fund account balances are updated atomically
     when a transaction is created or updated.
-    
+
     Works for both model methods and DRF serializer methods.
     """
     @wraps(func)
     def wrapper(self, *args, **kwargs):
-        with db_transaction.atomic():
-            # Capture old state BEFORE saving 
+        # no savepoint of its own: save_obj takes one where a rejected write must leave the caller's transaction usable
+        with db_transaction.atomic(savepoint=False):
+            # Capture old state BEFORE saving, locked so concurrent updates of this row apply in turn.
+            # Shared with the save signals as 'previous_state', so the row is read once per save.
+            # A row loaded with Transaction.get_for_update is locked already and its read state is reused.
             is_update = not self._state.adding
             old_trx = None
             if is_update:
-                old_trx = self.__class__.objects.get(pk=self.pk)
+                old_trx = self.__dict__.pop('_stored_state', None)
+                if old_trx is None:
+                    old_trx = self.__class__.objects.select_related('fund_account').select_for_update(of=('self',)).get(pk=self.pk)
+                if old_trx.fund_account_id == self.fund_account_id and not self._meta.get_field('fund_account').is_cached(self):
+                    # same account, reuse the one joined above instead of loading it again
+                    self.fund_account = old_trx.fund_account
+            self.previous_state = old_trx
 
-            # Call the original function (save/create/update) 
+            # Call the original function (save/create/update)
             trx = func(self, *args, **kwargs)
             if trx is None: # model.save() returns None and serailizer.save() returns instance
                 trx = self
 
             latest_fund_acct = trx.fund_account
+            delta = signed_amount(trx)
+            checkpoint_delta = delta
 
             # Handle update case
-            if is_update and old_trx:
-                if old_trx.fund_account.pk != latest_fund_acct.pk:
+            if is_update and old_trx and old_trx.fund_account_id:
+                old_delta = signed_amount(old_trx)
+                if old_trx.fund_account_id != latest_fund_acct.pk:
                     # Fund account changed → revert old balance
-                    if old_trx.type == "credit":
-                        old_trx.fund_account.balance -= old_trx.amount
-                    elif old_trx.type == "debit":
-                        old_trx.fund_account.balance += old_trx.amount
-                    old_trx.fund_account.save(update_fields=["balance"])
+                    apply_balance_delta(old_trx.fund_account, -old_delta)
+                    shift_balance_checkpoints(old_trx.fund_account, old_trx.date, -old_delta)
                 else:
-                    # Same fund account → adjust old amount
-                    if old_trx.type == "credit":
-                        latest_fund_acct.balance -= old_trx.amount
-                    elif old_trx.type == "debit":
-                        latest_fund_acct.balance += old_trx.amount
-
-            # Apply new balance
-            if trx.type == "credit":
-                latest_fund_acct.balance += trx.amount
-            elif trx.type == "debit":
-                if latest_fund_acct.balance < trx.amount:
-                    raise ValidationError({'amount': 'Insufficient Balance'})
-                latest_fund_acct.balance -= trx.amount
-            latest_fund_acct.save(update_fields=["balance"])
+                    # Same fund account → apply only the difference
+                    delta -= old_delta
+                    if old_trx.date != trx.date:
+                        shift_balance_checkpoints(old_trx.fund_account, old_trx.date, -old_delta)
+                    else:
+                        checkpoint_delta -= old_delta
+
+            # Apply new balance, debit must not overdraw the account
+            apply_balance_delta(latest_fund_acct, delta, check_balance=(trx.type == "debit"))
+            shift_balance_checkpoints(latest_fund_acct, trx.date, checkpoint_delta)
             return trx
-    return wrapper
\ No newline at end of file
+    return wrapper
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from ...models import FundAccount
+from ...services.fund_account_services.balance_history import build_balance_checkpoints
+
+class Command(BaseCommand):
+    help = "Rebuild month end balance checkpoints of every fund account (run monthly, e.g. from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help="Only rebuild the fund accounts of this user.")
+
+    def handle(self, *args, **options):
+        fund_accounts = FundAccount.objects.all()
+        if options['username']:
+            fund_accounts = fund_accounts.filter(user__username=options['username'])
+        total_accounts = total_checkpoints = 0
+        for fund_account in fund_accounts.iterator():
+            total_checkpoints += len(build_balance_checkpoints(fund_account))
+            total_accounts += 1
+        self.stdout.write(self.style.SUCCESS(f"Built {total_checkpoints} checkpoints for {total_accounts} fund accounts."))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from ...services.export_services.export_jobs import cleanup_exports
+
+class Command(BaseCommand):
+    help = "Fail lapsed export jobs and delete the files of expired and failed exports (e.g. from cron, or on startup with --orphaned)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orphaned', action='store_true', help="Fail every pending and running job, only while no web worker is running exports.")
+
+    def handle(self, *args, **options):
+        failed, deleted = cleanup_exports(orphaned=options['orphaned'])
+        self.stdout.write(self.style.SUCCESS(f"Failed {failed} export jobs, deleted {deleted} export files."))
@@ -0,0 +1,62 @@
+import csv
+from django.core.management.base import BaseCommand, CommandError
+from django.core.exceptions import ValidationError
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from ...models import Tag
+from ...services.transaction_services.bulk_import import import_transactions, DEFAULT_BATCH_SIZE
+
+TAG_SEPARATOR = '|'
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import transactions for a user from a CSV file with the monthly report columns "
+        "(amount, type, date, fund_account_id, category_id, description, tags). "
+        f"Tags are tag names separated by '{TAG_SEPARATOR}'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file')
+        parser.add_argument('--username', required=True)
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User '{options['username']}' does not exists.")
+
+        tag_ids = {}
+        for tag in Tag.objects.filter(Q(user=user) | Q(user=None)):
+            # user's own tag wins over a predefined one with the same name
+            if tag.user_id or tag.name.lower() not in tag_ids:
+                tag_ids[tag.name.lower()] = str(tag.pk)
+
+        def rows(reader):
+            for row_number, row in enumerate(reader, start=1):
+                tag_names = [name.strip().lower() for name in (row.get('tags') or '').split(TAG_SEPARATOR) if name.strip()]
+                unknown = [name for name in tag_names if name not in tag_ids]
+                if unknown:
+                    raise CommandError(f"Row {row_number}: unknown tags {', '.join(unknown)}.")
+                yield {
+                    'fund_account': row.get('fund_account_id'),
+                    'category': row.get('category_id'),
+                    'amount': row.get('amount'),
+                    'type': row.get('type'),
+                    'date': row.get('date'),
+                    'description': row.get('description'),
+                    'tags': [tag_ids[name] for name in tag_names],
+                }
+
+        try:
+            with open(options['csv_file'], newline='', encoding='utf-8') as csv_file:
+                result = import_transactions(user, rows(csv.DictReader(csv_file)), batch_size=options['batch_size'])
+        except OSError as e:
+            raise CommandError(str(e))
+        except ValidationError as e:
+            raise CommandError("\n".join(e.messages))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['created']} transactions into {len(result['balance_deltas'])} fund accounts, "
+            f"{result['dirty_reports']} reports marked dirty."
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from ...services.transaction_services.daily_rollup import rebuild_daily_rollups
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily rollup table from transactions, one database transaction per chunk of users. "
+        "migrate builds the rollups of users that have none; run this whenever rollups are suspected to be out of sync."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help="Only rebuild the rollups of this user.")
+        parser.add_argument('--chunk-size', type=int, default=500, help="Users rebuilt per database transaction.")
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by('pk')
+        if options['username']:
+            users = users.filter(username=options['username'])
+        user_ids = list(users.values_list('pk', flat=True))
+        chunk_size = options['chunk_size']
+        total_rows = 0
+        for i in range(0, len(user_ids), chunk_size):
+            total_rows += rebuild_daily_rollups(user_ids[i:i + chunk_size])
+        self.stdout.write(self.style.SUCCESS(f"Built {total_rows} daily rollups for {len(user_ids)} users."))
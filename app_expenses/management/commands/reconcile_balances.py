@@ -0,0 +1,57 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from ...models import FundAccount
+from ...services.fund_account_services.balance_reconciliation import reconcile_users
+
+def _init_worker():
+    import django
+    django.setup()
+    # never share the parent's DB connections with a child process
+    connections.close_all()
+
+def _reconcile_chunk(user_ids, mode):
+    return reconcile_users(user_ids, mode=mode)
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every fund account balance as opening_balance + credits - debits and report the drift "
+        "as JSON lines (one per drifted account, then a summary). Dry run unless --fix or --adopt-balances is given."
+    )
+
+    def add_arguments(self, parser):
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument(
+            '--fix', dest='mode', action='store_const', const='fix',
+            help="Write the expected balance. Accounts without an opening balance are reported but left alone."
+        )
+        mode.add_argument(
+            '--adopt-balances', dest='mode', action='store_const', const='adopt',
+            help="Keep the stored balances and move the drift into opening_balance, setting it where it was never set."
+        )
+        parser.add_argument('--chunk-size', type=int, default=500, help="Users reconciled per grouped query.")
+        parser.add_argument('--workers', type=int, default=1, help="Processes to spread the chunks over.")
+
+    def handle(self, *args, **options):
+        user_ids = list(FundAccount.objects.order_by('user_id').values_list('user_id', flat=True).distinct())
+        chunk_size = options['chunk_size']
+        chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+
+        if options['workers'] > 1 and len(chunks) > 1:
+            # the parent's connection must not be inherited by the forked workers
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+                results = list(pool.map(_reconcile_chunk, chunks, [options['mode']] * len(chunks)))
+        else:
+            results = [_reconcile_chunk(chunk, options['mode']) for chunk in chunks]
+
+        summary = {'mode': options['mode'] or 'dry_run', 'checked_users': 0, 'drifted': 0, 'fixed': 0}
+        for result in results:
+            summary['checked_users'] += result['checked_users']
+            for row in result['drifted']:
+                summary['drifted'] += 1
+                summary['fixed'] += row['fixed']
+                self.stdout.write(json.dumps(row, cls=DjangoJSONEncoder))
+        self.stdout.write(json.dumps({'summary': summary}))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from ...models import Report
+from ...services.report_services.report_refresh import refresh_dirty_reports, DEFAULT_CHUNK_SIZE
+
+class Command(BaseCommand):
+    help = "Recompute the totals of every dirty report in chunks (e.g. after a large import)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help="Only refresh the reports of this user.")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Reports refreshed per database transaction.")
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['username']:
+            user_ids = Report.objects.filter(user__username=options['username']).values('user_id')
+        refreshed = refresh_dirty_reports(chunk_size=options['chunk_size'], user_ids=user_ids)
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {refreshed} reports."))
@@ -0,0 +1,11 @@
+from .models.identity_map import identity_map_scope
+
+
+class IdentityMapMiddleware:
+    """Objects looked up by primary key are loaded at most once per request."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with identity_map_scope():
+            return self.get_response(request)
@@ -1,9 +1,15 @@
-from .owned_model import OwnedModel
+from .data_version_model import DataVersion
+from .owned_model import OwnedModel, OwnedQuerySet
 from .currency_model import Currency
 from .fund_account_model import FundAccount
+from .balance_checkpoint_model import BalanceCheckpoint
 from .category_model import Category
 from .tag_model import Tag
 from .transaction_model import Transaction,  TransactionType
 from .shortcut_model import Shortcut
 from .report_model import Report
+from .daily_rollup_model import DailyRollup
+from .catalog import catalog
+from . import identity_map
+from .export_job_model import ExportJob, ExportStatus, ExportCompression
 from .loan_model import Loan, LoanType
\ No newline at end of file
@@ -0,0 +1,23 @@
+import uuid
+from django.db import models
+from .fund_account_model import FundAccount
+
+class BalanceCheckpoint(models.Model):
+    """
+    Closing balance of a fund account at the end of 'date' (always a month end).
+    Kept in sync by 'balance_updater' and FundAccount.correct_balance, built by the 'build_balance_checkpoints'
+    command and, for a month end still missing, by 'balance_as_of'.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    fund_account = models.ForeignKey(FundAccount, on_delete=models.CASCADE, related_name='balance_checkpoints')
+    date = models.DateField()
+    balance = models.DecimalField(max_digits=16, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['fund_account', 'date'], name='unique_checkpoint_per_fund_account'),
+        ]
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.fund_account} - {self.date}"
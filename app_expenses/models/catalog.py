@@ -0,0 +1,69 @@
+import time
+import threading
+from types import MappingProxyType
+from typing import NamedTuple
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from .data_version_model import DataVersion
+
+
+class CatalogData(NamedTuple):
+    currencies: MappingProxyType             # id -> Currency
+    predefined_categories: MappingProxyType  # lower case name -> Category
+    predefined_tags: MappingProxyType        # lower case name -> Tag
+
+class Catalog:
+    """
+    Currencies and predefined (user=NULL) categories and tags, loaded once per worker and
+    served from memory. The 'catalog' data version is checked at most every
+    CATALOG_CHECK_INTERVAL seconds, so an edit made by another worker is picked up within it
+    (a rolled back edit leaves the version behind too).
+    Loaded rows are shared between threads and must not be modified.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def invalidate(self):
+        # this worker's own edits are seen right away
+        self._data = None
+
+    def _load(self):
+        Currency = apps.get_model('app_expenses', 'Currency')
+        Category = apps.get_model('app_expenses', 'Category')
+        Tag = apps.get_model('app_expenses', 'Tag')
+        return CatalogData(
+            currencies=MappingProxyType({currency.id: currency for currency in Currency.objects.order_by('id')}),
+            predefined_categories=MappingProxyType({category.name.lower(): category for category in Category.objects.filter(user=None).order_by('name')}),
+            predefined_tags=MappingProxyType({tag.name.lower(): tag for tag in Tag.objects.filter(user=None).order_by('name')}),
+        )
+
+    def data(self):
+        data, now = self._data, time.monotonic()
+        # inside a transaction the version is always checked, rows loaded there may still be rolled back
+        if data is not None and not connection.in_atomic_block and now - self._checked_at < settings.CATALOG_CHECK_INTERVAL:
+            return data
+        with self._lock:
+            # read before loading, a change committed in between is reloaded on the next check
+            version = DataVersion.objects.current(DataVersion.CATALOG_KEY)[0]
+            if self._data is None or version != self._version:
+                self._data, self._version = self._load(), version
+            self._checked_at = now
+            return self._data
+
+    def currency_list(self):
+        return tuple(self.data().currencies.values())
+
+    def get_currency(self, id):
+        return self.data().currencies.get(id)
+
+    def get_predefined_category(self, name):
+        return self.data().predefined_categories.get(name.strip().lower())
+
+    def get_predefined_tag(self, name):
+        return self.data().predefined_tags.get(name.strip().lower())
+
+catalog = Catalog()
@@ -4,12 +4,18 @@ from django.db.models.functions import Lower
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from .owned_model import OwnedModel
+from .catalog import catalog
 
 class Category(OwnedModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, blank=True, null=True, on_delete=models.CASCADE, related_name='categories')
     name = models.CharField(max_length=120)
 
+    constraint_first = True
+    constraint_error_messages = {
+        'unique_category_per_user': ('name', "Category with Name: '{self.name}' already exists."),
+    }
+
     class Meta:
         constraints = [
             models.UniqueConstraint(Lower('name'), 'user', name='unique_category_per_user'),
@@ -26,10 +32,15 @@ class Category(OwnedModel):
         if not self.name.strip():
             raise ValidationError({"name": "Name cannot be blank or whitespace."})
         # validate uniqueness
-        if Category.objects.filter(user=None, name__iexact=self.name.strip()).exclude(pk=self.pk).exists():
+        predefined = catalog.get_predefined_category(self.name)
+        if predefined is not None and predefined.pk != self.pk:
             raise ValidationError({"name": f"Predefined category with Name: '{self.name}' already exists."})
-        if Category.objects.filter(user=self.user, name__iexact=self.name.strip()).exclude(pk=self.pk).exists():
-            raise ValidationError({"name": f"Category with Name: '{self.name}' already exists."})        
+
+    def validate_unique(self, exclude=None):
+        super().validate_unique(exclude)
+        # skipped by a constraint-first save_obj
+        if 'name' not in (exclude or ()) and Category.objects.filter(user=self.user_id, name__iexact=self.name.strip()).exclude(pk=self.pk).exists():
+            raise self.constraint_error('unique_category_per_user')
 
     def save(self, *args, **kwargs):
         self.name = self.name.strip()
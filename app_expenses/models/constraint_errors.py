@@ -0,0 +1,34 @@
+import re
+from django.db import models
+
+# SQLite names a violated check constraint or expression index, for a unique constraint on columns the columns
+_SQLITE_VIOLATION = re.compile(r"(?:UNIQUE|CHECK) constraint failed: (?:index '(?P<name>[^']+)'|(?P<columns>.+))")
+# PostgreSQL names the constraint in the error diagnostics, the detail lists the key columns
+_POSTGRES_KEY = re.compile(r"Key \((?P<columns>[^)]+)\)=")
+
+def _column_set(columns):
+    # "app_expenses_report.user_id, app_expenses_report.year" or "user_id, year"
+    return {column.strip().rsplit('.', 1)[-1].strip('"') for column in columns.split(',')}
+
+def violated_constraint(model, error):
+    """
+    The constraint in the Meta of 'model' that an IntegrityError from SQLite or PostgreSQL
+    reports as violated, None when the error names none of them.
+    """
+    diag = getattr(error.__cause__, 'diag', None)
+    if diag is not None:
+        name = diag.constraint_name
+        match = _POSTGRES_KEY.match(diag.message_detail or '')
+    else:
+        match = _SQLITE_VIOLATION.search(str(error))
+        name = match and (match['name'] or match['columns'])
+    for constraint in model._meta.constraints:
+        if constraint.name == name:
+            return constraint
+    if match and match['columns']:
+        columns = _column_set(match['columns'])
+        for constraint in model._meta.constraints:
+            if isinstance(constraint, models.UniqueConstraint) and constraint.fields and \
+                    {model._meta.get_field(field).column for field in constraint.fields} == columns:
+                return constraint
+    return None
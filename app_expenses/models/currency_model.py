@@ -8,12 +8,10 @@ class Currency(models.Model):
     name = models.CharField(max_length=64)
 
     class Meta:
+        # each on its own, as validate_unique checks them
         constraints = [
-            models.UniqueConstraint(
-                Lower('name'),
-                Lower('symbol'),
-                name='unique_currency_name_symbol_ci'
-            )
+            models.UniqueConstraint(Lower('symbol'), name='unique_currency_symbol_ci'),
+            models.UniqueConstraint(Lower('name'), name='unique_currency_name_ci'),
         ]
     
     def clean(self):
@@ -33,11 +31,14 @@ class Currency(models.Model):
             raise ValidationError({"name": "Name is required."})
         if not self.name.strip():
             raise ValidationError({"name": "Name cannot be blank or whitespace."})
-        # validate uniqueness
-        if Currency.objects.filter(symbol__iexact=self.symbol.strip()).exclude(pk=self.pk).exists():
+
+    def validate_unique(self, exclude=None):
+        super().validate_unique(exclude)
+        exclude = exclude or ()
+        if 'symbol' not in exclude and Currency.objects.filter(symbol__iexact=self.symbol.strip()).exclude(pk=self.pk).exists():
             raise ValidationError({"symbol": f"Currency with Symbol: '{self.symbol}' already exists."})
-        if Currency.objects.filter(name__iexact=self.name.strip()).exclude(pk=self.pk).exists():
-            raise ValidationError({"symbol": f"Currency with Name: '{self.name}' already exists."})
+        if 'name' not in exclude and Currency.objects.filter(name__iexact=self.name.strip()).exclude(pk=self.pk).exists():
+            raise ValidationError({"name": f"Currency with Name: '{self.name}' already exists."})
     
     def save(self, *args, **kwargs):
         self.id = self.id.strip().upper()
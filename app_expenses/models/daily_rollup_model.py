@@ -0,0 +1,92 @@
+import uuid
+from django.db import models, IntegrityError, transaction as db_transaction
+from django.contrib.auth.models import User
+from .fund_account_model import FundAccount
+from .category_model import Category
+
+ROLLUP_KEY = ('user_id', 'date', 'fund_account_id', 'category_id', 'type')
+
+def rollup_key(row):
+    return tuple(getattr(row, field) for field in ROLLUP_KEY)
+
+class DailyRollupQuerySet(models.QuerySet):
+    def apply_deltas(self, deltas):
+        """
+        Add (amount, trx_count) deltas to the rollup rows of their keys, creating missing rows.
+        'deltas' maps (user_id, date, fund_account_id, category_id, type) to (amount_delta, trx_count_delta).
+        Existing rows are incremented by one UPDATE; only when some keys have no row yet are they read and inserted.
+        """
+        deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+        if not deltas:
+            return
+        rows, amount_cases, count_cases = models.Q(), [], []
+        for key, (amount, count) in deltas.items():
+            row = models.Q(**dict(zip(ROLLUP_KEY, key)))
+            rows |= row
+            amount_cases.append(models.When(row, then=models.Value(amount)))
+            count_cases.append(models.When(row, then=models.Value(count)))
+        updated = self.filter(rows).update(
+            total=models.F('total') + models.Case(*amount_cases, default=models.Value(0), output_field=models.DecimalField(max_digits=16, decimal_places=2)),
+            trx_count=models.F('trx_count') + models.Case(*count_cases, default=models.Value(0), output_field=models.IntegerField()),
+        )
+        if updated == len(deltas):
+            return
+        existing = set(self.filter(rows).values_list(*ROLLUP_KEY))
+        to_create = [
+            DailyRollup(**dict(zip(ROLLUP_KEY, key)), total=amount, trx_count=count)
+            for key, (amount, count) in deltas.items()
+            # nothing to remove from: rows not built yet, or already deleted along with their user
+            if key not in existing and count > 0
+        ]
+        if to_create:
+            try:
+                with db_transaction.atomic():
+                    self.bulk_create(to_create)
+            except IntegrityError:
+                # a concurrent save created some of these rows first, add to them instead
+                self.apply_deltas({rollup_key(row): deltas[rollup_key(row)] for row in to_create})
+
+    def detach(self, **relation):
+        """
+        Fold the rows of a fund account or category that is being deleted into the rows without one,
+        the same way its transactions are set to NULL. e.g. detach(fund_account=fund_account)
+        """
+        (field, _), = relation.items()
+        rows = self.filter(**relation)
+        deltas = {}
+        for row in rows.values(*ROLLUP_KEY, 'total', 'trx_count'):
+            row[f"{field}_id"] = None
+            key = tuple(row[name] for name in ROLLUP_KEY)
+            amount, count = deltas.get(key, (0, 0))
+            deltas[key] = (amount + row['total'], count + row['trx_count'])
+        rows.delete()
+        self.apply_deltas(deltas)
+
+class DailyRollup(models.Model):
+    """
+    Sum and count of a user's transactions per (date, fund account, category, type).
+    Kept in sync by the transaction signals, rebuilt by the 'rebuild_daily_rollups' command.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_rollups')
+    date = models.DateField()
+    # rows are moved to NULL before their fund account or category is deleted (see DailyRollupQuerySet.detach)
+    fund_account = models.ForeignKey(FundAccount, null=True, blank=True, on_delete=models.DO_NOTHING, related_name='daily_rollups')
+    category = models.ForeignKey(Category, null=True, blank=True, on_delete=models.DO_NOTHING, related_name='daily_rollups')
+    type = models.CharField(max_length=6)
+    total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    trx_count = models.IntegerField(default=0)
+
+    objects = DailyRollupQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date', 'fund_account', 'category', 'type'], name='unique_daily_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'date'], name='rollup_user_date_idx'),
+        ]
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.user} - {self.date} - {self.type}"
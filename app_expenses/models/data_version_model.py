@@ -0,0 +1,62 @@
+from django.db import models
+from django.utils import timezone
+
+
+class DataVersionQuerySet(models.QuerySet):
+    def bump(self, keys):
+        """
+        Increment the version of every key in 'keys' with one UPDATE, creating the missing rows first.
+        Runs in the writing DB transaction, so a new version is never visible before the data behind it.
+        """
+        keys = set(keys)
+        if not keys:
+            return
+        now = timezone.now()
+        updated = self.filter(key__in=keys).update(version=models.F('version') + 1, updated_at=now)
+        if updated == len(keys):
+            return
+        missing = keys - set(self.filter(key__in=keys).values_list('key', flat=True))
+        # created at 0 and then bumped, so a row created concurrently is still incremented by this writer
+        self.bulk_create([DataVersion(key=key, version=0, updated_at=now) for key in missing], ignore_conflicts=True)
+        self.filter(key__in=missing).update(version=models.F('version') + 1, updated_at=now)
+
+    def bump_users(self, user_ids):
+        self.bump(DataVersion.user_key(user_id) for user_id in user_ids if user_id)
+
+    def current(self, key):
+        """(version, updated_at) of 'key', (0, None) before its first bump."""
+        return self.filter(key=key).values_list('version', 'updated_at').first() or (0, None)
+
+    def current_versions(self, keys):
+        """Version of every key in 'keys' and the latest updated_at among them (None before any bump), with one query."""
+        rows = list(self.filter(key__in=keys).values_list('key', 'version', 'updated_at'))
+        versions = dict.fromkeys(keys, 0)
+        versions.update((key, version) for key, version, updated_at in rows)
+        return versions, max((updated_at for key, version, updated_at in rows), default=None)
+
+    def versions(self, keys):
+        """Version of every key in 'keys' with one query, 0 before its first bump."""
+        versions = dict.fromkeys(keys, 0)
+        versions.update(self.filter(key__in=keys).values_list('key', 'version'))
+        return versions
+
+class DataVersion(models.Model):
+    # e.g. 'user:<id>' for everything a user owns
+    CATALOG_KEY = 'catalog' # currencies, predefined categories and tags
+    key = models.CharField(max_length=64, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    objects = DataVersionQuerySet.as_manager()
+
+    @staticmethod
+    def user_key(user_id):
+        return f"user:{user_id}"
+
+    @staticmethod
+    def options_key(user_id):
+        # fund accounts, categories and tags only, transactions do not change it
+        return f"options:{user_id}"
+
+    def __str__(self):
+        return f"{self.key} - {self.version}"
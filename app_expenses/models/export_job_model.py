@@ -0,0 +1,112 @@
+import uuid
+import calendar
+from datetime import date, timedelta
+from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from .owned_model import OwnedModel, OwnedQuerySet
+from ..custom_validators import validate_date
+
+
+class ExportStatus(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+        EXPIRED = 'expired', 'Expired'
+
+class ExportCompression(models.TextChoices):
+        NONE = 'none', 'CSV'
+        GZIP = 'gzip', 'CSV (gzip)'
+        ZIP = 'zip', 'CSV (zip)'
+
+EXPORT_FILE_SUFFIX = {
+    ExportCompression.NONE: '.csv',
+    ExportCompression.GZIP: '.csv.gz',
+    ExportCompression.ZIP: '.zip',
+}
+
+# an export with one of these statuses is reused for an identical request
+ACTIVE_EXPORT_STATUSES = (ExportStatus.PENDING, ExportStatus.RUNNING, ExportStatus.DONE)
+
+class ExportJobQuerySet(OwnedQuerySet):
+    def expire_months(self, months):
+        """
+        Expire finished (or running) exports overlapping any of 'months', (user_id, year, month) keys,
+        in a single UPDATE. Pending jobs have not read anything yet and are left alone.
+        """
+        if not months:
+            return 0
+        overlaps = models.Q()
+        for user_id, year, month in months:
+            last_day = date(year, month, calendar.monthrange(year, month)[1])
+            overlaps |= models.Q(user_id=user_id, date_from__lte=last_day, date_to__gte=date(year, month, 1))
+        return self.filter(overlaps, status__in=[ExportStatus.RUNNING, ExportStatus.DONE]).update(status=ExportStatus.EXPIRED)
+
+    def lapsed(self, timeout):
+        """
+        Pending or running jobs older than 'timeout' seconds (running ones counted from their start).
+        The worker pool lives in the web process, so such a job was lost to a restart or crash.
+        """
+        cutoff = timezone.now() - timedelta(seconds=timeout)
+        return self.alias(leased_from=Coalesce('started_at', 'created_at')).filter(
+            status__in=[ExportStatus.PENDING, ExportStatus.RUNNING], leased_from__lt=cutoff
+        )
+
+    def fail_active(self, error):
+        """Mark the pending and running jobs failed with 'error', so an identical request replaces them."""
+        return self.filter(status__in=[ExportStatus.PENDING, ExportStatus.RUNNING]).update(
+            status=ExportStatus.FAILED, error=error, finished_at=timezone.now()
+        )
+
+    def expire_users(self, user_ids):
+        """Expire every finished (or running) export of 'user_ids', e.g. after a fund account is renamed."""
+        return self.filter(user_id__in=user_ids, status__in=[ExportStatus.RUNNING, ExportStatus.DONE]).update(status=ExportStatus.EXPIRED)
+
+class ExportJob(OwnedModel):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='export_jobs')
+    date_from = models.DateField(validators=[validate_date])
+    date_to = models.DateField(validators=[validate_date])
+    compression = models.CharField(max_length=4, choices=ExportCompression.choices, default=ExportCompression.NONE)
+    status = models.CharField(max_length=7, choices=ExportStatus.choices, default=ExportStatus.PENDING)
+    # relative to settings.EXPORT_ROOT
+    file_path = models.CharField(max_length=255, blank=True, default='')
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    objects = ExportJobQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(condition=models.Q(date_from__lte=models.F('date_to')), name='export_valid_date_range'),
+            models.UniqueConstraint(
+                fields=['user', 'date_from', 'date_to', 'compression'],
+                condition=models.Q(status__in=ACTIVE_EXPORT_STATUSES),
+                name='unique_active_export'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'status'], name='export_user_status_idx'),
+        ]
+        ordering = ['-created_at']
+
+    @property
+    def filename(self):
+        return f"transactions_{self.date_from}_{self.date_to}{EXPORT_FILE_SUFFIX[self.compression]}"
+
+    def clean(self):
+        super().clean()
+        # validate user
+        if not self.user_id:
+            raise ValidationError({"user": "User does not exists."})
+        # validate date range
+        if isinstance(self.date_from, date) and isinstance(self.date_to, date) and self.date_from > self.date_to:
+            raise ValidationError({"date_to": "End date cannot be before start date."})
+
+    def __str__(self):
+        return f"{self.user} - {self.date_from} to {self.date_to} ({self.status})"
@@ -1,5 +1,7 @@
 import uuid
+from decimal import Decimal
 from django.db import models
+from django.db.models import F
 from django.db.models.functions import Lower
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
@@ -12,8 +14,16 @@ class FundAccount(OwnedModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='fund_accounts')
     name = models.CharField(max_length=120)
     balance = models.DecimalField(max_digits=14, decimal_places=2, default=0, validators=[MinValueValidator(0)])
+    # balance not explained by transactions: the initial balance plus corrections made with correct_balance.
+    # None for accounts created before it existed, until backfill_opening_balances has run
+    opening_balance = models.DecimalField(max_digits=14, decimal_places=2, blank=True, null=True, default=None)
     currency = models.ForeignKey(Currency, on_delete=models.PROTECT)
 
+    constraint_first = True
+    constraint_error_messages = {
+        'unique_fund_account_per_user': ('name', "Fund account with Name: '{self.name}' already exists."),
+    }
+
     class Meta:
         constraints = [
             models.UniqueConstraint(Lower('name'), 'user', name='unique_fund_account_per_user'),
@@ -32,12 +42,42 @@ class FundAccount(OwnedModel):
         # validate currency
         if not self.currency_id:
             raise ValidationError({"currency": "Currency does not exists."})
-        # validate uniqueness
-        if FundAccount.objects.filter(user=self.user, name__iexact=self.name.strip()).exclude(pk=self.pk).exists():
-            raise ValidationError({"name": f"Fund account with Name: '{self.name}' already exists."})        
+
+    def validate_unique(self, exclude=None):
+        super().validate_unique(exclude)
+        # skipped by a constraint-first save_obj
+        if 'name' not in (exclude or ()) and FundAccount.objects.filter(user=self.user_id, name__iexact=self.name.strip()).exclude(pk=self.pk).exists():
+            raise self.constraint_error('unique_fund_account_per_user')
     
+    def correct_balance(self, balance):
+        """
+        Set the balance by hand (the update form): the difference to the loaded balance is a correction of
+        the opening balance, saved with the next update_by. Any other write to 'balance' is reported as drift
+        by reconcile_balances.
+        """
+        try:
+            balance = self._meta.get_field('balance').to_python(balance)
+        except ValidationError as e:
+            raise ValidationError({"balance": e.messages})
+        if balance is None:
+            raise ValidationError({"balance": "Balance is required."})
+        correction = balance - Decimal(str(self.balance))
+        if correction and self.opening_balance is not None:
+            self.opening_balance += correction
+        self.balance = balance
+        # every closing balance moves with it, see save_related
+        self._balance_correction = correction
+
+    def save_related(self, created):
+        correction = getattr(self, '_balance_correction', None)
+        if correction and not created:
+            self.balance_checkpoints.update(balance=F('balance') + correction)
+        self._balance_correction = None
+
     def save(self, *args, **kwargs):
         self.name = self.name.strip()
+        if self._state.adding and self.opening_balance is None:
+            self.opening_balance = self.balance
         super().save(*args, **kwargs)
 
     def __str__(self):
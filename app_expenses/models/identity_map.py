@@ -0,0 +1,45 @@
+import contextvars
+from contextlib import contextmanager
+
+_identity_map = contextvars.ContextVar('identity_map', default=None)
+
+@contextmanager
+def identity_map_scope():
+    """
+    Share every object loaded by primary key inside the block, so it is read from the
+    database once (IdentityMapMiddleware opens one per request). Outside of a scope
+    nothing is kept and every lookup queries.
+    """
+    token = _identity_map.set({})
+    try:
+        yield
+    finally:
+        _identity_map.reset(token)
+
+def _key(model, pk):
+    # raises ValidationError for a malformed pk, like a query with it would
+    return (model._meta.concrete_model._meta.label_lower, model._meta.pk.to_python(pk))
+
+def get(model, pk):
+    objects = _identity_map.get()
+    if objects is None:
+        return None
+    return objects.get(_key(model, pk))
+
+def add(obj):
+    objects = _identity_map.get()
+    if objects is not None and obj.pk is not None:
+        objects[_key(type(obj), obj.pk)] = obj
+    return obj
+
+def discard(model, pk):
+    objects = _identity_map.get()
+    if objects is not None and pk is not None:
+        objects.pop(_key(model, pk), None)
+
+def get_by_pk(model, pk):
+    """The object with 'pk', loaded and kept on the first lookup. Raises model.DoesNotExist."""
+    obj = get(model, pk)
+    if obj is None:
+        obj = add(model.objects.get(pk=pk))
+    return obj
@@ -1,5 +1,17 @@
-from django.db import models
-from django.core.exceptions import PermissionDenied
+from django.db import models, IntegrityError, transaction as db_transaction
+from django.core.exceptions import PermissionDenied, ValidationError
+from .data_version_model import DataVersion
+from .constraint_errors import violated_constraint
+from . import identity_map
+
+class OwnedQuerySet(models.QuerySet):
+    def for_user(self, user, include_predefined=False):
+        """Rows owned by 'user' (and the predefined ones), the ownership check is part of the query."""
+        owner_field_name = self.model.owner_field_name
+        owned = models.Q(**{owner_field_name: user})
+        if include_predefined:
+            owned |= models.Q(**{f"{owner_field_name}__isnull": True})
+        return self.filter(owned)
 
 class OwnedModel(models.Model):
     """
@@ -7,6 +19,15 @@ class OwnedModel(models.Model):
     ownership and perform save/update/create operations that validate owner at runtime.
     """
     owner_field_name = 'user'
+    # True when the model's own signals bump the owner's data version
+    bumps_data_version_in_signals = False
+    # constraint name -> (field, message), '{self.<field>}' in the message is filled from the object
+    constraint_error_messages = {}
+    # True when save_obj leaves uniqueness to the database constraints: no pre-check queries,
+    # a rejected row raises the same ValidationError the pre-checks raise
+    constraint_first = False
+
+    objects = OwnedQuerySet.as_manager()
 
     class Meta:
         abstract = True
@@ -15,33 +36,106 @@ class OwnedModel(models.Model):
     def owner(self):
         return getattr(self, self.owner_field_name, None)
 
+    @property
+    def owner_id(self):
+        # reads the FK column, so no extra query to load the owner
+        return getattr(self, f"{self.owner_field_name}_id", None)
+
+    def _missing_row_error(self, pk):
+        # only after a write matched no row: tell a row of another user from a deleted one
+        if self.__class__._base_manager.filter(pk=pk).exists():
+            return PermissionDenied("No permission to perform this action.")
+        return self.DoesNotExist(f"{self._meta.verbose_name.capitalize()} does not exist.")
+
+    def loaded_related(self, field_name):
+        """The object cached on a foreign key when it was read from the database, else None."""
+        field = self._meta.get_field(field_name)
+        if not field.is_cached(self):
+            return None
+        related = field.get_cached_value(self)
+        if related is None or related._state.adding or related.pk != getattr(self, field.attname):
+            return None
+        return related
+
+    def constraint_error(self, constraint_name):
+        field, message = self.constraint_error_messages[constraint_name]
+        return ValidationError({field: message.format(self=self)})
+
+    def _constraint_violation_error(self, error):
+        constraint = violated_constraint(self.__class__, error)
+        if constraint is None:
+            return None
+        if constraint.name in self.constraint_error_messages:
+            return self.constraint_error(constraint.name)
+        # what validate_constraints would have raised
+        return ValidationError(constraint.get_violation_error_message())
+
+    def _do_update(self, base_qs, *args, **kwargs):
+        # update_by: the UPDATE only matches a row that is still owned by the requesting user
+        update_owner_id = getattr(self, '_update_owner_id', None)
+        if update_owner_id is not None:
+            base_qs = base_qs.filter(**{f"{self.owner_field_name}_id": update_owner_id})
+        return super()._do_update(base_qs, *args, **kwargs)
+
     def is_owned_by(self, user):
-        return self.owner is not None and user is not None and self.owner == user
+        return self.owner_id is not None and user is not None and self.owner_id == user.pk
     
     def assert_owned_by(self, requested_user):
         if requested_user is None:
             raise PermissionDenied("Requested User must be provided.")
-        if self.owner is None:
+        if self.owner_id is None:
             raise PermissionDenied("Data is predefined and not owned.")
-        if self.owner != requested_user:
+        if self.owner_id != requested_user.pk:
             raise PermissionDenied("You are not the owner.")
         
     def _clean_string_value(self):
         for field in self._meta.fields:
-            value = getattr(self, field.name)
+            # attname, so foreign keys are not loaded just to be skipped
+            value = getattr(self, field.attname)
             if isinstance(value, str):
                 value = value.strip()
                 if value == "":
                     # normalize empty strings to None if field allows blank
                     if getattr(field, "blank", False) and getattr(field, "null", False):
                         value = None
-            setattr(self, field.name, value)
+            setattr(self, field.attname, value)
     
-    def save_obj(self):
+    def bump_data_version(self):
+        if not self.bumps_data_version_in_signals:
+            DataVersion.objects.bump_users([self.owner_id])
+
+    def resolve_related(self):
+        """Load the related objects validation and save need, once, before save_obj validates."""
+
+    def save_related(self, created):
+        """Writes that belong to the row's database transaction, run by save_obj right after the save."""
+
+    def save_obj(self, **save_kwargs):
         self._clean_string_value()
-        self.full_clean()
-        self.save()
-        return self
+        self.resolve_related()
+        # related objects carried in already loaded need no existence query
+        exclude = [
+            field.name for field in self._meta.concrete_fields
+            if field.is_relation and self.loaded_related(field.name) is not None
+        ]
+        if self.constraint_first:
+            self.full_clean(exclude=exclude, validate_unique=False, validate_constraints=False)
+        else:
+            self.full_clean(exclude=exclude)
+        # a savepoint when the write may be rejected, so the caller's transaction stays usable
+        savepoint = self.constraint_first or save_kwargs.get('force_update', False)
+        created = self._state.adding
+        try:
+            with db_transaction.atomic(savepoint=savepoint):
+                self.save(**save_kwargs)
+                self.save_related(created)
+                self.bump_data_version()
+        except IntegrityError as error:
+            validation_error = self._constraint_violation_error(error) if self.constraint_first else None
+            if validation_error is None:
+                raise
+            raise validation_error from error
+        return identity_map.add(self)
 
     def create_by(self, requested_user):
         if not self._state.adding: # self._state.adding == True → object is not yet saved (new instance).
@@ -55,32 +149,48 @@ class OwnedModel(models.Model):
         if self._state.adding: # self._state.adding == False → object is already saved in DB.
             raise PermissionDenied("You cannot use this method to create data.")
         self.assert_owned_by(requested_user)
-        obj = self.__class__.objects.get(pk=self.pk)
-        obj_owner = getattr(obj, self.owner_field_name)
-        # Only the owner can update
-        if obj_owner != requested_user:
-            raise PermissionDenied("No permission to perform this action.")
-        return self.save_obj()
+        # the owner is the requesting user, carried so validation does not query it again
+        setattr(self, self.owner_field_name, requested_user)
+        # Only the owner can update: checked by the UPDATE itself, no row is read for it
+        self._update_owner_id = requested_user.pk
+        try:
+            return self.save_obj(force_update=True)
+        except self.NotUpdated:
+            raise self._missing_row_error(self.pk)
+        finally:
+            del self._update_owner_id
     
     def delete_by(self, requested_user):
         if self._state.adding: # self._state.adding == False → object is already saved in DB.
             raise PermissionDenied("Data does not exists.")
         self.assert_owned_by(requested_user)
-        obj = self.__class__.objects.get(pk=self.pk)
-        obj_owner = getattr(obj, self.owner_field_name)
-        # Only the owner can delete
-        if obj_owner != requested_user:
-            raise PermissionDenied("No permission to perform this action.")
-        return self.delete()
+        # Only the owner can delete: checked by the DELETE itself, no row is read for it
+        pk = self.pk
+        with db_transaction.atomic(savepoint=False):
+            deleted = self.__class__.objects.for_user(requested_user).filter(pk=pk).delete()
+            if deleted[0]:
+                self.bump_data_version()
+        if not deleted[0]:
+            # raised outside the block, which would mark the caller's transaction for rollback
+            raise self._missing_row_error(pk)
+        identity_map.discard(self.__class__, pk)
+        setattr(self, self._meta.pk.attname, None)
+        return deleted
     
     @classmethod
     def get_for_user(cls, requested_user=None, id=None):
         if requested_user is None:
             raise PermissionDenied("Requested User must be provided.")
         if id is None:
-            obj = cls.objects.filter(user=requested_user)
-        else:
-            obj = cls.objects.get(pk=id)
-            if obj.owner is not None and obj.owner != requested_user:
-                raise PermissionDenied("You are not the owner.")
+            return cls.objects.for_user(requested_user)
+        obj = identity_map.get(cls, id)
+        if obj is None:
+            try:
+                obj = identity_map.add(cls.objects.for_user(requested_user, include_predefined=True).get(pk=id))
+            except cls.DoesNotExist:
+                if cls.objects.filter(pk=id).exists():
+                    raise PermissionDenied("You are not the owner.")
+                raise
+        elif obj.owner_id is not None and obj.owner_id != requested_user.pk:
+            raise PermissionDenied("You are not the owner.")
         return obj
\ No newline at end of file
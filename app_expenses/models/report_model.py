@@ -1,14 +1,67 @@
 import uuid
 import calendar
 from django.db import models
+from django.db.models.lookups import LessThan
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
-from .owned_model import OwnedModel
+from .owned_model import OwnedModel, OwnedQuerySet
 from ..custom_validators import validate_year
 
+class ReportQuerySet(OwnedQuerySet):
+    def apply_deltas(self, deltas, mark_dirty=False):
+        """
+        Add signed totals to reports in a single UPDATE.
+        'deltas' maps (user_id, year, month) to (credit_delta, debit_delta); months without a report are skipped.
+        A total the delta would take below zero is set to zero and its report marked dirty.
+        With 'mark_dirty' every report of 'deltas' is marked dirty in the same UPDATE.
+        Returns the number of reports updated.
+        """
+        if not deltas:
+            return 0
+        credit_cases, debit_cases = [], []
+        for (user_id, year, month), (credit_delta, debit_delta) in deltas.items():
+            report = models.Q(user_id=user_id, year=year, month=month)
+            if credit_delta:
+                credit_cases.append(models.When(report, then=models.Value(credit_delta)))
+            if debit_delta:
+                debit_cases.append(models.When(report, then=models.Value(debit_delta)))
+
+        decimal_field = models.DecimalField(max_digits=16, decimal_places=2)
+        values, went_negative = {}, []
+        for field, cases in (('total_credit', credit_cases), ('total_debit', debit_cases)):
+            if cases:
+                total = models.F(field) + models.Case(*cases, default=models.Value(0), output_field=decimal_field)
+                negative = LessThan(total, 0)
+                # a negative total means the report had drifted: keep the check constraint, refresh_dirty_reports recomputes it
+                values[field] = models.Case(models.When(negative, then=models.Value(0)), default=total, output_field=decimal_field)
+                went_negative.append(negative)
+        if mark_dirty:
+            # also the months whose totals did not change, e.g. a new description
+            values['is_dirty'] = True
+        elif not values:
+            return 0
+        else:
+            values['is_dirty'] = models.Case(
+                *(models.When(negative, then=models.Value(True)) for negative in went_negative),
+                default=models.F('is_dirty'), output_field=models.BooleanField(),
+            )
+        return self.for_months(deltas).update(**values)
+
+    def mark_dirty(self, months):
+        """Mark the reports of 'months', (user_id, year, month) keys, dirty in a single UPDATE."""
+        if not months:
+            return 0
+        return self.for_months(months).update(is_dirty=True)
+
+    def for_months(self, months):
+        months_filter = models.Q()
+        for user_id, year, month in months:
+            months_filter |= models.Q(user_id=user_id, year=year, month=month)
+        return self.filter(months_filter)
+
 class Report(OwnedModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reports')
@@ -18,6 +71,13 @@ class Report(OwnedModel):
     total_credit = models.DecimalField(max_digits=16, decimal_places=2, default=0, validators=[MinValueValidator(0)])
     is_dirty = models.BooleanField(default=False)
 
+    objects = ReportQuerySet.as_manager()
+
+    constraint_first = True
+    constraint_error_messages = {
+        'unique_report_per_user_month': ('month', "Report with Month Year: '{self.month_year}' already exists."),
+    }
+
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['user', 'year', 'month'], name='unique_report_per_user_month'),
@@ -45,9 +105,22 @@ class Report(OwnedModel):
         # validate month
         if not self.month:
             raise ValidationError({"month": "Month is required."})
-        # validate uniqueness
-        if Report.objects.filter(user=self.user, year=self.year, month=self.month).exclude(pk=self.pk).exists():
-            raise ValidationError({"month": f"Report with Month Year: '{self.month_year}' already exists."})
+
+    def validate_unique(self, exclude=None):
+        # before the default checks, which report the same constraint with a generic message;
+        # skipped by a constraint-first save_obj
+        if not {'year', 'month'} & set(exclude or ()) and Report.objects.filter(user=self.user_id, year=self.year, month=self.month).exclude(pk=self.pk).exists():
+            raise self.constraint_error('unique_report_per_user_month')
+        super().validate_unique(exclude)
+
+    def save(self, *args, **kwargs):
+        # totals are kept up to date by the transaction signals, saving a stale instance must not overwrite them
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in ('total_credit', 'total_debit')
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user} - {self.month_year}"
\ No newline at end of file
@@ -21,6 +21,11 @@ class Shortcut(OwnedModel):
     fund_account = models.ForeignKey(FundAccount, null=True, blank=True, on_delete=models.SET_NULL, related_name='shortcuts')
     tags = models.ManyToManyField(Tag, blank=True, related_name='shortcuts')
 
+    constraint_first = True
+    constraint_error_messages = {
+        'unique_shortcut_per_user': ('name', "Shortcut with Name: '{self.name}' already exists."),
+    }
+
     class Meta:
         constraints = [
             models.UniqueConstraint(Lower('name'),'user', name='unique_shortcut_per_user'),
@@ -48,9 +53,12 @@ class Shortcut(OwnedModel):
             raise ValidationError({"fund_account": "Fund Account does not exists."})
         if self.fund_account and self.fund_account.user != self.user:
             raise ValidationError({"fund_account": "Fund Account does not belongs to you."})
-        # validate uniqueness
-        if Shortcut.objects.filter(user=self.user, name__iexact=self.name.strip()).exclude(pk=self.pk).exists():
-            raise ValidationError({"name": f"Shortcut with Name: '{self.name}' already exists."})
+
+    def validate_unique(self, exclude=None):
+        super().validate_unique(exclude)
+        # skipped by a constraint-first save_obj
+        if 'name' not in (exclude or ()) and Shortcut.objects.filter(user=self.user_id, name__iexact=self.name.strip()).exclude(pk=self.pk).exists():
+            raise self.constraint_error('unique_shortcut_per_user')
         
     def save(self, *args, **kwargs):
         self.name = self.name.strip()
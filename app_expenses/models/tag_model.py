@@ -10,6 +10,11 @@ class Tag(OwnedModel):
     name = models.CharField(max_length=64)
     user = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE, related_name='tags')
 
+    constraint_first = True
+    constraint_error_messages = {
+        'unique_tag_per_user': ('name', "Tag with Name: '{self.name}' already exists."),
+    }
+
     class Meta:
         constraints = [
             models.UniqueConstraint(Lower('name'), 'user', name='unique_tag_per_user'),
@@ -25,9 +30,12 @@ class Tag(OwnedModel):
             raise ValidationError({"name": "Name is required."})
         if not self.name.strip():
             raise ValidationError({"name": "Name cannot be blank or whitespace."})
-        # validate uniqueness
-        if Tag.objects.filter(user=self.user, name__iexact=self.name.strip()).exclude(pk=self.pk).exists():
-            raise ValidationError({"name": f"Tag with Name: '{self.name}' already exists."})        
+
+    def validate_unique(self, exclude=None):
+        super().validate_unique(exclude)
+        # skipped by a constraint-first save_obj
+        if 'name' not in (exclude or ()) and Tag.objects.filter(user=self.user_id, name__iexact=self.name.strip()).exclude(pk=self.pk).exists():
+            raise self.constraint_error('unique_tag_per_user')
 
     def save(self, *args, **kwargs):
         self.name = self.name.strip()
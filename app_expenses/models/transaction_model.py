@@ -1,22 +1,38 @@
+import copy
 import uuid
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
-from django.core.exceptions import ValidationError
+from django.core.exceptions import ValidationError, PermissionDenied
 from ..custom_wrappers import balance_updater
-from .owned_model import OwnedModel
+from .owned_model import OwnedModel, OwnedQuerySet
 from .category_model import Category
 from .fund_account_model import FundAccount
 from .tag_model import Tag
+from . import identity_map
 from ..custom_validators import today, validate_date
 
 
+def stored_owner(model, pk):
+    # {'user_id': ...} of the row, taken from the request's identity map when it was loaded already
+    if not pk:
+        return None
+    obj = identity_map.get(model, pk)
+    if obj is not None:
+        return {'user_id': obj.user_id}
+    return model.objects.filter(pk=pk).values('user_id').first()
+
 class TransactionType(models.TextChoices):
         DEBIT = 'debit', 'Debit'
         CREDIT = 'credit', 'Credit'
 
+class TransactionQuerySet(OwnedQuerySet):
+    def for_listing(self):
+        """Load everything a transaction card renders: fund account, currency, category and tags."""
+        return self.select_related('fund_account__currency', 'category').prefetch_related('tags')
+
 class Transaction(OwnedModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='transactions')
@@ -28,32 +44,108 @@ class Transaction(OwnedModel):
     type = models.CharField(max_length=6, choices=TransactionType.choices, default=TransactionType.DEBIT)
     description = models.TextField(blank=True, null=True)
 
+    objects = TransactionQuerySet.as_manager()
+    bumps_data_version_in_signals = True
+    # the check constraints repeat the amount and type field validators
+    constraint_first = True
+
     class Meta:
         constraints = [
             models.CheckConstraint(condition=models.Q(amount__gt=0), name='transaction_amount_positive'),
             models.CheckConstraint(condition=models.Q(type__in=[TransactionType.CREDIT, TransactionType.DEBIT]), name='valid_transaction_type')
         ]
+        indexes = [
+            models.Index(fields=['user', '-date', '-id'], name='trx_user_date_idx'),
+            models.Index(fields=['user', 'fund_account', '-date', '-id'], name='trx_user_fund_account_date_idx'),
+            models.Index(fields=['user', 'category', '-date', '-id'], name='trx_user_category_date_idx'),
+            models.Index(fields=['user', 'type', 'date'], name='trx_user_type_date_idx'),
+        ]
         ordering = ['-date']
     
+    def _related_owner(self, field_name, model):
+        # the object carried in by the caller, else one query (none when loaded in this request already)
+        related = self.loaded_related(field_name)
+        if related is not None:
+            return {'user_id': related.user_id}
+        return stored_owner(model, getattr(self, f"{field_name}_id"))
+
+    def resolve_related(self):
+        # read once, or taken from the request's identity map, then used by clean and balance_updater
+        for field_name in ('category', 'fund_account'):
+            field = self._meta.get_field(field_name)
+            pk = getattr(self, field.attname)
+            if pk and self.loaded_related(field_name) is None:
+                try:
+                    setattr(self, field_name, identity_map.get_by_pk(field.related_model, pk))
+                except field.related_model.DoesNotExist:
+                    # reported by validation
+                    pass
+
     def clean(self):
         super().clean()
         # validate user
         if not self.user_id:
             raise ValidationError({"user": "User does not exists."})
-        # validate category
-        if not self.category_id or not Category.objects.filter(pk=self.category.pk).exists():
+        # validate category, existence and owner
+        category = self._related_owner('category', Category)
+        if category is None:
             raise ValidationError({"Category": "Category does not exists."})
-        if self.category and self.category.user != self.user:
+        if category['user_id'] != self.user_id:
             raise ValidationError({"category": "Category does not belongs to you."})
         # validate amount
         if not self.amount:
             raise ValidationError({"amount": "Amount is required."})
        # validate fund account
-        if not self.fund_account_id or not FundAccount.objects.filter(pk=self.fund_account.pk).exists():
+        fund_account = self._related_owner('fund_account', FundAccount)
+        if fund_account is None:
             raise ValidationError({"fund_account": "Fund Account does not exists."})
-        if self.fund_account and self.fund_account.user != self.user:
+        if fund_account['user_id'] != self.user_id:
             raise ValidationError({"fund_account": "Fund Account does not belongs to you."})
         
+    def set_tags(self, tags):
+        """Tags to write along with the row by the next save_obj (create_by / update_by)."""
+        self._pending_tags = list(tags)
+
+    def save_related(self, created):
+        tags = self.__dict__.pop('_pending_tags', None)
+        if tags is None:
+            return
+        # through rows written directly: the row's save already bumped the data version and
+        # queued the report invalidation the tag signals would add
+        through = Transaction.tags.through
+        tag_ids = [tag.pk for tag in tags]
+        if not created:
+            through.objects.filter(transaction_id=self.pk).exclude(tag_id__in=tag_ids).delete()
+        through.objects.bulk_create([through(transaction_id=self.pk, tag_id=tag_id) for tag_id in tag_ids], ignore_conflicts=True)
+        getattr(self, '_prefetched_objects_cache', {}).pop('tags', None)
+
+    @classmethod
+    def get_for_update(cls, requested_user, id):
+        """
+        The transaction of 'requested_user' with its fund account and category, read locked for an update
+        in the caller's database transaction. The read state is kept for balance_updater, so saving it
+        does not read the row again.
+        """
+        if requested_user is None:
+            raise PermissionDenied("Requested User must be provided.")
+        try:
+            trx = cls.objects.for_user(requested_user).select_related('fund_account', 'category').select_for_update(of=('self',)).get(pk=id)
+        except cls.DoesNotExist:
+            if cls.objects.filter(pk=id).exists():
+                raise PermissionDenied("You are not the owner.")
+            raise
+        for field_name in ('fund_account', 'category'):
+            related = trx.loaded_related(field_name)
+            if related is not None:
+                # one copy per request, so a balance change shows everywhere
+                mapped = identity_map.get(type(related), related.pk)
+                if mapped is None:
+                    identity_map.add(related)
+                else:
+                    setattr(trx, field_name, mapped)
+        trx._stored_state = copy.copy(trx)
+        return identity_map.add(trx)
+
     @balance_updater
     def save(self, *args, **kwargs):
         if self.description:
@@ -1,2 +1,5 @@
-from .auth_services import user_login_service, user_register_service
-from .transaction_services import user_transactions
\ No newline at end of file
+from .auth_services import user_login_service, user_register_service, login_throttle
+from .transaction_services import user_transactions, transaction_summary, daily_rollup
+from .fund_account_services import balance_history
+from .report_services import report_refresh
+from .export_services import export_jobs
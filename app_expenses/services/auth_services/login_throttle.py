@@ -0,0 +1,106 @@
+import time
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+
+def client_ip(request):
+    """
+    REMOTE_ADDR, or behind TRUSTED_PROXY_COUNT proxies the address the outermost of them appended
+    to X-Forwarded-For. Entries before it are sent by the client and can be forged.
+    """
+    proxies = settings.TRUSTED_PROXY_COUNT
+    if proxies:
+        forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR')
+
+class TokenBucket:
+    """
+    Token buckets by key: an attempt takes one token, a bucket holds 'burst' tokens at most and
+    refills at 'rate' tokens per second. Kept in this process, the least recently used key is dropped
+    past 'max_keys'. With 'cache_alias' the buckets live in that cache, shared by every worker
+    (read-modify-write, so concurrent workers may let a few extra attempts through).
+    """
+    def __init__(self, name, burst, rate, cache_alias=None, max_keys=10000, clock=time.time):
+        self.name = name
+        self.burst = burst
+        self.rate = rate
+        self.max_keys = max_keys
+        self.clock = clock
+        self._cache = caches[cache_alias] if cache_alias else None
+        self._buckets = OrderedDict()  # key -> (tokens, updated)
+        self._lock = threading.Lock()
+
+    def _refilled(self, bucket, now):
+        if bucket is None:
+            return self.burst
+        tokens, updated = bucket
+        return min(self.burst, tokens + max(now - updated, 0) * self.rate)
+
+    def take(self, key):
+        """Take a token for 'key', False when its bucket is empty."""
+        now = self.clock()
+        if self._cache is not None:
+            # hashed, emails may hold characters a cache backend does not accept in keys
+            cache_key = f"login_throttle:{self.name}:{hashlib.md5(key.encode()).hexdigest()}"
+            tokens = self._refilled(self._cache.get(cache_key), now)
+            allowed = tokens >= 1
+            tokens -= allowed
+            # kept until the bucket is full again
+            self._cache.set(cache_key, (tokens, now), timeout=int((self.burst - tokens) / self.rate) + 1)
+            return allowed
+        with self._lock:
+            tokens = self._refilled(self._buckets.pop(key, None), now)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - allowed, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return allowed
+
+class LoginThrottle:
+    """
+    Login attempts per client IP and per email, checked before the password is hashed. An attempt
+    rejected for its IP does not use up the email's tokens, so one client cannot lock others out of
+    an account beyond its own allowance. Settings are read on first use and by reset().
+    """
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._counters = Counter()
+        self._buckets = None
+
+    def _get_buckets(self):
+        if self._buckets is None:
+            options = {'cache_alias': settings.LOGIN_THROTTLE_CACHE, 'max_keys': settings.LOGIN_THROTTLE_MAX_KEYS, 'clock': self.clock}
+            self._buckets = (
+                TokenBucket('ip', settings.LOGIN_THROTTLE_IP_BURST, settings.LOGIN_THROTTLE_IP_RATE / 60, **options),
+                TokenBucket('email', settings.LOGIN_THROTTLE_EMAIL_BURST, settings.LOGIN_THROTTLE_EMAIL_RATE / 60, **options),
+            )
+        return self._buckets
+
+    def allow(self, ip, email):
+        by_ip, by_email = self._get_buckets()
+        if not by_ip.take(ip or ''):
+            result = 'rejected_ip'
+        elif not by_email.take((email or '').strip().lower()):
+            result = 'rejected_email'
+        else:
+            result = 'allowed'
+        with self._lock:
+            self._counters[result] += 1
+        return result == 'allowed'
+
+    def counters(self):
+        """Attempts of this process since the last reset: allowed, rejected_ip and rejected_email."""
+        with self._lock:
+            return {name: self._counters[name] for name in ('allowed', 'rejected_ip', 'rejected_email')}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._buckets = None
+
+login_throttle = LoginThrottle()
@@ -1,18 +1,20 @@
 from django.contrib.auth import authenticate, login, logout, get_user_model
 from django.core.exceptions import ValidationError, PermissionDenied
+from .login_throttle import login_throttle, client_ip
 
 User = get_user_model()
 
-def authenticate_by_email(email, password):
-    user = User.objects.filter(email=email).first()
-    if user is not None:
-        user = authenticate(username=user.username, password=password)
-    return user
+def authenticate_by_email(email, password, request=None):
+    # EmailBackend, a single query on the case-insensitive email index
+    return authenticate(request, email=email, password=password)
 
 def user_login(request, email=None, password=None):
+    # rejected before authenticate, so a burst of attempts costs no password hashing
+    if not login_throttle.allow(client_ip(request), email):
+        return (False, "Too many login attempts, please try again later.")
     message = "User not found, please enter valid credentials!"
     success = False
-    user = authenticate_by_email(email, password)
+    user = authenticate_by_email(email, password, request)
     if user is not None:
         login(request, user)
         message = "Logged-in successfully!!!"
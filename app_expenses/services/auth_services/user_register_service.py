@@ -1,13 +1,18 @@
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction as db_transaction
+from ...auth_backends import users_by_email
 
 def user_register(username=None, email=None, password=None):
     message = None
     success = False
     try:
-        user = get_user_model().objects.create_user(username=username, email=email, password=password)
-        user.save()
+        with db_transaction.atomic():
+            user = get_user_model().objects.create_user(username=username, email=email, password=password)
         success = True
+    except IntegrityError as e:
+        # registered concurrently, the email index rejects the second account
+        message = "Email already exists." if users_by_email(email).exists() else str(e)
     except ValidationError as e:
         message = e.messages[0]
     except Exception as e:
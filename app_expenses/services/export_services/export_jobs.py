@@ -0,0 +1,120 @@
+import io
+import os
+import gzip
+import zipfile
+from pathlib import Path
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connections, IntegrityError, transaction as db_transaction
+from django.utils import timezone
+from ...models import Transaction, ExportJob, ExportStatus, ExportCompression
+from ...models.export_job_model import EXPORT_FILE_SUFFIX, ACTIVE_EXPORT_STATUSES
+from ...utilities import monthly_report_csv
+
+_executor = None
+
+LAPSED_EXPORT_ERROR = "The export did not finish, please request it again."
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.EXPORT_WORKERS, thread_name_prefix='export')
+    return _executor
+
+def export_file_path(job):
+    return Path(settings.EXPORT_ROOT) / job.file_path
+
+def submit_export(requested_user, date_from, date_to, compression=ExportCompression.NONE):
+    """
+    Queue an export of the transactions of 'requested_user' between 'date_from' and 'date_to'.
+    An identical export that is pending, running or done (and not expired since) is returned
+    instead of starting a new one, unless it outlived EXPORT_JOB_TIMEOUT without finishing.
+    The job is handed to the worker pool once the request commits.
+    """
+    job = ExportJob(user=requested_user, date_from=date_from, date_to=date_to, compression=compression)
+    # converts the submitted values, the constraints are checked on create
+    job.full_clean(validate_constraints=False)
+    same_export = ExportJob.objects.filter(user=requested_user, date_from=job.date_from, date_to=job.date_to, compression=job.compression)
+    active = same_export.filter(status__in=ACTIVE_EXPORT_STATUSES)
+    with db_transaction.atomic():
+        same_export.lapsed(settings.EXPORT_JOB_TIMEOUT).fail_active(LAPSED_EXPORT_ERROR)
+        existing = active.first()
+        if existing is not None:
+            return existing
+        # an expired or failed copy is replaced, together with its file
+        for old_job in same_export:
+            delete_export_file(old_job)
+        same_export.delete()
+        try:
+            with db_transaction.atomic():
+                job = job.create_by(requested_user)
+        except IntegrityError:
+            # an identical export was submitted concurrently (unique_active_export)
+            return active.get()
+        db_transaction.on_commit(lambda: _get_executor().submit(_run_in_worker, job.pk))
+    return job
+
+def _run_in_worker(job_id):
+    try:
+        run_export_job(job_id)
+    finally:
+        # the worker thread's own connection
+        connections.close_all()
+
+def run_export_job(job_id):
+    """Write the export file of a pending job and mark it done, or failed with the error."""
+    if not ExportJob.objects.filter(pk=job_id, status=ExportStatus.PENDING).update(status=ExportStatus.RUNNING, started_at=timezone.now()):
+        return
+    job = ExportJob.objects.get(pk=job_id)
+    job.file_path = f"{job.user_id}/{job.pk}{EXPORT_FILE_SUFFIX[job.compression]}"
+    path = export_file_path(job)
+    try:
+        trx_list = Transaction.objects.filter(user_id=job.user_id, date__range=(job.date_from, job.date_to))
+        _write_export(path, job.compression, monthly_report_csv(trx_list))
+    except Exception as e:
+        ExportJob.objects.filter(pk=job_id).update(status=ExportStatus.FAILED, error=str(e), finished_at=timezone.now())
+        return
+    finished = ExportJob.objects.filter(pk=job_id, status=ExportStatus.RUNNING).update(
+        status=ExportStatus.DONE, file_path=job.file_path, finished_at=timezone.now()
+    )
+    if not finished:
+        # the data changed while the file was written, it is stale already
+        path.unlink(missing_ok=True)
+
+def _write_export(path, compression, lines):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # written next to the final name and moved in place, so a download never sees a partial file
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        with ExitStack() as stack:
+            if compression == ExportCompression.GZIP:
+                export_file = stack.enter_context(gzip.open(tmp_path, 'wt', encoding='utf-8', newline=''))
+            elif compression == ExportCompression.ZIP:
+                archive = stack.enter_context(zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED))
+                export_file = stack.enter_context(io.TextIOWrapper(archive.open('transactions.csv', 'w'), encoding='utf-8', newline=''))
+            else:
+                export_file = stack.enter_context(open(tmp_path, 'w', encoding='utf-8', newline=''))
+            export_file.writelines(lines)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, path)
+
+def cleanup_exports(orphaned=False):
+    """
+    Fail the lapsed jobs, or with 'orphaned' every pending and running job (when no worker
+    pool is running, e.g. on startup), and delete the files of expired and failed jobs.
+    Returns the number of failed jobs and of deleted files.
+    """
+    active = ExportJob.objects.all() if orphaned else ExportJob.objects.lapsed(settings.EXPORT_JOB_TIMEOUT)
+    failed = active.fail_active(LAPSED_EXPORT_ERROR)
+    stale = list(ExportJob.objects.filter(status__in=[ExportStatus.EXPIRED, ExportStatus.FAILED]).exclude(file_path='').only('pk', 'file_path'))
+    for job in stale:
+        delete_export_file(job)
+    ExportJob.objects.filter(pk__in=[job.pk for job in stale]).update(file_path='')
+    return failed, len(stale)
+
+def delete_export_file(job):
+    if job.file_path:
+        export_file_path(job).unlink(missing_ok=True)
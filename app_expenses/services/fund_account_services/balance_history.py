@@ -0,0 +1,77 @@
+from datetime import timedelta
+from operator import attrgetter
+from django.db import transaction as db_transaction
+from ...models import FundAccount, Transaction, BalanceCheckpoint
+from ...custom_validators import today
+from ..transaction_services.transaction_summary import get_summary
+
+def _net_between(fund_account, after=None, until=None):
+    # net effect of the fund account transactions dated in (after, until]
+    trx_list = Transaction.objects.filter(user_id=fund_account.user_id, fund_account=fund_account)
+    if after is not None:
+        trx_list = trx_list.filter(date__gt=after)
+    if until is not None:
+        trx_list = trx_list.filter(date__lte=until)
+    return get_summary(trx_list)['net']
+
+def _last_month_end(until=None):
+    return (until or today()).replace(day=1) - timedelta(days=1)
+
+def balance_as_of(fund_account, as_of_date):
+    """
+    Closing balance of 'fund_account' at the end of 'as_of_date'.
+    Starts from the nearest month end checkpoint, so at most one month of transactions is summed.
+    A completed month without its checkpoint gets the missing ones built first; dates in the
+    current month are walked back from the current balance.
+    """
+    checkpoint_after = fund_account.balance_checkpoints.filter(date__gte=as_of_date).order_by('date').first()
+    if checkpoint_after is None and as_of_date <= _last_month_end():
+        latest = fund_account.balance_checkpoints.order_by('-date').first()
+        built = build_balance_checkpoints(fund_account, after=latest.date if latest else None)
+        checkpoint_after = min((checkpoint for checkpoint in built if checkpoint.date >= as_of_date), key=attrgetter('date'), default=None)
+    if checkpoint_after is None:
+        return fund_account.balance - _net_between(fund_account, after=as_of_date)
+    if checkpoint_after.date == as_of_date:
+        return checkpoint_after.balance
+    checkpoint_before = fund_account.balance_checkpoints.filter(date__lt=as_of_date).order_by('-date').first()
+    if checkpoint_before is not None:
+        return checkpoint_before.balance + _net_between(fund_account, after=checkpoint_before.date, until=as_of_date)
+    return checkpoint_after.balance - _net_between(fund_account, after=as_of_date, until=checkpoint_after.date)
+
+def build_balance_checkpoints(fund_account, until=None, after=None):
+    """
+    Rebuild the month end checkpoints of 'fund_account', from its first transaction month up to the
+    last month completed before 'until' (default today), walking back from the current balance.
+    With 'after' (a checkpoint date) the checkpoints up to it are kept and only the newer month ends are built.
+    Uses one grouped query over the account transactions.
+    """
+    last_month_end = _last_month_end(until)
+    with db_transaction.atomic():
+        # lock the account so no transaction moves the balance while walking back from it
+        fund_account = FundAccount.objects.select_for_update().get(pk=fund_account.pk)
+        trx_list = Transaction.objects.filter(user_id=fund_account.user_id, fund_account=fund_account)
+        checkpoints_to_replace = fund_account.balance_checkpoints.all()
+        if after is not None:
+            trx_list = trx_list.filter(date__gt=after)
+            checkpoints_to_replace = checkpoints_to_replace.filter(date__gt=after)
+        monthly = get_summary(trx_list, group_by='month')
+        net_by_month = {row['month']: row['net'] for row in monthly}
+        if after is not None:
+            stop = after
+        elif monthly:
+            stop = monthly[0]['month'] - timedelta(days=1)
+        else:
+            stop = last_month_end
+
+        checkpoints = []
+        balance = fund_account.balance - sum(net for month, net in net_by_month.items() if month > last_month_end)
+        month_end = last_month_end
+        while month_end > stop:
+            checkpoints.append(BalanceCheckpoint(fund_account=fund_account, date=month_end, balance=balance))
+            month_start = month_end.replace(day=1)
+            balance -= net_by_month.get(month_start, 0)
+            month_end = month_start - timedelta(days=1)
+
+        checkpoints_to_replace.delete()
+        BalanceCheckpoint.objects.bulk_create(checkpoints)
+    return checkpoints
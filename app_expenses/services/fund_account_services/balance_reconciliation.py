@@ -0,0 +1,98 @@
+from django.db import DEFAULT_DB_ALIAS, transaction as db_transaction
+from django.db.models import F
+from ...models import FundAccount, Transaction, DataVersion
+from ..transaction_services.transaction_summary import get_summary
+from .balance_history import build_balance_checkpoints
+
+def _net_by_fund_account(trx_list):
+    return {row['fund_account']: row['net'] for row in get_summary(trx_list, group_by='fund_account')}
+
+def backfill_opening_balances(using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    post_migrate: set the opening balance of accounts created before it existed to
+    balance - (credits - debits), so their stored balance is not reported as drift.
+    """
+    with db_transaction.atomic(using=using):
+        fund_accounts = list(FundAccount.objects.using(using).select_for_update().filter(opening_balance=None).only('id', 'balance'))
+        if not fund_accounts:
+            return
+        net_by_fund_account = _net_by_fund_account(Transaction.objects.using(using).filter(fund_account__in=fund_accounts))
+        for fund_account in fund_accounts:
+            fund_account.opening_balance = fund_account.balance - net_by_fund_account.get(fund_account.pk, 0)
+        FundAccount.objects.using(using).bulk_update(fund_accounts, ['opening_balance'])
+
+def find_balance_drift(user_ids):
+    """
+    Compare the stored balance of every fund account of 'user_ids' with
+    opening_balance + credits - debits, using one grouped aggregate over their transactions.
+    Returns one dict per drifted fund account. Accounts whose opening balance was never set
+    (see backfill_opening_balances) are returned with 'expected' and 'drift' None.
+    """
+    trx_list = Transaction.objects.filter(user_id__in=user_ids, fund_account__isnull=False)
+    net_by_fund_account = _net_by_fund_account(trx_list)
+    drifted = []
+    for fund_account in FundAccount.objects.filter(user_id__in=user_ids).values('id', 'user_id', 'balance', 'opening_balance'):
+        net = net_by_fund_account.get(fund_account['id'], 0)
+        if fund_account['opening_balance'] is None:
+            drifted.append({
+                'fund_account': fund_account['id'],
+                'user': fund_account['user_id'],
+                'balance': fund_account['balance'],
+                'expected': None,
+                'drift': None,
+                'net': net,
+            })
+            continue
+        expected = fund_account['opening_balance'] + net
+        if fund_account['balance'] != expected:
+            drifted.append({
+                'fund_account': fund_account['id'],
+                'user': fund_account['user_id'],
+                'balance': fund_account['balance'],
+                'expected': expected,
+                'drift': fund_account['balance'] - expected,
+            })
+    return drifted
+
+def fix_balance_drift(drifted):
+    """
+    Set drifted balances to their expected value. A balance that moved since it was checked
+    (a transaction saved concurrently) is left alone and reported back as not fixed, and so is
+    an account without an opening balance: its expected balance is unknown.
+    """
+    fixed = []
+    for row in drifted:
+        if row['expected'] is None:
+            continue
+        if FundAccount.objects.filter(pk=row['fund_account'], balance=row['balance']).update(balance=row['expected']):
+            fixed.append(row['fund_account'])
+    return fixed
+
+def adopt_balances(drifted):
+    """Trust the stored balances: move the drift into opening_balance instead, or set a missing one."""
+    fixed = []
+    for row in drifted:
+        fund_accounts = FundAccount.objects.filter(pk=row['fund_account'], balance=row['balance'])
+        if row['expected'] is None:
+            updated = fund_accounts.filter(opening_balance=None).update(opening_balance=row['balance'] - row['net'])
+        else:
+            updated = fund_accounts.update(opening_balance=F('opening_balance') + row['drift'])
+        if updated:
+            fixed.append(row['fund_account'])
+    return fixed
+
+def reconcile_users(user_ids, mode=None):
+    """mode: None for a dry run, 'fix' to correct balances, 'adopt' to correct opening balances."""
+    drifted = find_balance_drift(user_ids)
+    fixed = set()
+    if mode == 'fix':
+        fixed = set(fix_balance_drift(drifted))
+        # the checkpoints were walked back from the drifted balances
+        for fund_account in FundAccount.objects.filter(pk__in=fixed, balance_checkpoints__isnull=False).distinct():
+            build_balance_checkpoints(fund_account)
+    elif mode == 'adopt':
+        fixed = set(adopt_balances(drifted))
+    for row in drifted:
+        row['fixed'] = row['fund_account'] in fixed
+    DataVersion.objects.bump_users({row['user'] for row in drifted if row['fixed']})
+    return {'checked_users': len(user_ids), 'drifted': drifted}
@@ -0,0 +1,55 @@
+from django.db import transaction as db_transaction
+from django.db.models import Q
+from django.db.models.functions import ExtractYear, ExtractMonth
+from ...models import Report, Transaction, TransactionType, DataVersion
+from ...utilities import month_date_range
+from ..transaction_services.transaction_summary import amount_sum
+
+DEFAULT_CHUNK_SIZE = 500
+
+def _refresh_chunk(reports):
+    """
+    Recompute the totals of 'reports' with one aggregate grouped by (user, year, month)
+    and write them back with one bulk update, signals are not sent.
+    """
+    months_filter = Q()
+    for report in reports:
+        months_filter |= Q(user_id=report.user_id, date__range=month_date_range(report.year, report.month))
+    rows = (
+        Transaction.objects.filter(months_filter).order_by()
+        .annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+        .values('user_id', 'year', 'month')
+        .annotate(total_credit=amount_sum(TransactionType.CREDIT), total_debit=amount_sum(TransactionType.DEBIT))
+    )
+    totals = {(row['user_id'], row['year'], row['month']): row for row in rows}
+    for report in reports:
+        row = totals.get((report.user_id, report.year, report.month))
+        report.total_credit = row['total_credit'] if row else 0
+        report.total_debit = row['total_debit'] if row else 0
+        report.is_dirty = False
+    Report.objects.bulk_update(reports, ['total_credit', 'total_debit', 'is_dirty'])
+    DataVersion.objects.bump_users({report.user_id for report in reports})
+
+def refresh_dirty_reports(chunk_size=DEFAULT_CHUNK_SIZE, user_ids=None):
+    """
+    Recompute the totals of every dirty report, 'chunk_size' reports per database transaction.
+    Each chunk locks its reports first, so transactions saved meanwhile wait and then apply their
+    deltas on top of the refreshed totals. Returns the number of reports refreshed.
+    """
+    dirty_reports = Report.objects.filter(is_dirty=True).order_by('pk').only('id', 'user_id', 'year', 'month')
+    if user_ids is not None:
+        dirty_reports = dirty_reports.filter(user_id__in=user_ids)
+    refreshed = 0
+    last_pk = None
+    while True:
+        with db_transaction.atomic():
+            chunk = dirty_reports.select_for_update()
+            if last_pk is not None:
+                chunk = chunk.filter(pk__gt=last_pk)
+            reports = list(chunk[:chunk_size])
+            if not reports:
+                break
+            _refresh_chunk(reports)
+        refreshed += len(reports)
+        last_pk = reports[-1].pk
+    return refreshed
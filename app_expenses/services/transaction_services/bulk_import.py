@@ -0,0 +1,122 @@
+from itertools import islice
+from collections import defaultdict
+from django.db import transaction as db_transaction
+from django.db.models import Q
+from django.core.exceptions import ValidationError
+from ...models import FundAccount, Category, Tag, Transaction, Report, DailyRollup, ExportJob, DataVersion
+from ...custom_wrappers import signed_amount, apply_balance_delta, shift_balance_checkpoints, add_report_delta, add_rollup_delta
+
+DEFAULT_BATCH_SIZE = 1000
+
+def _batches(rows, batch_size):
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+def _build_batch(requested_user, batch, first_row_number):
+    """
+    Validate one batch of rows with one query per related model (fund accounts, categories, tags).
+    Returns the unsaved transactions with their tag ids, and the row errors.
+    """
+    fund_account_ids = {row.get('fund_account') for row in batch if row.get('fund_account')}
+    category_ids = {row.get('category') for row in batch if row.get('category')}
+    tag_ids = {tag_id for row in batch for tag_id in row.get('tags') or []}
+    try:
+        fund_accounts = {str(obj.pk): obj for obj in FundAccount.objects.filter(user=requested_user, pk__in=fund_account_ids)}
+        categories = {str(obj.pk): obj for obj in Category.objects.filter(user=requested_user, pk__in=category_ids)}
+        tags = {str(obj.pk) for obj in Tag.objects.filter(Q(user=requested_user) | Q(user=None), pk__in=tag_ids)}
+    except ValidationError as e:
+        # a malformed UUID anywhere in the batch
+        return [], [f"Rows {first_row_number}-{first_row_number + len(batch) - 1}: {'; '.join(e.messages)}"]
+
+    built, errors = [], []
+    for row_number, row in enumerate(batch, start=first_row_number):
+        row_errors = []
+        fund_account = fund_accounts.get(str(row.get('fund_account')))
+        if fund_account is None:
+            row_errors.append("Fund Account does not exists.")
+        category = categories.get(str(row.get('category')))
+        if category is None:
+            row_errors.append("Category does not exists.")
+        # a tag listed twice would insert the same through row twice
+        row_tags = list(dict.fromkeys(str(tag_id) for tag_id in row.get('tags') or []))
+        if any(tag_id not in tags for tag_id in row_tags):
+            row_errors.append("One or more selected tags are invalid.")
+        trx = Transaction(
+            user=requested_user,
+            fund_account=fund_account,
+            category=category,
+            amount=row.get('amount'),
+            date=row.get('date'),
+            type=row.get('type'),
+            description=(row.get('description') or '').strip() or None
+        )
+        try:
+            # field level validation only, relations are checked above without per row queries
+            trx.clean_fields(exclude=['user', 'fund_account', 'category'])
+        except ValidationError as e:
+            row_errors.extend(f"{field}: {' '.join(messages)}" for field, messages in e.message_dict.items())
+        if row_errors:
+            errors.append(f"Row {row_number}: {' '.join(row_errors)}")
+        else:
+            built.append((trx, row_tags))
+    return built, errors
+
+def import_transactions(requested_user, rows, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Bulk import transactions for 'requested_user'.
+    'rows' is an iterable of dicts with keys: fund_account, category, amount, type, date, description, tags (list of tag ids).
+
+    All or nothing: rows are validated and inserted in batches with bulk_create, then every affected
+    fund account gets one net balance update (plus one checkpoint update per month) and all affected
+    report totals are updated in one statement, daily rollups with one update (plus one read and one insert for new rows).
+    """
+    if requested_user is None:
+        raise ValidationError({'user': "User does not exists."})
+
+    balance_deltas = defaultdict(lambda: 0)
+    checkpoint_deltas = defaultdict(lambda: 0)
+    fund_accounts = {}
+    report_deltas = {}
+    rollup_deltas = {}
+    created = 0
+    errors = []
+    with db_transaction.atomic():
+        for batch_number, batch in enumerate(_batches(rows, batch_size)):
+            built, batch_errors = _build_batch(requested_user, batch, batch_number * batch_size + 1)
+            errors.extend(batch_errors)
+            if errors:
+                # keep validating to report every bad row, but stop writing
+                continue
+            Transaction.objects.bulk_create([trx for trx, _ in built], batch_size=batch_size)
+            Transaction.tags.through.objects.bulk_create([
+                Transaction.tags.through(transaction_id=trx.pk, tag_id=tag_id)
+                for trx, row_tags in built for tag_id in row_tags
+            ], batch_size=batch_size)
+            for trx, _ in built:
+                fund_accounts[trx.fund_account.pk] = trx.fund_account
+                balance_deltas[trx.fund_account.pk] += signed_amount(trx)
+                checkpoint_deltas[(trx.fund_account.pk, trx.date.replace(day=1))] += signed_amount(trx)
+                add_report_delta(report_deltas, requested_user.pk, trx.date, trx.type, trx.amount)
+                add_rollup_delta(rollup_deltas, trx)
+            created += len(built)
+
+        if errors:
+            raise ValidationError(errors)
+
+        for fund_account_id, delta in balance_deltas.items():
+            try:
+                apply_balance_delta(fund_accounts[fund_account_id], delta, check_balance=True)
+            except ValidationError:
+                raise ValidationError({'amount': f"Insufficient Balance in Fund Account: '{fund_accounts[fund_account_id].name}'."})
+        # checkpoints are month ends, so one shift per (fund account, month) is exact
+        for (fund_account_id, month_start), delta in checkpoint_deltas.items():
+            shift_balance_checkpoints(fund_accounts[fund_account_id], month_start, delta)
+
+        # bulk_create sends no signals, so report totals, daily rollups and exports are handled here
+        dirty_reports = Report.objects.apply_deltas(report_deltas, mark_dirty=True)
+        DailyRollup.objects.apply_deltas(rollup_deltas)
+        ExportJob.objects.expire_months(report_deltas)
+        DataVersion.objects.bump_users([requested_user.pk])
+
+    return {'created': created, 'balance_deltas': dict(balance_deltas), 'dirty_reports': dirty_reports}
@@ -0,0 +1,61 @@
+from django.db import DEFAULT_DB_ALIAS, transaction as db_transaction
+from django.db.models import Sum, Count, Value
+from django.db.models.functions import Coalesce, TruncMonth, TruncYear
+from ...models import Transaction, TransactionType, DailyRollup, DataVersion
+from .transaction_summary import amount_sum, with_net
+
+GROUP_BY_CHOICES = ('fund_account', 'category', 'date', 'month', 'year')
+
+def get_rollup_summary(rollups, group_by=None):
+    """
+    Same result as 'get_summary' for the transactions behind 'rollups', read from the daily rollup table,
+    so the cost grows with the number of days instead of the number of transactions.
+    'group_by' may also be 'date' or 'year'.
+    """
+    aggregates = {
+        'total_credit': amount_sum(TransactionType.CREDIT, field='total'),
+        'total_debit': amount_sum(TransactionType.DEBIT, field='total'),
+        'count': Coalesce(Sum('trx_count'), Value(0)),
+    }
+    rollups = rollups.order_by()
+    if group_by is None:
+        return with_net(rollups.aggregate(**aggregates))
+    if group_by not in GROUP_BY_CHOICES:
+        raise ValueError(f"Cannot group rollup summary by '{group_by}'.")
+    if group_by == 'month':
+        rollups = rollups.annotate(month=TruncMonth('date'))
+    elif group_by == 'year':
+        rollups = rollups.annotate(year=TruncYear('date'))
+    # rows of deleted transactions stay behind with a zero count
+    rows = rollups.values(group_by).annotate(**aggregates).filter(count__gt=0).order_by(group_by)
+    return [with_net(row) for row in rows]
+
+def rebuild_daily_rollups(user_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Replace the rollup rows of 'user_ids' with one grouped aggregate over their transactions.
+    Returns the number of rows created.
+    """
+    with db_transaction.atomic(using=using):
+        DailyRollup.objects.using(using).filter(user_id__in=user_ids).delete()
+        rows = (
+            Transaction.objects.using(using).filter(user_id__in=user_ids).order_by()
+            .values('user_id', 'date', 'fund_account_id', 'category_id', 'type')
+            .annotate(total=Sum('amount'), trx_count=Count('id'))
+        )
+        created = DailyRollup.objects.using(using).bulk_create([DailyRollup(**row) for row in rows], batch_size=1000)
+        DataVersion.objects.using(using).bump_users(user_ids)
+    return len(created)
+
+def backfill_daily_rollups(using=DEFAULT_DB_ALIAS, chunk_size=500, **kwargs):
+    """
+    post_migrate: build the rollups of users who have transactions but no rollup rows, e.g. every user
+    right after the rollup table is deployed, so summaries never read an empty table. One database
+    transaction per chunk of users; users with rollups are left to the 'rebuild_daily_rollups' command.
+    """
+    user_ids = list(
+        Transaction.objects.using(using)
+        .exclude(user_id__in=DailyRollup.objects.using(using).values('user_id'))
+        .order_by('user_id').values_list('user_id', flat=True).distinct()
+    )
+    for i in range(0, len(user_ids), chunk_size):
+        rebuild_daily_rollups(user_ids[i:i + chunk_size], using=using)
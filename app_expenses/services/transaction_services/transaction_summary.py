@@ -0,0 +1,38 @@
+from decimal import Decimal
+from django.db.models import Sum, Count, Q, Value, DecimalField
+from django.db.models.functions import Coalesce, TruncMonth
+from ...models import TransactionType
+
+GROUP_BY_CHOICES = ('fund_account', 'category', 'month')
+
+def amount_sum(trx_type, field='amount'):
+    return Coalesce(
+        Sum(field, filter=Q(type=trx_type)),
+        Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=16, decimal_places=2)
+    )
+
+def with_net(row):
+    row['net'] = row['total_credit'] - row['total_debit']
+    return row
+
+def get_summary(trx_list, group_by=None):
+    """
+    Credit total, debit total, net and count of 'trx_list' in a single conditional aggregation query.
+    With 'group_by' ('fund_account', 'category' or 'month') a list of rows is returned instead,
+    one per group, keyed by the group name (fund account id, category id or first day of month).
+    """
+    aggregates = {
+        'total_credit': amount_sum(TransactionType.CREDIT),
+        'total_debit': amount_sum(TransactionType.DEBIT),
+        'count': Count('id'),
+    }
+    trx_list = trx_list.order_by().prefetch_related(None)
+    if group_by is None:
+        return with_net(trx_list.aggregate(**aggregates))
+    if group_by not in GROUP_BY_CHOICES:
+        raise ValueError(f"Cannot group transaction summary by '{group_by}'.")
+    if group_by == 'month':
+        trx_list = trx_list.annotate(month=TruncMonth('date'))
+    rows = trx_list.values(group_by).annotate(**aggregates).order_by(group_by)
+    return [with_net(row) for row in rows]
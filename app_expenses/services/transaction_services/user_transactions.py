@@ -1,32 +1,35 @@
-from ...models import FundAccount, Category, Transaction
-from django.db.models import Sum
+from ...models import FundAccount, Category, Transaction, DailyRollup
+from .daily_rollup import get_rollup_summary
 
 def get_all_transactions(requested_user):
-    trx_list = Transaction.get_for_user(requested_user=requested_user)
+    trx_list = Transaction.get_for_user(requested_user=requested_user).for_listing()
     return trx_list
 
-def get_transaction_by_id(requested_user, trx_id):
+def get_transaction_by_id(requested_user, trx_id, for_update=False):
     if not trx_id:
         raise Exception("Transaction ID is required.")
+    if for_update:
+        # locked: call inside the database transaction that saves it
+        return Transaction.get_for_update(requested_user=requested_user, id=trx_id)
     trx = Transaction.get_for_user(requested_user=requested_user, id=trx_id)
     return trx
 
-def get_credit_debit_summary(trx_list):
-    total_credit = trx_list.filter(type='credit').aggregate(total_credit=Sum('amount'))['total_credit']
-    total_debit = trx_list.filter(type='debit').aggregate(total_debit=Sum('amount'))['total_debit']
-    return (total_credit, total_debit)
+def get_credit_debit_summary(requested_user, **filters):
+    # from the daily rollups, so the cost does not grow with the number of transactions
+    summary = get_rollup_summary(DailyRollup.objects.filter(user=requested_user, **filters))
+    return (summary['total_credit'], summary['total_debit'])
 
 def get_transactions_by_fund_account(requested_user, fund_account_id):
     if not fund_account_id:
         raise Exception("Fund Account ID is required.")
     fund_acct = FundAccount.get_for_user(requested_user=requested_user, id=fund_account_id)
     trx_list = get_all_transactions(requested_user=requested_user).filter(fund_account__id=fund_account_id)
-    return (trx_list, fund_acct) + get_credit_debit_summary(trx_list)
+    return (trx_list, fund_acct) + get_credit_debit_summary(requested_user, fund_account_id=fund_account_id)
 
 def get_transactions_by_category(requested_user, category_id):
     if not category_id:
         raise Exception("Category ID is required.")
     category = Category.get_for_user(requested_user=requested_user, id=category_id)
     trx_list = get_all_transactions(requested_user=requested_user).filter(category__id=category_id)
-    return (trx_list, category) + get_credit_debit_summary(trx_list)
+    return (trx_list, category) + get_credit_debit_summary(requested_user, category_id=category_id)
     
\ No newline at end of file
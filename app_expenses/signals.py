@@ -1,41 +1,140 @@
 import calendar
-from django.db.models.signals import post_save, post_delete, pre_save
-from django.db.models import Sum
+from django.db import transaction as db_transaction
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete, m2m_changed
 from django.dispatch import receiver
-from .models import Transaction, Report, Loan, TransactionType
+from decimal import Decimal
+from .models import Transaction, Report, Loan, DailyRollup, FundAccount, Category, Tag, Currency, ExportJob, DataVersion, catalog, identity_map
+from .custom_wrappers import add_report_delta, add_rollup_delta
+from .auth_backends import User, forget_cached_user
+from .services.transaction_services.daily_rollup import get_rollup_summary
 from datetime import date
 
+def _flush_dirty_reports(connection):
+    months, connection.pending_dirty_reports = getattr(connection, 'pending_dirty_reports', set()), set()
+    expired, connection.pending_expired_exports = getattr(connection, 'pending_expired_exports', set()), set()
+    # the writer bumped the data version of these users in its own transaction already
+    Report.objects.using(connection.alias).mark_dirty(months)
+    ExportJob.objects.using(connection.alias).expire_months(expired)
+
+def queue_report_invalidation(months, using=None, mark_dirty=True):
+    """
+    Collect (user_id, year, month) keys of reports to mark dirty, flushed as one UPDATE when the
+    database transaction commits (right away in autocommit), along with one UPDATE expiring the
+    export files of those months. mark_dirty=False when the caller marked the reports itself
+    (Report.objects.apply_deltas(mark_dirty=True)) and only the exports are left.
+    """
+    connection = db_transaction.get_connection(using)
+    if not hasattr(connection, 'pending_dirty_reports') or not connection.run_on_commit:
+        # with no flush registered, keys left behind belong to a rolled back transaction
+        connection.pending_dirty_reports = set()
+        connection.pending_expired_exports = set()
+    if mark_dirty:
+        connection.pending_dirty_reports.update(months)
+    connection.pending_expired_exports.update(months)
+    # every change registers the flush, so a rolled back savepoint cannot drop it; later flushes find nothing to do
+    db_transaction.on_commit(lambda: _flush_dirty_reports(connection), using=using)
+
 @receiver(post_save, sender=Transaction)
+def update_report_totals_on_transaction_save(sender, instance, **kwargs):
+    """Move the transaction out of its old report totals and into the new ones, in the saving DB transaction."""
+    deltas = {}
+    # stored row before this save, loaded once by balance_updater
+    old = getattr(instance, 'previous_state', None)
+    if old is not None:
+        add_report_delta(deltas, old.user_id, old.date, old.type, -old.amount)
+    add_report_delta(deltas, instance.user_id, instance.date, instance.type, Decimal(str(instance.amount)))
+    # marked dirty by the totals UPDATE itself
+    Report.objects.apply_deltas(deltas, mark_dirty=True)
+    queue_report_invalidation(deltas, mark_dirty=False)
+
 @receiver(post_delete, sender=Transaction)
-def mark_report_dirty_on_transaction_change(sender, instance, **kwargs):
-    report = Report.objects.filter(
-        user=instance.user,
-        year=instance.date.year,
-        month=instance.date.month
-    ).first()
-    if report:
-        report.is_dirty = True
-        report.save(update_fields=['is_dirty'])
-
-@receiver(pre_save, sender=Transaction)
-def mark_report_dirty_on_transaction_update(sender, instance, **kwargs):
-    if not instance.pk:
-        return
-    old_instance = Transaction.objects.filter(pk=instance.pk).first()
-    if (
-        old_instance and (
-        old_instance.amount != instance.amount or
-        old_instance.fund_account_id != instance.fund_account_id or
-        old_instance.date != instance.date)
-    ):
-        report = Report.objects.filter(
-            user=old_instance.user,
-            year=old_instance.date.year,
-            month=old_instance.date.month
-        ).first()
-        if report:
-            report.is_dirty = True
-            report.save(update_fields=['is_dirty'])
+def update_report_totals_on_transaction_delete(sender, instance, **kwargs):
+    deltas = {}
+    add_report_delta(deltas, instance.user_id, instance.date, instance.type, -Decimal(str(instance.amount)))
+    Report.objects.apply_deltas(deltas, mark_dirty=True)
+    queue_report_invalidation(deltas, mark_dirty=False)
+
+@receiver(post_save, sender=Transaction)
+def update_daily_rollup_on_transaction_save(sender, instance, **kwargs):
+    deltas = {}
+    old = getattr(instance, 'previous_state', None)
+    if old is not None:
+        add_rollup_delta(deltas, old, sign=-1)
+    add_rollup_delta(deltas, instance)
+    DailyRollup.objects.apply_deltas(deltas)
+
+@receiver(post_delete, sender=Transaction)
+def update_daily_rollup_on_transaction_delete(sender, instance, **kwargs):
+    deltas = {}
+    add_rollup_delta(deltas, instance, sign=-1)
+    DailyRollup.objects.apply_deltas(deltas)
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def bump_data_version_on_transaction_change(sender, instance, **kwargs):
+    # also covers saves outside save_obj (admin, cascades), see Transaction.bumps_data_version_in_signals
+    DataVersion.objects.bump_users([instance.user_id])
+
+@receiver(pre_delete, sender=FundAccount)
+def detach_daily_rollup_from_fund_account(sender, instance, **kwargs):
+    DailyRollup.objects.detach(fund_account=instance)
+
+@receiver(pre_delete, sender=Category)
+def detach_daily_rollup_from_category(sender, instance, **kwargs):
+    DailyRollup.objects.detach(category=instance)
+
+@receiver(m2m_changed, sender=Transaction.tags.through)
+def invalidate_on_transaction_tags_change(sender, instance, action, pk_set, **kwargs):
+    # tags are part of the exported rows
+    if action in ('post_add', 'post_remove', 'post_clear') and isinstance(instance, Transaction):
+        queue_report_invalidation([(instance.user_id, instance.date.year, instance.date.month)])
+        DataVersion.objects.bump_users([instance.user_id])
+
+@receiver(post_save, sender=FundAccount)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=FundAccount)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Tag)
+def expire_exports_on_name_change(sender, instance, created=False, **kwargs):
+    # names are part of the exported rows, a new object is not referenced by any export yet
+    if not created and instance.user_id:
+        db_transaction.on_commit(lambda: ExportJob.objects.expire_users([instance.user_id]))
+
+@receiver(post_save, sender=FundAccount)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=FundAccount)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Tag)
+def bump_option_versions(sender, instance, **kwargs):
+    # the cached form options of the owner, or of everyone for predefined rows
+    if instance.user_id:
+        DataVersion.objects.bump([DataVersion.options_key(instance.user_id)])
+    else:
+        bump_catalog_version(sender, instance)
+
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def bump_catalog_version(sender, instance, **kwargs):
+    # other workers reload their catalog on their next version check
+    DataVersion.objects.bump([DataVersion.CATALOG_KEY])
+    catalog.invalidate()
+
+@receiver(post_delete, sender=FundAccount)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Transaction)
+def discard_deleted_from_identity_map(sender, instance, **kwargs):
+    # also rows deleted by a cascade, a later lookup in the request must not find them.
+    # Not connected for every model, a receiver turns the fast cascade delete of its rows off
+    identity_map.discard(sender, instance.pk)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_auth_user(sender, instance, **kwargs):
+    # a changed password, active flag or permission is seen by the next request
+    forget_cached_user(instance.pk)
 
 @receiver(pre_save, sender=Loan)
 def sync_completed_and_remaining(sender, instance, **kwargs):
@@ -51,11 +150,13 @@ def last_day_of_month(year: int, month: int) -> date:
 
 @receiver(pre_save, sender=Report)
 def calculate_total(sender, instance, **kwargs):
+    # a new report starts from the month's totals, afterwards transaction signals keep them current
+    if not instance._state.adding:
+        return
     start_date = date(instance.year, instance.month, 1)
     end_date = last_day_of_month(instance.year, instance.month)
 
-    sum_credit = Transaction.objects.filter(user=instance.user, date__range=(start_date, end_date), type=TransactionType.CREDIT).aggregate(total=Sum("amount"))["total"] or 0
-    sum_debit = Transaction.objects.filter(user=instance.user, date__range=(start_date, end_date), type=TransactionType.DEBIT).aggregate(total=Sum("amount"))["total"] or 0
+    summary = get_rollup_summary(DailyRollup.objects.filter(user=instance.user, date__range=(start_date, end_date)))
 
-    instance.total_credit = sum_credit
-    instance.total_debit = sum_debit
\ No newline at end of file
+    instance.total_credit = summary['total_credit']
+    instance.total_debit = summary['total_debit']
\ No newline at end of file
@@ -0,0 +1,100 @@
+from django.test import TestCase, TransactionTestCase
+from django.db import connection, IntegrityError, transaction as db_transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import authenticate, get_user_model
+from django.core.management.base import CommandError
+from app_expenses.auth_backends import USER_EMAIL_CONSTRAINT, create_user_email_constraint
+from app_expenses.utilities import email_exists
+from app_expenses.services import user_register_service
+from app_expenses.model_forms import MyUserRegisterForm
+from app_expenses.services.auth_services.login_throttle import login_throttle
+
+User = get_user_model()
+
+class EmailBackendTest(TestCase):
+    def setUp(self):
+        login_throttle.reset()
+        self.user = User.objects.create_user(username="user1", email="User1@Example.com", password="s3cret-pass")
+
+    def test_authenticate_by_email_success(self):
+        """EmailBackend: authenticates with the email in any case"""
+        self.assertEqual(authenticate(email="user1@example.COM", password="s3cret-pass"), self.user)
+
+    def test_authenticate_wrong_password_or_unknown_email_fails(self):
+        """EmailBackend: fails with a wrong password or an unknown email"""
+        self.assertIsNone(authenticate(email="user1@example.com", password="wrong"))
+        self.assertIsNone(authenticate(email="nobody@example.com", password="s3cret-pass"))
+
+    def test_authenticate_inactive_user_fails(self):
+        """EmailBackend: fails for an inactive user"""
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNone(authenticate(email="user1@example.com", password="s3cret-pass"))
+
+    def test_authenticate_by_username_still_works(self):
+        """EmailBackend: username logins (admin) fall through to the model backend"""
+        self.assertEqual(authenticate(username="user1", password="s3cret-pass"), self.user)
+
+    def test_authenticate_in_one_lower_email_query(self):
+        """EmailBackend: one query, on lower(email)"""
+        with CaptureQueriesContext(connection) as queries:
+            authenticate(email="USER1@example.com", password="s3cret-pass")
+        self.assertEqual(len(queries), 1)
+        self.assertIn('LOWER("auth_user"."email")', queries[0]['sql'])
+
+    def test_email_exists_case_insensitive(self):
+        """email_exists: finds the email in any case"""
+        self.assertTrue(email_exists("USER1@EXAMPLE.COM"))
+        self.assertFalse(email_exists("user2@example.com"))
+
+    def test_login_view_with_email_in_other_case(self):
+        """login: logs in with the email in another case"""
+        response = self.client.post(reverse('login'), {'email': "user1@EXAMPLE.com", 'password': "s3cret-pass"})
+        self.assertRedirects(response, reverse('dashboard'), fetch_redirect_response=False)
+        self.assertEqual(int(self.client.session['_auth_user_id']), self.user.pk)
+
+class UserEmailConstraintTest(TestCase):
+    def test_constraint_created_on_migrate(self):
+        """Email constraint: added to the user table by post_migrate"""
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, User._meta.db_table)
+        self.assertIn(USER_EMAIL_CONSTRAINT.name, constraints)
+
+    def test_duplicate_email_in_other_case_fails(self):
+        """Email constraint: rejects an email that only differs in case"""
+        User.objects.create_user(username="user1", email="user1@example.com")
+        with self.assertRaises(IntegrityError), db_transaction.atomic():
+            User.objects.create_user(username="user2", email="USER1@example.com")
+
+    def test_users_without_email_success(self):
+        """Email constraint: any number of users without an email"""
+        User.objects.create_user(username="user1")
+        User.objects.create_user(username="user2")
+        self.assertEqual(User.objects.filter(email='').count(), 2)
+
+    def test_register_duplicate_email_fails(self):
+        """register: an email registered in another case is rejected, by the form and by the service"""
+        User.objects.create_user(username="user1", email="user1@example.com")
+        form = MyUserRegisterForm(data={'username': "user2", 'email': "User1@Example.com", 'password': "x", 'confirm_password': "x"})
+        self.assertIn("Email already exists.", form.errors['email'])
+        success, message = user_register_service.user_register(username="user2", email="User1@Example.com", password="x")
+        self.assertFalse(success)
+        self.assertEqual(message, "Email already exists.")
+
+class UserEmailConstraintMigrateTest(TransactionTestCase):
+    def test_existing_duplicates_stop_migrate_with_their_users(self):
+        """Email constraint: duplicates from before the constraint are listed instead of failing in add_constraint"""
+        with connection.schema_editor() as schema_editor:
+            schema_editor.remove_constraint(User, USER_EMAIL_CONSTRAINT)
+        User.objects.create_user(username="alice", email="A@x.com")
+        User.objects.create_user(username="alice2", email="a@x.com")
+        User.objects.create_user(username="bob", email="b@x.com")
+        with self.assertRaises(CommandError) as error:
+            create_user_email_constraint()
+        self.assertIn("  a@x.com: alice, alice2\n", str(error.exception))
+        self.assertNotIn("b@x.com", str(error.exception))
+
+        User.objects.filter(username="alice2").update(email="alice2@x.com")
+        create_user_email_constraint()
+        with connection.cursor() as cursor:
+            self.assertIn(USER_EMAIL_CONSTRAINT.name, connection.introspection.get_constraints(cursor, User._meta.db_table))
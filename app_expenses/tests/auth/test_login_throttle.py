@@ -0,0 +1,164 @@
+from unittest import mock
+from django.test import TestCase, RequestFactory, override_settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.middleware import SessionMiddleware
+from app_expenses.auth_backends import EmailBackend
+from app_expenses.services.auth_services import user_login_service
+from app_expenses.services.auth_services.login_throttle import LoginThrottle, TokenBucket, login_throttle, client_ip
+
+User = get_user_model()
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+THROTTLE_SETTINGS = {
+    'LOGIN_THROTTLE_IP_BURST': 20, 'LOGIN_THROTTLE_IP_RATE': 60,
+    'LOGIN_THROTTLE_EMAIL_BURST': 5, 'LOGIN_THROTTLE_EMAIL_RATE': 6,
+    'LOGIN_THROTTLE_CACHE': None, 'LOGIN_THROTTLE_MAX_KEYS': 1000, 'TRUSTED_PROXY_COUNT': 0,
+}
+
+@override_settings(**THROTTLE_SETTINGS)
+class LoginThrottleTest(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.throttle = LoginThrottle(clock=self.clock)
+
+    def burst(self, attempts, per_second, ip=lambda i: "10.0.0.1", email=lambda i: "victim@example.com"):
+        # 'attempts' spread evenly at 'per_second', the number allowed
+        allowed = 0
+        for i in range(attempts):
+            allowed += self.throttle.allow(ip(i), email(i))
+            self.clock.now += 1 / per_second
+        return allowed
+
+    def test_one_ip_thousands_of_attempts_per_second(self):
+        """LoginThrottle: 6000 attempts over 1.2 seconds from one IP get the burst plus the refill (1 per second)"""
+        allowed = self.burst(6000, per_second=5000, email=lambda i: f"user{i}@example.com")
+        self.assertEqual(allowed, 21)
+        self.assertEqual(self.throttle.counters(), {'allowed': 21, 'rejected_ip': 5979, 'rejected_email': 0})
+
+    def test_one_email_from_many_ips(self):
+        """LoginThrottle: 5000 attempts in one second on one email from distinct IPs get the email's burst"""
+        allowed = self.burst(5000, per_second=5000, ip=lambda i: f"10.0.{i // 250}.{i % 250}")
+        self.assertEqual(allowed, 5)
+        self.assertEqual(self.throttle.counters()['rejected_email'], 4995)
+
+    def test_refill_over_time(self):
+        """LoginThrottle: an emptied bucket refills at the configured rate"""
+        self.burst(100, per_second=1000)
+        self.clock.now += 10
+        # 6 per minute for the email: one token back after 10 seconds
+        self.assertTrue(self.throttle.allow("10.0.0.1", "victim@example.com"))
+        self.assertFalse(self.throttle.allow("10.0.0.1", "victim@example.com"))
+
+    def test_ip_rejection_keeps_email_tokens(self):
+        """LoginThrottle: attempts rejected for their IP do not use up the email's tokens"""
+        self.burst(1000, per_second=1000, email=lambda i: f"user{i}@example.com")
+        self.assertFalse(self.throttle.allow("10.0.0.1", "victim@example.com"))
+        self.assertEqual(self.burst(5, per_second=1000, ip=lambda i: "10.0.0.2"), 5)
+
+    def test_email_is_case_insensitive(self):
+        """LoginThrottle: one bucket for an email in any case"""
+        for i in range(5):
+            self.throttle.allow(f"10.0.1.{i}", "Victim@Example.com")
+        self.assertFalse(self.throttle.allow("10.0.1.9", "VICTIM@example.com"))
+
+    def test_memory_bounded(self):
+        """LoginThrottle: at most LOGIN_THROTTLE_MAX_KEYS buckets kept per key kind"""
+        self.burst(5000, per_second=5000, ip=lambda i: f"ip{i}", email=lambda i: f"user{i}@example.com")
+        by_ip, by_email = self.throttle._get_buckets()
+        self.assertEqual(len(by_ip._buckets), 1000)
+        self.assertEqual(len(by_email._buckets), 1000)
+
+    def test_shared_cache_buckets(self):
+        """TokenBucket: with a cache alias, workers share their buckets"""
+        cache.clear()
+        worker1 = TokenBucket('ip', burst=3, rate=1, cache_alias='default', clock=self.clock)
+        worker2 = TokenBucket('ip', burst=3, rate=1, cache_alias='default', clock=self.clock)
+        self.assertEqual([worker1.take("10.0.0.1"), worker2.take("10.0.0.1"), worker1.take("10.0.0.1"), worker2.take("10.0.0.1")], [True, True, True, False])
+        self.clock.now += 1
+        self.assertTrue(worker2.take("10.0.0.1"))
+        self.assertFalse(worker1.take("10.0.0.1"))
+
+@override_settings(**THROTTLE_SETTINGS)
+class UserLoginThrottleTest(TestCase):
+    def setUp(self):
+        login_throttle.reset()
+        self.addCleanup(login_throttle.reset)
+        self.user = User.objects.create_user(username="user1", email="user1@example.com", password="s3cret-pass")
+
+    def request(self, **meta):
+        request = RequestFactory().post(reverse('login'), **{'REMOTE_ADDR': "10.0.0.1", **meta})
+        SessionMiddleware(lambda request: None).process_request(request)
+        request.user = AnonymousUser()
+        return request
+
+    def test_throttled_attempts_do_not_hash(self):
+        """user_login: attempts over the limit are rejected before authentication"""
+        with mock.patch.object(EmailBackend, 'authenticate', autospec=True, return_value=None) as backend_authenticate:
+            results = [user_login_service.user_login(self.request(), "user1@example.com", "wrong") for _ in range(2000)]
+        self.assertEqual(backend_authenticate.call_count, 5)
+        self.assertEqual(results[-1], (False, "Too many login attempts, please try again later."))
+        self.assertEqual(login_throttle.counters()['allowed'], 5)
+
+    @override_settings(TRUSTED_PROXY_COUNT=1)
+    def test_clients_behind_proxy_have_own_buckets(self):
+        """user_login: behind a proxy every client is throttled by its forwarded address"""
+        with mock.patch.object(EmailBackend, 'authenticate', autospec=True, return_value=None):
+            for i in range(20):
+                user_login_service.user_login(self.request(HTTP_X_FORWARDED_FOR="203.0.113.9"), f"user{i}@example.com", "wrong")
+            attacker = user_login_service.user_login(self.request(HTTP_X_FORWARDED_FOR="203.0.113.9"), "other@example.com", "wrong")
+            self.assertEqual(attacker, (False, "Too many login attempts, please try again later."))
+        success, message = user_login_service.user_login(self.request(HTTP_X_FORWARDED_FOR="198.51.100.7"), "user1@example.com", "s3cret-pass")
+        self.assertTrue(success)
+
+    def test_login_view_shows_throttle_message(self):
+        """login: a throttled attempt shows the error and does not log in"""
+        for _ in range(5):
+            self.client.post(reverse('login'), {'email': "user1@example.com", 'password': "wrong"})
+        response = self.client.post(reverse('login'), {'email': "user1@example.com", 'password': "s3cret-pass"}, follow=True)
+        self.assertContains(response, "Too many login attempts")
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_status_view_for_staff_only(self):
+        """login_throttle_status: counters as JSON for staff users"""
+        self.client.post(reverse('login'), {'email': "user1@example.com", 'password': "wrong"})
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('login_throttle_status')).status_code, 302)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse('login_throttle_status'))
+        self.assertEqual(response.json(), {'allowed': 1, 'rejected_ip': 0, 'rejected_email': 0})
+
+class ClientIpTest(TestCase):
+    def request(self, forwarded=None):
+        meta = {'HTTP_X_FORWARDED_FOR': forwarded} if forwarded is not None else {}
+        return RequestFactory().get('/', REMOTE_ADDR="10.0.0.254", **meta)
+
+    @override_settings(TRUSTED_PROXY_COUNT=0)
+    def test_without_proxy_uses_remote_addr(self):
+        """client_ip: without trusted proxies X-Forwarded-For is ignored"""
+        self.assertEqual(client_ip(self.request("203.0.113.9")), "10.0.0.254")
+
+    @override_settings(TRUSTED_PROXY_COUNT=1)
+    def test_forged_entries_are_skipped(self):
+        """client_ip: the address appended by the trusted proxy, not the ones sent by the client"""
+        self.assertEqual(client_ip(self.request("1.2.3.4, 203.0.113.9")), "203.0.113.9")
+        self.assertEqual(client_ip(self.request("203.0.113.9")), "203.0.113.9")
+
+    @override_settings(TRUSTED_PROXY_COUNT=2)
+    def test_chain_of_proxies(self):
+        """client_ip: with two proxies the address appended by the outer one"""
+        self.assertEqual(client_ip(self.request("1.2.3.4, 203.0.113.9, 10.0.0.7")), "203.0.113.9")
+
+    @override_settings(TRUSTED_PROXY_COUNT=1)
+    def test_missing_header_uses_remote_addr(self):
+        """client_ip: falls back to REMOTE_ADDR without X-Forwarded-For"""
+        self.assertEqual(client_ip(self.request()), "10.0.0.254")
@@ -0,0 +1,88 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from app_expenses.auth_backends import check_shared_auth_caches
+
+User = get_user_model()
+
+# one test process, so the default LocMemCache is shared here
+CACHED_AUTH = {'AUTH_USER_CACHE': 'default', 'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db'}
+
+class SessionQueryBudgetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="user1", email="user1@example.com", password="pass")
+
+    def warm_dashboard(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('dashboard'))
+
+    def test_default_reads_session_and_user(self):
+        """Sessions: by default the session and the user are read from the database"""
+        self.warm_dashboard()
+        with self.assertNumQueries(2):
+            self.client.get(reverse('dashboard'))
+
+    @override_settings(**CACHED_AUTH)
+    def test_cached_db_session_and_user_without_queries(self):
+        """Sessions: with cached_db and the user cache a warm authenticated request makes no query"""
+        self.warm_dashboard()
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(AUTH_USER_CACHE='default', SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_signed_cookie_session_without_queries(self):
+        """Sessions: with signed cookies and the user cache a warm authenticated request makes no query"""
+        self.warm_dashboard()
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(**CACHED_AUTH)
+    def test_password_change_logs_out(self):
+        """Sessions: a saved password change is seen by the next request despite the cached user"""
+        self.warm_dashboard()
+        self.user.set_password("new pass")
+        self.user.save()
+        response = self.client.get(reverse('dashboard'))
+        self.assertRedirects(response, f"{reverse('login')}?next={reverse('dashboard')}", fetch_redirect_response=False)
+
+    @override_settings(**CACHED_AUTH)
+    def test_deactivated_user_logs_out(self):
+        """Sessions: deactivating a user ends their sessions on the next request"""
+        self.warm_dashboard()
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(**CACHED_AUTH)
+    def test_deleted_user_logs_out(self):
+        """Sessions: a deleted user is not served from the cache"""
+        self.warm_dashboard()
+        self.user.delete()
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 302)
+
+class SharedAuthCacheCheckTest(TestCase):
+    def test_default_settings_pass(self):
+        """Check: the database backed defaults need no shared cache"""
+        self.assertEqual(check_shared_auth_caches(), [])
+
+    @override_settings(**CACHED_AUTH)
+    def test_per_process_cache_fails(self):
+        """Check: the user cache and cached_db sessions on a LocMemCache are errors"""
+        self.assertEqual([error.msg for error in check_shared_auth_caches()], [
+            "AUTH_USER_CACHE 'default' is a per-process LocMemCache.",
+            "SESSION_CACHE_ALIAS 'default' is a per-process LocMemCache.",
+        ])
+
+    @override_settings(AUTH_USER_CACHE='shared', CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'shared': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    })
+    def test_shared_cache_passes(self):
+        """Check: a cache backend outside the process passes"""
+        self.assertEqual(check_shared_auth_caches(), [])
@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.core.exceptions import ValidationError
+from django.contrib.auth import get_user_model
+from app_expenses.models import Currency, Category, Tag, DataVersion, catalog
+from app_expenses.utilities import get_currency_by_id, get_currency_list
+
+User = get_user_model()
+
+@override_settings(CATALOG_CHECK_INTERVAL=60)
+class CatalogTest(TestCase):
+    def setUp(self):
+        self.inr = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        Currency.objects.create(id="USD", symbol="$", name="US Dollar")
+        Category.objects.create(user=None, name="Food")
+        Tag.objects.create(user=None, name="Weekly")
+        # requests run outside of a transaction, unlike the tests
+        patcher = mock.patch('app_expenses.models.catalog.connection', SimpleNamespace(in_atomic_block=False))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(catalog.invalidate)
+
+    def test_lookups_are_served_from_memory(self):
+        """Catalog: once loaded, currency and predefined lookups run no query"""
+        get_currency_list()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_currency_by_id("INR"), self.inr)
+            self.assertEqual([currency.id for currency in get_currency_list()], ["INR", "USD"])
+            self.assertEqual(catalog.get_predefined_category(" food ").name, "Food")
+            self.assertEqual(catalog.get_predefined_tag("WEEKLY").name, "Weekly")
+
+    def test_invalid_currency_fails(self):
+        """Catalog: unknown currency id raises ValidationError"""
+        with self.assertRaisesMessage(ValidationError, "Currency ID: EUR is invalid!"):
+            get_currency_by_id("EUR")
+
+    def test_local_edit_is_seen_right_away(self):
+        """Catalog: currencies and predefined categories saved in this worker are seen on the next lookup"""
+        get_currency_list()
+        Currency.objects.create(id="EUR", symbol="€", name="Euro")
+        Category.objects.create(user=None, name="Bills")
+        self.assertEqual(get_currency_by_id("EUR").name, "Euro")
+        self.assertIsNotNone(catalog.get_predefined_category("bills"))
+
+    def test_other_worker_edit_is_seen_after_check_interval(self):
+        """Catalog: an edit made by another worker is picked up once the check interval passed"""
+        get_currency_list()
+        # another worker: the row and the catalog version change, this worker's catalog is not invalidated
+        Currency.objects.filter(pk="INR").update(name="Rupee")
+        DataVersion.objects.bump([DataVersion.CATALOG_KEY])
+        self.assertEqual(get_currency_by_id("INR").name, "Indian Rupee")
+        with override_settings(CATALOG_CHECK_INTERVAL=0):
+            self.assertEqual(get_currency_by_id("INR").name, "Rupee")
+
+    def test_category_clean_uses_catalog(self):
+        """Catalog: a user category cannot reuse a predefined name, checked without querying categories"""
+        user = User.objects.create(username="user1")
+        get_currency_list()
+        with self.assertRaisesMessage(ValidationError, "Predefined category with Name: 'FOOD' already exists."):
+            Category(user=user, name="FOOD").full_clean()
@@ -0,0 +1,129 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from django.test import TestCase
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from app_expenses.models import Transaction, FundAccount, Category, Currency, BalanceCheckpoint, TransactionType
+from app_expenses.services.fund_account_services.balance_history import balance_as_of, build_balance_checkpoints
+from app_expenses.custom_validators import today
+
+User = get_user_model()
+
+class BalanceHistoryTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user1")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        self.category = Category.objects.create(user=self.user, name="Food")
+        self.fund_account = FundAccount.objects.create(user=self.user, name="Bank", currency=self.currency, balance=1000)
+        # Jan: +500 -200, Feb: -100, Apr: +50  → 1250 now
+        for amount, trx_type, trx_date in [
+            (500, TransactionType.CREDIT, date(2024, 1, 10)),
+            (200, TransactionType.DEBIT, date(2024, 1, 31)),
+            (100, TransactionType.DEBIT, date(2024, 2, 15)),
+            (50, TransactionType.CREDIT, date(2024, 4, 2)),
+        ]:
+            self.create_transaction(amount, trx_type, trx_date)
+
+    def create_transaction(self, amount, trx_type, trx_date):
+        return Transaction.objects.create(
+            user=self.user, category=self.category, fund_account=self.fund_account,
+            amount=amount, type=trx_type, date=trx_date
+        )
+
+    def checkpoints(self):
+        return dict(BalanceCheckpoint.objects.filter(fund_account=self.fund_account).values_list('date', 'balance'))
+
+    def test_build_creates_month_end_checkpoints(self):
+        """Checkpoints: one closing balance per month end up to the last completed month"""
+        build_balance_checkpoints(self.fund_account, until=date(2024, 5, 20))
+        self.assertEqual(self.checkpoints(), {
+            date(2024, 1, 31): Decimal('1300'),
+            date(2024, 2, 29): Decimal('1200'),
+            date(2024, 3, 31): Decimal('1200'),
+            date(2024, 4, 30): Decimal('1250'),
+        })
+
+    def test_balance_as_of_without_checkpoints(self):
+        """Checkpoints: as-of falls back to walking back from the current balance"""
+        self.assertEqual(balance_as_of(self.fund_account, date(2024, 2, 20)), Decimal('1200'))
+        self.assertEqual(balance_as_of(self.fund_account, date(2023, 12, 31)), Decimal('1000'))
+
+    def test_balance_as_of_uses_nearest_checkpoint(self):
+        """Checkpoints: as-of is checkpoint + at most one month of transactions"""
+        build_balance_checkpoints(self.fund_account, until=date(2024, 5, 20))
+        for as_of_date, expected in [
+            (date(2024, 1, 9), Decimal('1000')),
+            (date(2024, 1, 10), Decimal('1500')),
+            (date(2024, 2, 14), Decimal('1300')),
+            (date(2024, 2, 15), Decimal('1200')),
+            (date(2024, 3, 31), Decimal('1200')),
+            (date(2024, 5, 1), Decimal('1250')),
+        ]:
+            self.assertEqual(balance_as_of(self.fund_account, as_of_date), expected, as_of_date)
+
+    def test_balance_as_of_query_count_is_bounded(self):
+        """Checkpoints: as-of between two checkpoints is three queries whatever the history size"""
+        build_balance_checkpoints(self.fund_account, until=date(2024, 5, 20))
+        with self.assertNumQueries(3):
+            balance_as_of(self.fund_account, date(2024, 2, 20))
+
+    def test_checkpoints_follow_transaction_create_and_update(self):
+        """Checkpoints: balance_updater shifts the checkpoints on or after the transaction date"""
+        build_balance_checkpoints(self.fund_account, until=date(2024, 5, 20))
+        trx = self.create_transaction(10, TransactionType.DEBIT, date(2024, 2, 1))
+        self.assertEqual(self.checkpoints()[date(2024, 1, 31)], Decimal('1300'))
+        self.assertEqual(self.checkpoints()[date(2024, 2, 29)], Decimal('1190'))
+
+        # move it to another month and flip it to a credit
+        trx.date = date(2024, 3, 5)
+        trx.type = TransactionType.CREDIT
+        trx.update_by(self.user)
+        self.assertEqual(self.checkpoints()[date(2024, 2, 29)], Decimal('1200'))
+        self.assertEqual(self.checkpoints()[date(2024, 3, 31)], Decimal('1210'))
+        self.assertEqual(self.checkpoints()[date(2024, 4, 30)], Decimal('1260'))
+
+        # move it to another fund account
+        wallet = FundAccount.objects.create(user=self.user, name="Wallet", currency=self.currency, balance=0)
+        trx.fund_account = wallet
+        trx.update_by(self.user)
+        self.assertEqual(self.checkpoints()[date(2024, 4, 30)], Decimal('1250'))
+
+        # checkpoints and the live computation agree
+        build_balance_checkpoints(self.fund_account, until=date(2024, 5, 20))
+        self.assertEqual(self.checkpoints()[date(2024, 4, 30)], Decimal('1250'))
+
+    def test_balance_correction_shifts_checkpoints(self):
+        """Checkpoints: correcting the balance by hand moves every closing balance by the correction"""
+        build_balance_checkpoints(self.fund_account, until=date(2024, 5, 20))
+        self.fund_account.correct_balance(1300)
+        self.fund_account.update_by(self.user)
+        self.assertEqual(self.checkpoints()[date(2024, 1, 31)], Decimal('1350'))
+        self.assertEqual(self.checkpoints()[date(2024, 4, 30)], Decimal('1300'))
+
+    def test_balance_as_of_builds_missing_month_ends(self):
+        """Checkpoints: as-of in a completed month after the latest checkpoint builds the missing ones"""
+        build_balance_checkpoints(self.fund_account, until=date(2024, 3, 20))
+        self.assertEqual(max(self.checkpoints()), date(2024, 2, 29))
+        self.assertEqual(balance_as_of(self.fund_account, date(2024, 4, 10)), Decimal('1250'))
+        checkpoints = self.checkpoints()
+        self.assertEqual(checkpoints[date(2024, 1, 31)], Decimal('1300'))
+        self.assertEqual(checkpoints[date(2024, 3, 31)], Decimal('1200'))
+        self.assertEqual(checkpoints[date(2024, 4, 30)], Decimal('1250'))
+        self.assertIn(today().replace(day=1) - timedelta(days=1), checkpoints)
+
+    def test_fix_rebuilds_checkpoints(self):
+        """Checkpoints: reconcile_balances --fix rebuilds the checkpoints of the fixed accounts"""
+        # drifted before the checkpoints were walked back from it
+        FundAccount.objects.filter(pk=self.fund_account.pk).update(balance=900)
+        build_balance_checkpoints(self.fund_account, until=date(2024, 5, 20))
+        self.assertEqual(self.checkpoints()[date(2024, 4, 30)], Decimal('900'))
+        call_command('reconcile_balances', '--fix', stdout=StringIO())
+        self.assertEqual(self.checkpoints()[date(2024, 4, 30)], Decimal('1250'))
+
+    def test_command_builds_checkpoints(self):
+        """build_balance_checkpoints: builds checkpoints of every fund account"""
+        out = StringIO()
+        call_command('build_balance_checkpoints', stdout=out)
+        self.assertIn("for 1 fund accounts", out.getvalue())
+        self.assertTrue(BalanceCheckpoint.objects.filter(fund_account=self.fund_account, date=date(2024, 1, 31)).exists())
@@ -0,0 +1,157 @@
+import json
+from io import StringIO
+from decimal import Decimal
+from datetime import date
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.core.management import call_command
+from django.core.exceptions import ValidationError
+from django.contrib.auth import get_user_model
+from app_expenses.models import Transaction, FundAccount, Category, Currency, TransactionType
+from app_expenses.services.fund_account_services.balance_reconciliation import backfill_opening_balances
+
+User = get_user_model()
+
+def run_reconcile(*args):
+    out = StringIO()
+    call_command('reconcile_balances', *args, stdout=out)
+    *rows, summary = [json.loads(line) for line in out.getvalue().splitlines()]
+    return rows, summary['summary']
+
+
+class OpeningBalanceTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user1")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+
+    def test_opening_balance_is_initial_balance(self):
+        """FundAccount: opening balance starts as the balance given on create"""
+        fund_account = FundAccount.objects.create(user=self.user, name="Bank", currency=self.currency, balance=750)
+        self.assertEqual(fund_account.opening_balance, 750)
+
+    def test_correct_balance_moves_opening_balance(self):
+        """FundAccount: correcting the balance by hand moves the opening balance by the same amount"""
+        fund_account = FundAccount.objects.create(user=self.user, name="Bank", currency=self.currency, balance=750)
+        fund_account.correct_balance("1000.50")
+        fund_account.update_by(self.user)
+        fund_account.refresh_from_db()
+        self.assertEqual(fund_account.opening_balance, Decimal('1000.50'))
+        self.assertEqual(run_reconcile()[1]['drifted'], 0)
+
+    def test_save_does_not_move_opening_balance(self):
+        """FundAccount: any other balance write is left to reconcile_balances as drift"""
+        fund_account = FundAccount.objects.create(user=self.user, name="Bank", currency=self.currency, balance=750)
+        fund_account.balance = 900
+        fund_account.save()
+        fund_account.refresh_from_db()
+        self.assertEqual(fund_account.opening_balance, 750)
+        rows, summary = run_reconcile()
+        self.assertEqual(Decimal(rows[0]['drift']), Decimal('150'))
+
+    def test_correct_balance_rejects_invalid_value(self):
+        """FundAccount: an invalid balance is reported on the balance field"""
+        fund_account = FundAccount.objects.create(user=self.user, name="Bank", currency=self.currency, balance=750)
+        with self.assertRaises(ValidationError) as ctx:
+            fund_account.correct_balance("abc")
+        self.assertIn('balance', ctx.exception.message_dict)
+
+
+class OpeningBalanceBackfillTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user1")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        category = Category.objects.create(user=self.user, name="Food")
+        self.fund_account = FundAccount.objects.create(user=self.user, name="Bank", currency=self.currency, balance=100)
+        Transaction.objects.create(user=self.user, category=category, fund_account=self.fund_account, amount=70, type=TransactionType.CREDIT, date=date(2025, 1, 1))
+        Transaction.objects.create(user=self.user, category=category, fund_account=self.fund_account, amount=20, type=TransactionType.DEBIT, date=date(2025, 1, 2))
+        # an account created before opening_balance existed, whose balance was also edited by hand
+        FundAccount.objects.filter(pk=self.fund_account.pk).update(opening_balance=None, balance=200)
+
+    def test_fix_leaves_unset_opening_balance_alone(self):
+        """reconcile_balances: --fix reports accounts without an opening balance but does not touch them"""
+        rows, summary = run_reconcile('--fix')
+        self.assertEqual(summary['fixed'], 0)
+        self.assertIsNone(rows[0]['expected'])
+        self.fund_account.refresh_from_db()
+        self.assertEqual(self.fund_account.balance, 200)
+
+    def test_backfill_keeps_stored_balance(self):
+        """backfill_opening_balances: opening balance becomes balance - (credits - debits)"""
+        backfill_opening_balances()
+        self.fund_account.refresh_from_db()
+        self.assertEqual(self.fund_account.opening_balance, 150)
+        self.assertEqual(self.fund_account.balance, 200)
+        self.assertEqual(run_reconcile()[1]['drifted'], 0)
+
+    def test_adopt_balances_sets_unset_opening_balance(self):
+        """reconcile_balances: --adopt-balances sets a missing opening balance from the stored balance"""
+        run_reconcile('--adopt-balances')
+        self.fund_account.refresh_from_db()
+        self.assertEqual(self.fund_account.opening_balance, 150)
+
+
+class ReconcileBalancesTest(TestCase):
+    def setUp(self):
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        self.accounts = []
+        for i in range(5):
+            user = User.objects.create(username=f"user{i}")
+            category = Category.objects.create(user=user, name="Food")
+            fund_account = FundAccount.objects.create(user=user, name="Bank", currency=self.currency, balance=100)
+            for trx_type in (TransactionType.CREDIT, TransactionType.DEBIT, TransactionType.CREDIT):
+                Transaction.objects.create(user=user, category=category, fund_account=fund_account, amount=40, type=trx_type, date=date(2025, 1, 1))
+            self.accounts.append(fund_account)
+        # drift two accounts behind the app's back
+        FundAccount.objects.filter(pk=self.accounts[1].pk).update(balance=90)
+        Transaction.objects.filter(fund_account=self.accounts[3], type=TransactionType.DEBIT).delete()
+
+    def test_dry_run_reports_drift_without_writing(self):
+        """reconcile_balances: dry run emits one JSON line per drifted account"""
+        rows, summary = run_reconcile('--chunk-size', '2')
+        self.assertEqual(summary, {'mode': 'dry_run', 'checked_users': 5, 'drifted': 2, 'fixed': 0})
+        drift = {row['fund_account']: row for row in rows}
+        self.assertEqual(Decimal(drift[str(self.accounts[1].pk)]['drift']), Decimal('-50'))
+        self.assertEqual(Decimal(drift[str(self.accounts[3].pk)]['expected']), Decimal('180'))
+        self.assertFalse(any(row['fixed'] for row in rows))
+        self.accounts[1].refresh_from_db()
+        self.assertEqual(self.accounts[1].balance, 90)
+
+    def test_fix_writes_expected_balance(self):
+        """reconcile_balances: --fix sets drifted balances to opening balance + credits - debits"""
+        rows, summary = run_reconcile('--fix')
+        self.assertEqual(summary['fixed'], 2)
+        for fund_account in self.accounts:
+            fund_account.refresh_from_db()
+            self.assertEqual(fund_account.balance, Decimal('140') if fund_account != self.accounts[3] else Decimal('180'))
+        self.assertEqual(run_reconcile()[1]['drifted'], 0)
+
+    def test_adopt_balances_keeps_balance(self):
+        """reconcile_balances: --adopt-balances moves the drift into the opening balance"""
+        run_reconcile('--adopt-balances')
+        self.accounts[1].refresh_from_db()
+        self.assertEqual(self.accounts[1].balance, 90)
+        self.assertEqual(self.accounts[1].opening_balance, 50)
+        self.assertEqual(run_reconcile()[1]['drifted'], 0)
+
+    def test_grouped_queries_per_chunk(self):
+        """reconcile_balances: two queries per chunk of users, whatever the number of transactions"""
+        # user ids + 3 chunks x (grouped aggregate + fund accounts)
+        with self.assertNumQueries(7):
+            run_reconcile('--chunk-size', '2')
+
+
+class ReconcileBalancesProcessPoolTest(TransactionTestCase):
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("Needs a test database that can be shared between processes.")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        for i in range(6):
+            user = User.objects.create(username=f"user{i}")
+            FundAccount.objects.create(user=user, name="Bank", currency=self.currency, balance=100)
+        FundAccount.objects.filter(user__username="user4").update(balance=1)
+
+    def test_workers_reconcile_all_chunks(self):
+        """reconcile_balances: chunks spread over a process pool give the same result"""
+        rows, summary = run_reconcile('--fix', '--workers', '3', '--chunk-size', '2')
+        self.assertEqual(summary, {'mode': 'fix', 'checked_users': 6, 'drifted': 1, 'fixed': 1})
+        self.assertEqual(FundAccount.objects.get(user__username="user4").balance, 100)
@@ -0,0 +1,142 @@
+from types import SimpleNamespace
+from django.test import TestCase
+from django.db import connection, IntegrityError, transaction as db_transaction
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from app_expenses.models import Category, Tag, FundAccount, Currency, Report, Shortcut, catalog
+from app_expenses.models.constraint_errors import violated_constraint
+
+User = get_user_model()
+
+def postgres_error(constraint_name, message_detail=None):
+    # as raised by Django for psycopg: the driver error, with its diagnostics, is the cause
+    error = IntegrityError(f'duplicate key value violates unique constraint "{constraint_name}"')
+    error.__cause__ = Exception(str(error))
+    error.__cause__.diag = SimpleNamespace(constraint_name=constraint_name, message_detail=message_detail)
+    return error
+
+class ConstraintFirstSaveTest(TestCase):
+    def setUp(self):
+        self.user1 = User.objects.create(username="user1")
+        self.user2 = User.objects.create(username="user2")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        self.category = Category.objects.create(user=self.user1, name="Food")
+
+    def test_create_by_does_not_query_for_duplicates(self):
+        """Constraint first: create_by leaves the name check to the unique constraint"""
+        # the predefined names come from the catalog, loaded once per process
+        catalog.get_predefined_category("Gym")
+        with CaptureQueriesContext(connection) as queries:
+            Category(user=self.user1, name="Gym").create_by(self.user1)
+        selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT') and '"app_expenses_category"' in query['sql']]
+        self.assertEqual(selects, [])
+
+    def test_create_by_duplicate_name_fails_with_field_error(self):
+        """Constraint first: a duplicate name (case-insensitive) fails with the pre-check's field error"""
+        duplicate = Category(user=self.user1, name="FOOD")
+        with self.assertRaises(ValidationError) as error:
+            duplicate.create_by(self.user1)
+        self.assertEqual(error.exception.message_dict, {'name': ["Category with Name: 'FOOD' already exists."]})
+        self.assertEqual(Category.objects.filter(user=self.user1).count(), 1)
+
+    def test_create_by_duplicate_name_other_user_success(self):
+        """Constraint first: the same name is allowed for another user"""
+        Category(user=self.user2, name="Food").create_by(self.user2)
+        self.assertEqual(Category.objects.filter(name="Food").count(), 2)
+
+    def test_update_by_to_duplicate_name_fails(self):
+        """Constraint first: renaming to a taken name fails and keeps the stored name"""
+        category = Category.objects.create(user=self.user1, name="Gym")
+        category.name = "food"
+        with self.assertRaisesMessage(ValidationError, "Category with Name: 'food' already exists."):
+            category.update_by(self.user1)
+        category.refresh_from_db()
+        self.assertEqual(category.name, "Gym")
+
+    def test_rejected_save_keeps_transaction_usable(self):
+        """Constraint first: a rejected row does not break the caller's database transaction"""
+        with db_transaction.atomic():
+            with self.assertRaises(ValidationError):
+                Tag(user=self.user1, name="Trip").create_by(self.user1)
+                Tag(user=self.user1, name="trip").create_by(self.user1)
+            Tag(user=self.user1, name="Work").create_by(self.user1)
+        self.assertEqual(set(Tag.objects.filter(user=self.user1).values_list('name', flat=True)), {"Trip", "Work"})
+
+    def test_duplicate_errors_of_each_model(self):
+        """Constraint first: every name constraint reports its model's field error"""
+        FundAccount.objects.create(user=self.user1, name="Wallet", currency=self.currency)
+        Tag.objects.create(user=self.user1, name="Trip")
+        Report.objects.create(user=self.user1, year=2025, month=10)
+        cases = [
+            (FundAccount(user=self.user1, name="wallet", currency=self.currency), 'name', "Fund account with Name: 'wallet' already exists."),
+            (Tag(user=self.user1, name="TRIP"), 'name', "Tag with Name: 'TRIP' already exists."),
+            (Report(user=self.user1, year=2025, month=10), 'month', "Report with Month Year: 'October, 2025' already exists."),
+        ]
+        for obj, field, message in cases:
+            with self.subTest(model=obj.__class__.__name__):
+                with self.assertRaises(ValidationError) as error:
+                    obj.create_by(self.user1)
+                self.assertEqual(error.exception.message_dict, {field: [message]})
+
+    def test_full_clean_still_checks_duplicates(self):
+        """Constraint first: full_clean (forms, admin) keeps checking uniqueness with a query"""
+        with self.assertRaisesMessage(ValidationError, "Category with Name: 'food' already exists."):
+            Category(user=self.user1, name="food").full_clean()
+        Shortcut.objects.create(user=self.user1, name="Coffee")
+        with self.assertRaisesMessage(ValidationError, "Shortcut with Name: 'COFFEE' already exists."):
+            Shortcut(user=self.user1, name="COFFEE").full_clean()
+
+class ViolatedConstraintTest(TestCase):
+    def setUp(self):
+        self.user1 = User.objects.create(username="user1")
+
+    def database_error(self, model, **values):
+        model.objects.create(**values)
+        try:
+            with db_transaction.atomic():
+                model.objects.create(**values)
+        except IntegrityError as error:
+            return error
+        self.fail("duplicate row was not rejected")
+
+    def test_database_error_names_expression_constraint(self):
+        """violated_constraint: finds the Lower('name') constraint from the backend's error"""
+        error = self.database_error(Category, user=self.user1, name="Food")
+        self.assertEqual(violated_constraint(Category, error).name, 'unique_category_per_user')
+
+    def test_database_error_names_column_constraint(self):
+        """violated_constraint: finds a unique constraint on columns from the backend's error"""
+        error = self.database_error(Report, user=self.user1, year=2025, month=10)
+        self.assertEqual(violated_constraint(Report, error).name, 'unique_report_per_user_month')
+
+    def test_database_error_separate_currency_constraints(self):
+        """violated_constraint: currency symbol and name are unique on their own"""
+        Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        for values, name in (({'id': "XYZ", 'symbol': "₹", 'name': "Other"}, 'unique_currency_symbol_ci'),
+                             ({'id': "XYZ", 'symbol': "X", 'name': "indian rupee"}, 'unique_currency_name_ci')):
+            with self.assertRaises(IntegrityError) as error, db_transaction.atomic():
+                Currency.objects.create(**values)
+            self.assertEqual(violated_constraint(Currency, error.exception).name, name)
+
+    def test_sqlite_messages(self):
+        """violated_constraint: reads SQLite's index, check constraint and column messages"""
+        cases = [
+            (Category, "UNIQUE constraint failed: index 'unique_category_per_user'", 'unique_category_per_user'),
+            (Shortcut, "CHECK constraint failed: positive_amount", 'positive_amount'),
+            (Report, "UNIQUE constraint failed: app_expenses_report.user_id, app_expenses_report.year, app_expenses_report.month", 'unique_report_per_user_month'),
+        ]
+        for model, message, name in cases:
+            with self.subTest(message=message):
+                self.assertEqual(violated_constraint(model, IntegrityError(message)).name, name)
+
+    def test_postgres_diagnostics(self):
+        """violated_constraint: reads PostgreSQL's constraint name, or the key columns of the detail"""
+        self.assertEqual(violated_constraint(Category, postgres_error('unique_category_per_user')).name, 'unique_category_per_user')
+        error = postgres_error('app_expenses_report_user_id_year_month_uniq', 'Key (user_id, year, month)=(1, 2025, 10) already exists.')
+        self.assertEqual(violated_constraint(Report, error).name, 'unique_report_per_user_month')
+
+    def test_unknown_constraint(self):
+        """violated_constraint: None for an error of another constraint"""
+        self.assertIsNone(violated_constraint(Category, IntegrityError("NOT NULL constraint failed: app_expenses_category.name")))
+        self.assertIsNone(violated_constraint(Category, postgres_error('app_expenses_category_pkey', 'Key (id)=(x) already exists.')))
@@ -0,0 +1,97 @@
+from datetime import date
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from app_expenses.models import DataVersion, Category, FundAccount, Currency, Transaction, TransactionType
+
+User = get_user_model()
+
+class DataVersionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user1", password="pass")
+        self.other_user = User.objects.create_user(username="user2", password="pass")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        self.fund_account = FundAccount.objects.create(user=self.user, name="Wallet", balance=1000, currency=self.currency)
+        self.category = Category.objects.create(user=self.user, name="Food")
+
+    def version(self, user=None):
+        return DataVersion.objects.current(DataVersion.user_key((user or self.user).pk))[0]
+
+    def create_trx(self, amount=10):
+        return Transaction(user=self.user, category=self.category, fund_account=self.fund_account, amount=amount, date=date(2025, 1, 5), type=TransactionType.DEBIT).create_by(self.user)
+
+    def login(self, username):
+        # the login form sets the CSRF cookie, as it does in the browser
+        self.client.get(reverse('login'))
+        self.client.login(username=username, password="pass")
+
+    def get(self, name, etag=None, **params):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(reverse(name), params, **headers)
+
+    def test_bump_creates_and_increments(self):
+        """DataVersion: the first bump creates the row, later bumps increment it"""
+        self.assertEqual(self.version(), 0)
+        DataVersion.objects.bump_users([self.user.pk])
+        DataVersion.objects.bump_users([self.user.pk, self.other_user.pk])
+        self.assertEqual((self.version(), self.version(self.other_user)), (2, 1))
+
+    def test_owned_writes_bump_version(self):
+        """DataVersion: create_by, update_by and delete_by bump the owner's version once each"""
+        category = Category(user=self.user, name="Travel").create_by(self.user)
+        category.name = "Trips"
+        category.update_by(self.user)
+        category.delete_by(self.user)
+        self.assertEqual((self.version(), self.version(self.other_user)), (3, 0))
+
+    def test_transaction_writes_bump_version_once(self):
+        """DataVersion: a transaction save bumps once, through its signal"""
+        trx = self.create_trx()
+        self.assertEqual(self.version(), 1)
+        trx.tags.set([])
+        Transaction.objects.filter(pk=trx.pk).get().delete()
+        self.assertEqual(self.version(), 2)
+
+    def test_unchanged_list_answers_not_modified(self):
+        """Conditional GET: an unchanged list answers 304 with only the session, user and version queries"""
+        self.login("user1")
+        for name in ('transactions', 'fund_accounts', 'categories', 'report'):
+            response = self.get(name)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('private', response['Cache-Control'])
+            with self.assertNumQueries(3):
+                self.assertEqual(self.get(name, response["ETag"]).status_code, 304, name)
+
+    def test_change_invalidates_etag(self):
+        """Conditional GET: a write renders the list again"""
+        self.login("user1")
+        etag = self.get('transactions')['ETag']
+        self.create_trx()
+        response = self.get('transactions', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_currency_change_invalidates_etag(self):
+        """Conditional GET: editing a currency renders the fund account list again"""
+        self.login("user1")
+        etag = self.get('fund_accounts')['ETag']
+        self.currency.symbol = "Rs"
+        self.currency.save()
+        response = self.get('fund_accounts', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Rs")
+
+    def test_etag_is_per_user(self):
+        """Conditional GET: another user with the same version does not get a 304"""
+        self.login("user1")
+        etag = self.get('categories')['ETag']
+        self.login("user2")
+        self.assertEqual(self.get('categories', etag).status_code, 200)
+
+    def test_report_csv_download_is_conditional(self):
+        """Conditional GET: the monthly CSV download answers 304 while the data is unchanged"""
+        self.create_trx()
+        self.login("user1")
+        response = self.get('report', month='2025-01')
+        self.assertEqual(response['Content-Disposition'], "attachment; filename=Jan2025_transations.csv")
+        self.assertEqual(self.get('report', response['ETag'], month='2025-01').status_code, 304)
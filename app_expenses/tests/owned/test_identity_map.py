@@ -0,0 +1,52 @@
+from datetime import date
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from app_expenses.models import Transaction, TransactionType, FundAccount, Category, Currency, identity_map
+from app_expenses.models.identity_map import identity_map_scope
+from app_expenses.utilities import get_fund_account_by_id, get_category_by_id
+
+User = get_user_model()
+
+class IdentityMapTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user1")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        self.fund_account = FundAccount.objects.create(user=self.user, name="Wallet", balance=1000, currency=self.currency)
+        self.category = Category.objects.create(user=self.user, name="Food")
+
+    def test_outside_scope_every_lookup_queries(self):
+        """Identity map: without a scope nothing is kept"""
+        with self.assertNumQueries(2):
+            FundAccount.get_for_user(requested_user=self.user, id=self.fund_account.pk)
+            FundAccount.get_for_user(requested_user=self.user, id=self.fund_account.pk)
+
+    def test_object_is_loaded_once_per_scope(self):
+        """Identity map: get_for_user and get_*_by_id share one loaded object"""
+        with identity_map_scope():
+            with self.assertNumQueries(1):
+                fund_account = FundAccount.get_for_user(requested_user=self.user, id=self.fund_account.pk)
+                self.assertIs(get_fund_account_by_id(str(self.fund_account.pk)), fund_account)
+        self.assertIsNone(identity_map.get(FundAccount, self.fund_account.pk))
+
+    def test_transaction_clean_uses_loaded_owners(self):
+        """Identity map: Transaction.clean checks owners of loaded fund account and category without queries"""
+        with identity_map_scope():
+            trx = Transaction(user=self.user, fund_account=get_fund_account_by_id(self.fund_account.pk), category=get_category_by_id(self.category.pk), amount=10, date=date(2025, 1, 5), type=TransactionType.DEBIT)
+            # user, category and fund account exist (field validation), unique id, 2 x (savepoint, check constraint, release)
+            with self.assertNumQueries(10):
+                trx.full_clean()
+
+    def test_deleted_object_is_not_found(self):
+        """Identity map: delete_by removes the object from the map"""
+        with identity_map_scope():
+            category = Category.get_for_user(requested_user=self.user, id=self.category.pk)
+            category.delete_by(self.user)
+            with self.assertRaises(Category.DoesNotExist):
+                Category.get_for_user(requested_user=self.user, id=self.category.pk)
+
+    def test_balance_change_updates_loaded_fund_account(self):
+        """Identity map: a transaction saved in the scope updates the balance of the loaded fund account"""
+        with identity_map_scope():
+            fund_account = get_fund_account_by_id(self.fund_account.pk)
+            Transaction(user=self.user, fund_account=FundAccount.objects.get(pk=self.fund_account.pk), category=self.category, amount=300, date=date(2025, 1, 5), type=TransactionType.DEBIT).create_by(self.user)
+            self.assertEqual(fund_account.balance, 700)
@@ -1,4 +1,6 @@
 from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.core.exceptions import PermissionDenied
 from app_expenses.models import Category  # or any model inheriting OwnedModel
@@ -71,6 +73,31 @@ class OwnedModelTest(TestCase):
         result = self.owned.update_by(self.user1)
         self.assertEqual(result.name, "Updated")
 
+    def test_update_by_checks_owner_in_update(self):
+        """update_by: the owner is part of the UPDATE, the row is not read to check it"""
+        self.owned.name = "Updated"
+        with CaptureQueriesContext(connection) as queries:
+            self.owned.update_by(self.user1)
+        category_queries = [query['sql'] for query in queries if '"app_expenses_category"' in query['sql'] and 'SELECT "app_expenses_category"."user_id"' in query['sql']]
+        self.assertEqual(category_queries, [])
+        update = next(query['sql'] for query in queries if query['sql'].startswith('UPDATE "app_expenses_category"'))
+        self.assertIn('"user_id" = %s' % self.user1.pk, update)
+
+    def test_update_by_on_row_moved_to_other_user_fails(self):
+        """update_by: fails when the stored row belongs to another user, even if the loaded copy does not"""
+        Category.objects.filter(pk=self.owned.pk).update(user=self.user2)
+        self.owned.name = "Updated"
+        with self.assertRaises(PermissionDenied):
+            self.owned.update_by(self.user1)
+        self.assertEqual(Category.objects.get(pk=self.owned.pk).name, "Owned")
+
+    def test_update_by_on_deleted_row_fails(self):
+        """update_by: fails with DoesNotExist when the row was deleted meanwhile"""
+        Category.objects.filter(pk=self.owned.pk).delete()
+        with self.assertRaises(Category.DoesNotExist):
+            self.owned.update_by(self.user1)
+        self.assertFalse(Category.objects.filter(pk=self.owned.pk).exists())
+
     # ------------- get_for_user() tests --------------
 
     def test_get_for_user_without_requested_user_fails(self):
@@ -93,6 +120,24 @@ class OwnedModelTest(TestCase):
         with self.assertRaises(PermissionDenied):
             Category.get_for_user(self.user2, self.owned.pk)
 
+    def test_get_for_user_on_missing_object_fails(self):
+        """get_for_user: fails with DoesNotExist for an unknown id"""
+        pk = self.owned.pk
+        self.owned.delete()
+        with self.assertRaises(Category.DoesNotExist):
+            Category.get_for_user(self.user1, pk)
+
+    def test_get_for_user_reads_owned_row_in_one_query(self):
+        """get_for_user: the owner check is part of the lookup query"""
+        with self.assertNumQueries(1):
+            Category.get_for_user(self.user1, self.owned.pk)
+
+    def test_for_user_filters_owned_rows(self):
+        """for_user: owned rows, with include_predefined the predefined ones too"""
+        self.assertEqual(list(Category.objects.for_user(self.user1)), [self.owned])
+        self.assertEqual(set(Category.objects.for_user(self.user1, include_predefined=True)), {self.owned, self.predefined})
+        self.assertEqual(list(Category.objects.for_user(self.user2)), [])
+
     # ------------- delete_by() tests --------------
 
     def test_delete_by_without_requested_user_fails(self):
@@ -119,6 +164,13 @@ class OwnedModelTest(TestCase):
         with self.assertRaises(PermissionDenied):
             self.owned.delete_by(self.user2)
 
+    def test_delete_by_on_row_moved_to_other_user_fails(self):
+        """delete_by: fails when the stored row belongs to another user and leaves it in place"""
+        Category.objects.filter(pk=self.owned.pk).update(user=self.user2)
+        with self.assertRaises(PermissionDenied):
+            self.owned.delete_by(self.user1)
+        self.assertTrue(Category.objects.filter(pk=self.owned.pk).exists())
+
     def test_delete_by_on_predefined_object_fails(self):
         """delete_by: fails when object has no owner (predefined data)"""
         with self.assertRaises(PermissionDenied):
@@ -0,0 +1,53 @@
+import csv
+from datetime import date
+from django.test import TestCase
+from django.urls import reverse
+from django.http import StreamingHttpResponse
+from django.contrib.auth import get_user_model
+from app_expenses.models import Transaction, TransactionType, FundAccount, Category, Currency, Tag
+from app_expenses.utilities import monthly_report_csv, MONTHLY_REPORT_CSV_COLUMNS
+
+User = get_user_model()
+
+class MonthlyReportCsvTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user1", password="pass")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        self.fund_account = FundAccount.objects.create(user=self.user, name="Wallet", balance=100000, currency=self.currency)
+        self.category = Category.objects.create(user=self.user, name="Food")
+        self.tags = [Tag.objects.create(user=self.user, name=name) for name in ("Groceries", "Weekly")]
+        for day in range(1, 29):
+            trx = Transaction.objects.create(user=self.user, category=self.category, amount=day, fund_account=self.fund_account, date=date(2025, 10, day), type=TransactionType.DEBIT)
+            trx.tags.set(self.tags)
+        self.trx_list = Transaction.objects.filter(user=self.user)
+
+    def read_rows(self, trx_list, chunk_size=2000):
+        return list(csv.reader(monthly_report_csv(trx_list, chunk_size=chunk_size)))
+
+    def test_csv_rows_include_related_names_and_tags(self):
+        """Report CSV: every row has fund account, category and its tags joined with '|'"""
+        rows = self.read_rows(self.trx_list)
+        self.assertEqual(rows[0], MONTHLY_REPORT_CSV_COLUMNS)
+        self.assertEqual(len(rows), 29)
+        row = dict(zip(rows[0], rows[1]))
+        self.assertEqual((row['currency'], row['fund_account_name'], row['category_name']), ("INR", "Wallet", "Food"))
+        self.assertEqual(sorted(row['tags'].split('|')), ["Groceries", "Weekly"])
+
+    def test_csv_queries_grow_with_chunks_not_rows(self):
+        """Report CSV: one chunked transaction query and one tags query per chunk"""
+        with self.assertNumQueries(1 + 3):
+            self.read_rows(self.trx_list, chunk_size=10)
+
+    def test_csv_without_fund_account_or_category(self):
+        """Report CSV: transactions whose fund account or category was deleted are exported with blank columns"""
+        self.category.delete()
+        row = dict(zip(MONTHLY_REPORT_CSV_COLUMNS, self.read_rows(self.trx_list)[1]))
+        self.assertEqual((row['category_id'], row['category_name'], row['fund_account_name']), ("", "", "Wallet"))
+
+    def test_report_view_streams_csv(self):
+        """Report CSV: the report view answers with a streaming attachment"""
+        self.client.login(username="user1", password="pass")
+        response = self.client.post(reverse('report'), {'month': '2025-10'})
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response['Content-Disposition'], "attachment; filename=Oct2025_transations.csv")
+        self.assertEqual(len(b"".join(response.streaming_content).decode().splitlines()), 29)
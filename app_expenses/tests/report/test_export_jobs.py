@@ -0,0 +1,191 @@
+import csv
+import gzip
+import shutil
+import zipfile
+import tempfile
+from pathlib import Path
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.core.management import call_command
+from django.urls import reverse
+from django.core.exceptions import ValidationError
+from django.contrib.auth import get_user_model
+from app_expenses.models import Transaction, TransactionType, FundAccount, Category, Currency, ExportJob, ExportStatus, ExportCompression
+from app_expenses.services.export_services import export_jobs
+
+User = get_user_model()
+
+class ExportJobTest(TestCase):
+    def setUp(self):
+        self.export_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.export_root, ignore_errors=True)
+        settings_override = override_settings(EXPORT_ROOT=self.export_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username="user1", password="pass")
+        self.other_user = User.objects.create_user(username="user2", password="pass")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        self.fund_account = FundAccount.objects.create(user=self.user, name="Wallet", balance=100000, currency=self.currency)
+        self.category = Category.objects.create(user=self.user, name="Food")
+        with self.captureOnCommitCallbacks(execute=True):
+            for month in (1, 2, 3):
+                Transaction.objects.create(user=self.user, category=self.category, amount=month, fund_account=self.fund_account, date=date(2025, month, 10), type=TransactionType.DEBIT)
+
+    def submit(self, compression=ExportCompression.NONE, date_from=date(2025, 1, 1), date_to=date(2025, 2, 28)):
+        # the worker pool is not used in tests, jobs are run directly
+        with self.captureOnCommitCallbacks():
+            return export_jobs.submit_export(self.user, date_from, date_to, compression)
+
+    def run_job(self, job):
+        export_jobs.run_export_job(job.pk)
+        job.refresh_from_db()
+        return job
+
+    def read_rows(self, job):
+        path = export_jobs.export_file_path(job)
+        if job.compression == ExportCompression.GZIP:
+            with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+                return list(csv.reader(f))
+        if job.compression == ExportCompression.ZIP:
+            with zipfile.ZipFile(path) as archive:
+                return list(csv.reader(archive.read('transactions.csv').decode().splitlines()))
+        with open(path, encoding='utf-8', newline='') as f:
+            return list(csv.reader(f))
+
+    def test_export_writes_date_range(self):
+        """Export job: the file holds the transactions of the requested range"""
+        job = self.run_job(self.submit())
+        self.assertEqual(job.status, ExportStatus.DONE)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(len(self.read_rows(job)), 3)
+
+    def test_compressed_exports(self):
+        """Export job: gzip and zip files contain the same CSV"""
+        for compression in (ExportCompression.GZIP, ExportCompression.ZIP):
+            job = self.run_job(self.submit(compression))
+            self.assertTrue(job.file_path.endswith(('.csv.gz', '.zip')))
+            self.assertEqual(len(self.read_rows(job)), 3)
+
+    def test_identical_request_is_deduplicated(self):
+        """Export job: an identical pending or done export is returned instead of a new one"""
+        job = self.submit()
+        self.assertEqual(self.submit().pk, job.pk)
+        self.run_job(job)
+        self.assertEqual(self.submit().pk, job.pk)
+        self.assertNotEqual(self.submit(ExportCompression.GZIP).pk, job.pk)
+        self.assertEqual(ExportJob.objects.count(), 2)
+
+    def test_lapsed_job_is_replaced(self):
+        """Export job: a pending or running job past EXPORT_JOB_TIMEOUT fails and an identical request replaces it"""
+        long_ago = timezone.now() - timedelta(days=30)
+        for status in (ExportStatus.PENDING, ExportStatus.RUNNING):
+            with self.subTest(status=status):
+                job = self.submit()
+                ExportJob.objects.filter(pk=job.pk).update(status=status, created_at=long_ago, started_at=long_ago if status == ExportStatus.RUNNING else None)
+                new_job = self.submit()
+                self.assertNotEqual(new_job.pk, job.pk)
+                self.assertEqual(new_job.status, ExportStatus.PENDING)
+
+    def test_running_job_within_timeout_is_reused(self):
+        """Export job: a running job started recently is returned, even when it was queued long ago"""
+        job = self.submit()
+        ExportJob.objects.filter(pk=job.pk).update(status=ExportStatus.RUNNING, created_at=timezone.now() - timedelta(days=1), started_at=timezone.now())
+        self.assertEqual(self.submit().pk, job.pk)
+
+    def test_cleanup_command(self):
+        """cleanup_exports: fails orphaned jobs and deletes the files of expired exports"""
+        expired = self.run_job(self.submit())
+        path = export_jobs.export_file_path(expired)
+        ExportJob.objects.filter(pk=expired.pk).update(status=ExportStatus.EXPIRED)
+        pending = self.submit(ExportCompression.GZIP)
+        out = StringIO()
+        call_command('cleanup_exports', stdout=out)
+        self.assertIn("Failed 0 export jobs, deleted 1 export files.", out.getvalue())
+        self.assertFalse(path.exists())
+        expired.refresh_from_db()
+        self.assertEqual(expired.file_path, '')
+
+        call_command('cleanup_exports', orphaned=True, stdout=out)
+        pending.refresh_from_db()
+        self.assertEqual((pending.status, pending.error), (ExportStatus.FAILED, export_jobs.LAPSED_EXPORT_ERROR))
+
+    def test_submit_runs_job_on_commit(self):
+        """Export job: the job is handed to the worker pool once the request commits"""
+        with mock.patch.object(export_jobs, '_get_executor') as get_executor:
+            with self.captureOnCommitCallbacks(execute=True):
+                job = export_jobs.submit_export(self.user, date(2025, 1, 1), date(2025, 1, 31))
+        get_executor.return_value.submit.assert_called_once_with(export_jobs._run_in_worker, job.pk)
+
+    def test_transaction_change_expires_export(self):
+        """Export job: changing a transaction in the range expires the export, a new request replaces it"""
+        job = self.run_job(self.submit())
+        old_path = export_jobs.export_file_path(job)
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(user=self.user, category=self.category, amount=7, fund_account=self.fund_account, date=date(2025, 2, 20), type=TransactionType.DEBIT)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportStatus.EXPIRED)
+
+        new_job = self.run_job(self.submit())
+        self.assertNotEqual(new_job.pk, job.pk)
+        self.assertFalse(old_path.exists())
+        self.assertEqual(len(self.read_rows(new_job)), 4)
+
+    def test_change_outside_range_keeps_export(self):
+        """Export job: a transaction outside the range leaves the export cached"""
+        job = self.run_job(self.submit())
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(user=self.user, category=self.category, amount=7, fund_account=self.fund_account, date=date(2025, 3, 20), type=TransactionType.DEBIT)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportStatus.DONE)
+
+    def test_renaming_category_expires_export(self):
+        """Export job: renaming a category expires the user's exports"""
+        job = self.run_job(self.submit())
+        self.category.name = "Groceries"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.save()
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportStatus.EXPIRED)
+
+    def test_failed_export_records_error(self):
+        """Export job: an error while writing marks the job failed and leaves no file"""
+        def failing_rows(trx_list):
+            yield "id,amount\r\n"
+            raise OSError("disk full")
+        job = self.submit()
+        with mock.patch.object(export_jobs, 'monthly_report_csv', failing_rows):
+            job = self.run_job(job)
+        self.assertEqual((job.status, job.error), (ExportStatus.FAILED, "disk full"))
+        self.assertEqual([path for path in Path(self.export_root).rglob('*') if path.is_file()], [])
+
+    def test_invalid_range_fails(self):
+        """Export job: end date before start date raises ValidationError"""
+        with self.assertRaises(ValidationError):
+            self.submit(date_from=date(2025, 2, 1), date_to=date(2025, 1, 1))
+
+    def test_views_submit_poll_and_download(self):
+        """Export views: submit, poll the status and download the finished file"""
+        self.client.login(username="user1", password="pass")
+        with self.captureOnCommitCallbacks():
+            response = self.client.post(reverse('exports'), {'date_from': '2025-01-01', 'date_to': '2025-03-31', 'compression': 'none'})
+        self.assertRedirects(response, reverse('exports'))
+        job = ExportJob.objects.get(user=self.user)
+        self.assertEqual(self.client.get(reverse('export_status', args=[job.pk])).json()['status'], ExportStatus.PENDING)
+
+        self.run_job(job)
+        status = self.client.get(reverse('export_status', args=[job.pk])).json()
+        self.assertEqual(status['download_url'], reverse('export_download', args=[job.pk]))
+        response = self.client.get(status['download_url'])
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="transactions_2025-01-01_2025-03-31.csv"')
+        self.assertEqual(len(b"".join(response.streaming_content).decode().splitlines()), 4)
+
+    def test_other_user_cannot_read_export(self):
+        """Export views: another user gets no status and no download"""
+        job = self.run_job(self.submit())
+        self.client.login(username="user2", password="pass")
+        self.assertEqual(self.client.get(reverse('export_status', args=[job.pk])).status_code, 403)
+        self.assertRedirects(self.client.get(reverse('export_download', args=[job.pk])), reverse('no_permission'))
@@ -0,0 +1,60 @@
+from io import StringIO
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from app_expenses.models import Report, Transaction, TransactionType, FundAccount, Category, Currency
+from app_expenses.services.report_services.report_refresh import refresh_dirty_reports
+
+User = get_user_model()
+
+class RefreshDirtyReportsTest(TestCase):
+    def setUp(self):
+        self.user1 = User.objects.create(username="user1")
+        self.user2 = User.objects.create(username="user2")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        for user in (self.user1, self.user2):
+            category = Category.objects.create(name="Food", user=user)
+            fund_account = FundAccount.objects.create(user=user, name="Wallet", balance=1000, currency=self.currency)
+            for month in (1, 2, 3):
+                for amount, trx_type in ((10 * month, TransactionType.CREDIT), (month, TransactionType.DEBIT)):
+                    Transaction.objects.create(user=user, category=category, fund_account=fund_account, amount=amount, type=trx_type, date=date(2025, month, 10))
+                Report.objects.create(user=user, year=2025, month=month)
+        # simulate drifted totals, e.g. rows written without signals
+        Report.objects.update(total_credit=999, total_debit=999, is_dirty=True)
+
+    def test_refresh_recomputes_dirty_totals(self):
+        """Refresh: dirty reports get their month totals back and are no longer dirty"""
+        refreshed = refresh_dirty_reports()
+        self.assertEqual(refreshed, 6)
+        for report in Report.objects.all():
+            self.assertEqual((report.total_credit, report.total_debit), (Decimal(10 * report.month), Decimal(report.month)))
+            self.assertFalse(report.is_dirty)
+
+    def test_refresh_skips_clean_reports(self):
+        """Refresh: reports that are not dirty are left untouched"""
+        Report.objects.filter(user=self.user2).update(is_dirty=False)
+        self.assertEqual(refresh_dirty_reports(), 3)
+        self.assertEqual(Report.objects.filter(user=self.user2, total_credit=999).count(), 3)
+
+    def test_refresh_month_without_transactions_is_zero(self):
+        """Refresh: a dirty report of a month without transactions is reset to zero"""
+        report = Report.objects.create(user=self.user1, year=2025, month=4)
+        Report.objects.filter(pk=report.pk).update(total_credit=5, is_dirty=True)
+        refresh_dirty_reports(user_ids=[self.user1.pk])
+        report.refresh_from_db()
+        self.assertEqual((report.total_credit, report.total_debit), (0, 0))
+
+    def test_refresh_queries_per_chunk(self):
+        """Refresh: every chunk is one lock, one grouped aggregate and one bulk update"""
+        # 3 chunks x (savepoint, select for update, aggregate, bulk update, data version, release) + last empty chunk
+        with self.assertNumQueries(3 * 6 + 3):
+            refresh_dirty_reports(chunk_size=2)
+
+    def test_command_refreshes_user(self):
+        """refresh_dirty_reports: --username limits the refresh to one user"""
+        out = StringIO()
+        call_command('refresh_dirty_reports', username="user1", stdout=out)
+        self.assertIn("Refreshed 3 reports.", out.getvalue())
+        self.assertEqual(Report.objects.filter(is_dirty=True).count(), 3)
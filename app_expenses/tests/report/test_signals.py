@@ -15,14 +15,15 @@ class ReportDirtySignalTests(TestCase):
 
     def test_report_marked_dirty_on_transaction_create(self):
         """Signal: Report.is_dirty becomes True when a new transaction is created"""
-        Transaction.objects.create(
-            user=self.user,
-            category=self.category,
-            amount=100,
-            fund_account=self.fund_account,
-            date=date(2025, 10, 5),
-            type=TransactionType.DEBIT,
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(
+                user=self.user,
+                category=self.category,
+                amount=100,
+                fund_account=self.fund_account,
+                date=date(2025, 10, 5),
+                type=TransactionType.DEBIT,
+            )
         self.report.refresh_from_db()
         self.assertTrue(self.report.is_dirty)
 
@@ -39,7 +40,8 @@ class ReportDirtySignalTests(TestCase):
         self.report.is_dirty = False
         self.report.save()
 
-        trx.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            trx.delete()
         self.report.refresh_from_db()
         self.assertTrue(self.report.is_dirty)
 
@@ -57,7 +59,8 @@ class ReportDirtySignalTests(TestCase):
         self.report.save()
 
         trx.amount = 300
-        trx.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            trx.save()
         self.report.refresh_from_db()
         self.assertTrue(self.report.is_dirty)
 
@@ -75,7 +78,8 @@ class ReportDirtySignalTests(TestCase):
         self.report.save()
 
         trx.date = date(2025, 10, 25)
-        trx.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            trx.save()
         self.report.refresh_from_db()
         self.assertTrue(self.report.is_dirty)
 
@@ -94,6 +98,30 @@ class ReportDirtySignalTests(TestCase):
 
         new_fund = FundAccount.objects.create(user=self.user, name="Bank", balance=500, currency=self.currency)
         trx.fund_account = new_fund
-        trx.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            trx.save()
         self.report.refresh_from_db()
-        self.assertTrue(self.report.is_dirty)
\ No newline at end of file
+        self.assertTrue(self.report.is_dirty)
+
+    def test_report_marked_dirty_with_totals(self):
+        """Signal: Report.is_dirty is set by the totals UPDATE, in the saving database transaction"""
+        with self.captureOnCommitCallbacks():
+            Transaction.objects.create(user=self.user, category=self.category, amount=100, fund_account=self.fund_account, date=date(2025, 10, 5), type=TransactionType.DEBIT)
+            self.report.refresh_from_db()
+            self.assertTrue(self.report.is_dirty)
+            self.assertEqual(self.report.total_debit, 100)
+
+    def test_many_changes_flush_one_export_update(self):
+        """Signal: changes of one database transaction expire their exports with a single UPDATE"""
+        november = Report.objects.create(user=self.user, month=11, year=2025)
+        with self.captureOnCommitCallbacks() as callbacks:
+            for day in range(1, 21):
+                Transaction.objects.create(user=self.user, category=self.category, amount=1, fund_account=self.fund_account, date=date(2025, 10 + day % 2, day), type=TransactionType.DEBIT)
+        # overlapping exports expired; reports and data version were written with the changes
+        with self.assertNumQueries(1):
+            for callback in callbacks:
+                callback()
+        self.report.refresh_from_db()
+        november.refresh_from_db()
+        self.assertTrue(self.report.is_dirty)
+        self.assertTrue(november.is_dirty)
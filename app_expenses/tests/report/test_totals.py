@@ -0,0 +1,114 @@
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from app_expenses.models import Report, Transaction, TransactionType, FundAccount, Category, Currency
+from app_expenses.services.report_services.report_refresh import refresh_dirty_reports
+
+User = get_user_model()
+
+class ReportIncrementalTotalsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user1")
+        self.category = Category.objects.create(name="Food", user=self.user)
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        self.fund_account = FundAccount.objects.create(user=self.user, name="Wallet", balance=1000, currency=self.currency)
+        self.october = Report.objects.create(user=self.user, month=10, year=2025)
+        self.november = Report.objects.create(user=self.user, month=11, year=2025)
+
+    def create_trx(self, amount, trx_type, trx_date=date(2025, 10, 5)):
+        return Transaction.objects.create(
+            user=self.user,
+            category=self.category,
+            amount=amount,
+            fund_account=self.fund_account,
+            date=trx_date,
+            type=trx_type,
+        )
+
+    def assertTotals(self, report, credit, debit):
+        report.refresh_from_db()
+        self.assertEqual((report.total_credit, report.total_debit), (Decimal(credit), Decimal(debit)))
+
+    def test_create_adds_to_report_totals(self):
+        """Report totals: a new transaction is added to its month"""
+        self.create_trx(100, TransactionType.DEBIT)
+        self.create_trx(40, TransactionType.CREDIT)
+        self.assertTotals(self.october, 40, 100)
+        self.assertTotals(self.november, 0, 0)
+
+    def test_amount_change_applies_difference(self):
+        """Report totals: changing the amount applies only the difference"""
+        trx = self.create_trx(100, TransactionType.DEBIT)
+        trx.amount = 30
+        trx.save()
+        self.assertTotals(self.october, 0, 30)
+
+    def test_type_flip_moves_amount_between_totals(self):
+        """Report totals: flipping debit to credit moves the amount to total credit"""
+        trx = self.create_trx(100, TransactionType.DEBIT)
+        trx.type = TransactionType.CREDIT
+        trx.save()
+        self.assertTotals(self.october, 100, 0)
+
+    def test_date_change_moves_amount_across_months(self):
+        """Report totals: moving a transaction to another month updates both reports"""
+        trx = self.create_trx(100, TransactionType.DEBIT)
+        trx.date = date(2025, 11, 2)
+        trx.amount = 60
+        trx.save()
+        self.assertTotals(self.october, 0, 0)
+        self.assertTotals(self.november, 0, 60)
+
+    def test_delete_subtracts_from_report_totals(self):
+        """Report totals: deleting a transaction removes it from its month"""
+        self.create_trx(100, TransactionType.DEBIT)
+        trx = self.create_trx(25, TransactionType.DEBIT)
+        trx.delete()
+        self.assertTotals(self.october, 0, 100)
+
+    def test_totals_match_full_recompute(self):
+        """Report totals: incremental totals equal a fresh report of the same month"""
+        for amount, trx_type in ((10, TransactionType.DEBIT), (20, TransactionType.CREDIT), (30, TransactionType.DEBIT)):
+            self.create_trx(amount, trx_type)
+        trx = Transaction.objects.filter(amount=30).get()
+        trx.type = TransactionType.CREDIT
+        trx.save()
+        self.october.refresh_from_db()
+        self.october.delete()
+        fresh = Report.objects.create(user=self.user, month=10, year=2025)
+        self.assertEqual((self.october.total_credit, self.october.total_debit), (fresh.total_credit, fresh.total_debit))
+
+    def test_update_does_not_rescan_month(self):
+        """Report totals: a transaction update reads the old row once and leaves unchanged totals alone"""
+        trx = self.create_trx(100, TransactionType.DEBIT)
+        trx.description = "Lunch"
+        # old transaction (shared by balance and report), transaction update, report marked dirty, data version
+        with self.assertNumQueries(4):
+            trx.save()
+
+    def test_saving_stale_report_keeps_totals(self):
+        """Report totals: saving a report loaded before a transaction change does not overwrite its totals"""
+        stale = Report.objects.get(pk=self.october.pk)
+        self.create_trx(100, TransactionType.DEBIT)
+        stale.is_dirty = False
+        stale.save()
+        self.assertTotals(self.october, 0, 100)
+
+    def test_drifted_total_is_flagged_dirty(self):
+        """Report totals: a delta taking a drifted total below zero marks the report dirty for refresh"""
+        trx = self.create_trx(100, TransactionType.DEBIT)
+        self.create_trx(40, TransactionType.CREDIT)
+        Report.objects.filter(pk=self.october.pk).update(total_debit=30, is_dirty=False)
+        trx.delete()
+        self.october.refresh_from_db()
+        self.assertEqual((self.october.total_debit, self.october.total_credit), (0, 40))
+        self.assertTrue(self.october.is_dirty)
+        refresh_dirty_reports(user_ids=[self.user.pk])
+        self.assertTotals(self.october, 40, 0)
+
+    def test_applied_delta_keeps_report_clean(self):
+        """Report totals: a delta that keeps the totals valid leaves the report clean unless asked to mark it"""
+        Report.objects.apply_deltas({(self.user.pk, 2025, 10): (Decimal(5), Decimal(0))})
+        self.assertTotals(self.october, 5, 0)
+        self.assertFalse(self.october.is_dirty)
@@ -0,0 +1,142 @@
+import random
+from decimal import Decimal
+from datetime import date
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connection, connections
+from django.db.models import QuerySet
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.core.exceptions import ValidationError
+from django.contrib.auth import get_user_model
+from app_expenses.models import Transaction, FundAccount, Category, Currency, TransactionType
+
+User = get_user_model()
+
+WORKERS = 8
+
+def in_own_connection(func):
+    # every thread gets its own DB connection, close it so the test database can be dropped
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            connections.close_all()
+    return wrapper
+
+
+class FundAccountBalanceStatementTest(TestCase):
+    """
+    The statements the concurrency guarantee rests on, checked on any backend: the balance moves by
+    an increment computed in the UPDATE, and the old transaction row is read locked.
+    """
+    def setUp(self):
+        self.user = User.objects.create(username="user1")
+        self.category = Category.objects.create(user=self.user, name="Food")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        self.fund_account = FundAccount.objects.create(user=self.user, name="Bank", currency=self.currency, balance=1000)
+        self.trx = Transaction(user=self.user, category=self.category, fund_account=self.fund_account, amount=100, type=TransactionType.DEBIT, date=date(2025, 1, 1))
+        self.trx.create_by(self.user)
+
+    def balance_updates(self, queries):
+        return [query['sql'] for query in queries if query['sql'].startswith('UPDATE "app_expenses_fundaccount"')]
+
+    def test_balance_is_incremented_in_the_update(self):
+        """Balance: a debit is one UPDATE adding to the stored balance, with the sufficient balance check in its WHERE"""
+        with CaptureQueriesContext(connection) as queries:
+            Transaction(user=self.user, category=self.category, fund_account=self.fund_account, amount=30, type=TransactionType.DEBIT, date=date(2025, 1, 2)).create_by(self.user)
+        update, = self.balance_updates(queries)
+        self.assertIn('SET "balance" = ', update)
+        self.assertIn('"app_expenses_fundaccount"."balance" + ', update)
+        self.assertIn('"app_expenses_fundaccount"."balance" >= ', update)
+
+    def test_update_reads_old_row_locked(self):
+        """Balance: an update reads the old transaction row with select_for_update before moving the balance"""
+        select_for_update = QuerySet.select_for_update
+        locked = []
+        def recording_select_for_update(queryset, *args, **kwargs):
+            locked.append(queryset.model)
+            return select_for_update(queryset, *args, **kwargs)
+
+        trx = Transaction.objects.get(pk=self.trx.pk)
+        trx.amount = 150
+        with mock.patch.object(QuerySet, 'select_for_update', recording_select_for_update), CaptureQueriesContext(connection) as queries:
+            trx.update_by(self.user)
+        self.assertIn(Transaction, locked)
+        if connection.features.has_select_for_update:
+            self.assertTrue(any('FOR UPDATE' in query['sql'] for query in queries if query['sql'].startswith('SELECT "app_expenses_transaction"')))
+        update, = self.balance_updates(queries)
+        self.assertIn('"app_expenses_fundaccount"."balance" + ', update)
+        self.fund_account.refresh_from_db()
+        self.assertEqual(self.fund_account.balance, 850)
+
+
+class FundAccountBalanceConcurrencyTest(TransactionTestCase):
+    """
+    Hammer one fund account from many threads, each with its own DB connection,
+    and check no balance update is lost.
+    """
+    def setUp(self):
+        # SQLite has no row locks, concurrent writers fail with 'database is locked'
+        if connection.vendor != 'postgresql':
+            self.skipTest("Needs PostgreSQL row locks.")
+        self.user = User.objects.create(username="user1")
+        self.category = Category.objects.create(user=self.user, name="Food")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        self.initial_balance = Decimal('100000.00')
+        self.fund_account = FundAccount.objects.create(user=self.user, name="Bank", currency=self.currency, balance=self.initial_balance)
+
+    @in_own_connection
+    def create_transaction(self, amount, trx_type):
+        trx = Transaction(
+            user=self.user,
+            category=Category.objects.get(pk=self.category.pk),
+            fund_account=FundAccount.objects.get(pk=self.fund_account.pk),
+            amount=amount,
+            type=trx_type,
+            date=date(2025, 1, 1)
+        )
+        try:
+            trx.create_by(self.user)
+            return True
+        except ValidationError:
+            return False
+
+    @in_own_connection
+    def update_transaction(self, trx_id, amount, trx_type):
+        trx = Transaction.objects.get(pk=trx_id)
+        trx.amount = amount
+        trx.type = trx_type
+        trx.update_by(self.user)
+
+    def expected_balance(self):
+        credits = sum(trx.amount for trx in Transaction.objects.filter(type=TransactionType.CREDIT))
+        debits = sum(trx.amount for trx in Transaction.objects.filter(type=TransactionType.DEBIT))
+        return self.initial_balance + credits - debits
+
+    def test_concurrent_creates_and_updates_keep_exact_balance(self):
+        """Balance: 300 concurrent creates followed by 200 concurrent updates lose no update"""
+        rng = random.Random(42)
+        creates = [(Decimal(rng.randint(1, 500)), rng.choice(TransactionType.values)) for _ in range(300)]
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            results = list(pool.map(lambda args: self.create_transaction(*args), creates))
+        self.assertTrue(all(results))
+
+        trx_ids = list(Transaction.objects.values_list('id', flat=True))
+        updates = [(rng.choice(trx_ids), Decimal(rng.randint(1, 500)), rng.choice(TransactionType.values)) for _ in range(200)]
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            list(pool.map(lambda args: self.update_transaction(*args), updates))
+
+        self.fund_account.refresh_from_db()
+        self.assertEqual(self.fund_account.balance, self.expected_balance())
+
+    def test_concurrent_debits_never_overdraw(self):
+        """Balance: concurrent debits larger than the balance succeed exactly until the money runs out"""
+        FundAccount.objects.filter(pk=self.fund_account.pk).update(balance=1000)
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            results = list(pool.map(lambda _: self.create_transaction(Decimal('30'), TransactionType.DEBIT), range(200)))
+
+        self.fund_account.refresh_from_db()
+        self.assertEqual(results.count(True), 33)
+        self.assertEqual(self.fund_account.balance, Decimal('10'))
+        self.assertEqual(Transaction.objects.count(), 33)
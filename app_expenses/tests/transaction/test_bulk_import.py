@@ -0,0 +1,157 @@
+import os
+import csv
+import tempfile
+from io import StringIO
+from datetime import date, timedelta
+from decimal import Decimal
+from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.exceptions import ValidationError
+from django.contrib.auth import get_user_model
+from app_expenses.models import Transaction, FundAccount, Category, Currency, Tag, Report, DailyRollup, TransactionType
+from app_expenses.services.transaction_services.bulk_import import import_transactions
+
+User = get_user_model()
+
+class BulkImportTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user1")
+        self.user2 = User.objects.create(username="user2")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        self.bank = FundAccount.objects.create(user=self.user, name="Bank", currency=self.currency, balance=1000)
+        self.wallet = FundAccount.objects.create(user=self.user, name="Wallet", currency=self.currency, balance=0)
+        self.category = Category.objects.create(user=self.user, name="Food")
+        self.tag = Tag.objects.create(user=self.user, name="Groceries")
+        self.report = Report.objects.create(user=self.user, year=2025, month=1)
+
+    def year_of_rows(self, fund_account, trx_type, amount="1.00"):
+        start = date(2024, 1, 1)
+        return [{
+            'fund_account': str(fund_account.pk),
+            'category': str(self.category.pk),
+            'amount': amount,
+            'type': trx_type,
+            'date': str(start + timedelta(days=day)),
+            'description': f"row {day}",
+            'tags': [str(self.tag.pk)],
+        } for day in range(366)]
+
+    def test_import_creates_transactions_and_tags(self):
+        """Bulk import: every row and its tags are inserted"""
+        result = import_transactions(self.user, self.year_of_rows(self.wallet, TransactionType.CREDIT), batch_size=100)
+        self.assertEqual(result['created'], 366)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 366)
+        self.assertEqual(self.tag.transactions.count(), 366)
+
+    def test_import_repeated_tag_is_linked_once(self):
+        """Bulk import: a tag listed twice in a row is linked once"""
+        row = self.year_of_rows(self.wallet, TransactionType.CREDIT)[0]
+        row['tags'] = [str(self.tag.pk), str(self.tag.pk)]
+        import_transactions(self.user, [row])
+        self.assertEqual(list(Transaction.objects.get().tags.all()), [self.tag])
+
+    def test_import_applies_one_balance_update_per_fund_account(self):
+        """Bulk import: balances move by the net amount of the imported rows"""
+        rows = self.year_of_rows(self.wallet, TransactionType.CREDIT) + self.year_of_rows(self.bank, TransactionType.DEBIT, amount="2.00")
+        result = import_transactions(self.user, rows)
+        self.bank.refresh_from_db()
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('366.00'))
+        self.assertEqual(self.bank.balance, Decimal('268.00'))
+        self.assertEqual(result['balance_deltas'], {self.wallet.pk: Decimal('366.00'), self.bank.pk: Decimal('-732.00')})
+
+    def test_import_query_count_does_not_grow_with_rows(self):
+        """Bulk import: query count depends on the number of batches, not rows"""
+        rows = self.year_of_rows(self.wallet, TransactionType.CREDIT)
+        # savepoint, 2 batches x (3 lookups + 2 inserts), balance update + refresh,
+        # 12 monthly checkpoint shifts, report update, rollup update + read + (savepoint, insert, release), export expiry,
+        # first data version bump (update, missing keys, insert, update), release
+        with self.assertNumQueries(37):
+            import_transactions(self.user, rows, batch_size=200)
+
+    def test_import_marks_affected_reports_dirty(self):
+        """Bulk import: reports of imported months are marked dirty"""
+        other_report = Report.objects.create(user=self.user, year=2025, month=2)
+        rows = self.year_of_rows(self.wallet, TransactionType.CREDIT)[:1]
+        rows[0]['date'] = "2025-01-15"
+        result = import_transactions(self.user, rows)
+        self.report.refresh_from_db()
+        other_report.refresh_from_db()
+        self.assertEqual(result['dirty_reports'], 1)
+        self.assertTrue(self.report.is_dirty)
+        self.assertFalse(other_report.is_dirty)
+
+    def test_import_adds_to_report_totals(self):
+        """Bulk import: imported rows are added to their report totals"""
+        rows = self.year_of_rows(self.wallet, TransactionType.CREDIT)[:3]
+        for row, day in zip(rows, ("2025-01-02", "2025-01-03", "2025-03-01")):
+            row['date'] = day
+        import_transactions(self.user, rows)
+        self.report.refresh_from_db()
+        self.assertEqual((self.report.total_credit, self.report.total_debit), (Decimal('2.00'), 0))
+
+    def test_import_builds_daily_rollups(self):
+        """Bulk import: one daily rollup per imported day"""
+        import_transactions(self.user, self.year_of_rows(self.wallet, TransactionType.CREDIT))
+        self.assertEqual(DailyRollup.objects.filter(user=self.user, fund_account=self.wallet, trx_count=1, total=1).count(), 366)
+
+    def test_invalid_row_rolls_back_whole_import(self):
+        """Bulk import: a single invalid row rejects the whole import with row numbers"""
+        rows = self.year_of_rows(self.wallet, TransactionType.CREDIT)
+        rows[250]['amount'] = "-5"
+        rows[300]['fund_account'] = str(FundAccount.objects.create(user=self.user2, name="Other", currency=self.currency).pk)
+        with self.assertRaises(ValidationError) as ctx:
+            import_transactions(self.user, rows, batch_size=100)
+        self.assertEqual(len(ctx.exception.messages), 2)
+        self.assertIn("Row 251", ctx.exception.messages[0])
+        self.assertIn("Row 301: Fund Account does not exists.", ctx.exception.messages[1])
+        self.assertFalse(Transaction.objects.exists())
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, 0)
+
+    def test_import_cannot_overdraw_fund_account(self):
+        """Bulk import: net debit larger than the balance is rejected"""
+        with self.assertRaisesMessage(ValidationError, "Insufficient Balance in Fund Account: 'Wallet'."):
+            import_transactions(self.user, self.year_of_rows(self.wallet, TransactionType.DEBIT))
+        self.assertFalse(Transaction.objects.exists())
+
+
+class ImportTransactionsCommandTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user1")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        self.fund_account = FundAccount.objects.create(user=self.user, name="Bank", currency=self.currency, balance=0)
+        self.category = Category.objects.create(user=self.user, name="Food")
+        self.tag = Tag.objects.create(user=self.user, name="Groceries")
+        self.csv_path = os.path.join(tempfile.mkdtemp(), "import.csv")
+
+    def write_csv(self, tags):
+        with open(self.csv_path, 'w', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(['amount', 'type', 'date', 'fund_account_id', 'category_id', 'description', 'tags'])
+            writer.writerow(['10.50', 'credit', '2024-05-01', self.fund_account.pk, self.category.pk, 'Salary', tags])
+
+    def test_command_imports_csv(self):
+        """import_transactions: imports rows and resolves tag names"""
+        self.write_csv("groceries")
+        out = StringIO()
+        call_command('import_transactions', self.csv_path, username="user1", stdout=out)
+        self.assertIn("Imported 1 transactions", out.getvalue())
+        trx = Transaction.objects.get()
+        self.assertEqual(list(trx.tags.all()), [self.tag])
+        self.fund_account.refresh_from_db()
+        self.assertEqual(self.fund_account.balance, Decimal('10.50'))
+
+    def test_command_repeated_tag_name_is_linked_once(self):
+        """import_transactions: tag names repeated in another case are linked once"""
+        self.write_csv("groceries|Groceries")
+        call_command('import_transactions', self.csv_path, username="user1", stdout=StringIO())
+        self.assertEqual(list(Transaction.objects.get().tags.all()), [self.tag])
+
+    def test_command_unknown_tag_fails(self):
+        """import_transactions: unknown tag names abort the import"""
+        self.write_csv("groceries|unknown")
+        with self.assertRaisesMessage(CommandError, "Row 1: unknown tags unknown."):
+            call_command('import_transactions', self.csv_path, username="user1")
+        self.assertFalse(Transaction.objects.exists())
@@ -0,0 +1,111 @@
+from io import StringIO
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from app_expenses.models import Transaction, FundAccount, Category, Currency, DailyRollup, TransactionType
+from app_expenses.services.transaction_services.transaction_summary import get_summary
+from app_expenses.services.transaction_services.daily_rollup import get_rollup_summary, rebuild_daily_rollups, backfill_daily_rollups
+
+User = get_user_model()
+
+class DailyRollupTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user1")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        self.bank = FundAccount.objects.create(user=self.user, name="Bank", currency=self.currency, balance=1000)
+        self.wallet = FundAccount.objects.create(user=self.user, name="Wallet", currency=self.currency, balance=1000)
+        self.food = Category.objects.create(user=self.user, name="Food")
+        self.travel = Category.objects.create(user=self.user, name="Travel")
+        for fund_account, category, amount, trx_type, trx_date in [
+            (self.bank, self.food, 100, TransactionType.CREDIT, date(2025, 1, 5)),
+            (self.bank, self.food, 40, TransactionType.DEBIT, date(2025, 1, 5)),
+            (self.bank, self.food, 60, TransactionType.DEBIT, date(2025, 1, 5)),
+            (self.wallet, self.travel, 25, TransactionType.DEBIT, date(2025, 2, 1)),
+            (self.wallet, self.food, 10, TransactionType.CREDIT, date(2024, 12, 9)),
+        ]:
+            Transaction.objects.create(user=self.user, fund_account=fund_account, category=category, amount=amount, type=trx_type, date=trx_date)
+        self.trx_list = Transaction.objects.filter(user=self.user)
+        self.rollups = DailyRollup.objects.filter(user=self.user)
+
+    def assertMatchesTransactions(self):
+        for group_by in (None, 'fund_account', 'category', 'month'):
+            self.assertEqual(get_rollup_summary(self.rollups, group_by=group_by), get_summary(self.trx_list, group_by=group_by))
+
+    def test_same_day_transactions_share_a_row(self):
+        """Daily rollup: transactions of one day, account, category and type are one row"""
+        row = self.rollups.get(date=date(2025, 1, 5), type=TransactionType.DEBIT)
+        self.assertEqual((row.total, row.trx_count), (Decimal('100'), 2))
+        self.assertEqual(self.rollups.count(), 4)
+
+    def test_summary_matches_transaction_scan(self):
+        """Daily rollup: summaries equal the ones computed from raw transactions"""
+        self.assertMatchesTransactions()
+
+    def test_update_and_delete_keep_rollups_in_sync(self):
+        """Daily rollup: amount, type, date, account and category changes and deletes are applied incrementally"""
+        trx = self.trx_list.get(amount=40)
+        trx.amount = 45
+        trx.type = TransactionType.CREDIT
+        trx.date = date(2025, 3, 1)
+        trx.fund_account = self.wallet
+        trx.category = self.travel
+        trx.save()
+        self.trx_list.get(amount=25).delete()
+        self.assertMatchesTransactions()
+        self.assertEqual(self.rollups.filter(date=date(2025, 2, 1)).get().trx_count, 0)
+
+    def test_deleting_fund_account_folds_rows_into_none(self):
+        """Daily rollup: rows of a deleted fund account move to the rows without one"""
+        wallet_id = self.wallet.pk
+        self.wallet.delete()
+        self.assertFalse(self.rollups.filter(fund_account_id=wallet_id).exists())
+        self.assertMatchesTransactions()
+
+    def test_deleting_category_folds_rows_into_none(self):
+        """Daily rollup: rows of a deleted category move to the rows without one"""
+        self.food.delete()
+        self.assertMatchesTransactions()
+
+    def test_grouped_by_year(self):
+        """Daily rollup: grouped by year"""
+        rows = get_rollup_summary(self.rollups, group_by='year')
+        self.assertEqual([(row['year'], row['net']) for row in rows], [(date(2024, 1, 1), Decimal('10')), (date(2025, 1, 1), Decimal('-25'))])
+
+    def test_invalid_group_by_fails(self):
+        """Daily rollup: unknown group by raises ValueError"""
+        with self.assertRaises(ValueError):
+            get_rollup_summary(self.rollups, group_by='tags')
+
+    def test_rebuild_restores_rollups(self):
+        """Daily rollup: rebuild recreates the rows from transactions"""
+        DailyRollup.objects.update(total=0, trx_count=0)
+        self.assertEqual(rebuild_daily_rollups([self.user.pk]), 4)
+        self.assertMatchesTransactions()
+
+    def test_backfill_builds_users_without_rollups(self):
+        """Daily rollup: migrate builds the rollups of users who have transactions but none yet"""
+        DailyRollup.objects.all().delete()
+        backfill_daily_rollups()
+        self.assertMatchesTransactions()
+
+    def test_backfill_leaves_built_users_alone(self):
+        """Daily rollup: users with rollups are not rebuilt by migrate"""
+        DailyRollup.objects.update(total=0)
+        with self.assertNumQueries(1):
+            backfill_daily_rollups()
+        self.assertFalse(DailyRollup.objects.exclude(total=0).exists())
+
+    def test_command_rebuilds_user(self):
+        """rebuild_daily_rollups: rebuilds the rollups of the given user"""
+        DailyRollup.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_daily_rollups', username="user1", stdout=out)
+        self.assertIn("Built 4 daily rollups for 1 users.", out.getvalue())
+        self.assertMatchesTransactions()
+
+    def test_deleting_user_deletes_rollups(self):
+        """Daily rollup: deleting a user with transactions leaves no rollup rows behind"""
+        self.user.delete()
+        self.assertFalse(DailyRollup.objects.exists())
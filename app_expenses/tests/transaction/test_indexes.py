@@ -0,0 +1,88 @@
+from datetime import date
+from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from app_expenses.models import Transaction, FundAccount, Category, Currency, Report, TransactionType
+from app_expenses.services import user_transactions
+from app_expenses.custom_paginators import KeysetPaginator
+from app_expenses.views.report_view import get_csv
+
+User = get_user_model()
+
+COMPOSITE_INDEXES = ('trx_user_date_idx', 'trx_user_fund_account_date_idx', 'trx_user_category_date_idx', 'trx_user_type_date_idx')
+# unique_daily_rollup is created inline on SQLite, hence its autoindex name
+ROLLUP_INDEXES = ('rollup_user_date_idx', 'unique_daily_rollup', 'sqlite_autoindex_app_expenses_dailyrollup')
+
+class TransactionIndexUsageTest(TestCase):
+    """
+    EXPLAIN the queries the app actually issues against the transaction table and check
+    the planner picks one of the per-user composite indexes.
+    """
+    def setUp(self):
+        self.user = User.objects.create(username="user1")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        self.fund_account = FundAccount.objects.create(user=self.user, name="Bank", currency=self.currency, balance=0)
+        self.category = Category.objects.create(user=self.user, name="Food")
+        for day in range(1, 11):
+            Transaction.objects.create(
+                user=self.user,
+                category=self.category,
+                amount=10,
+                fund_account=self.fund_account,
+                date=date(2025, 1, day),
+                type=TransactionType.CREDIT
+            )
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # tiny test tables would otherwise always be sequentially scanned
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("EXPLAIN " + sql)
+            else:
+                cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            return "\n".join(str(row) for row in cursor.fetchall())
+
+    def query_plans(self, operation, table):
+        with CaptureQueriesContext(connection) as ctx:
+            operation()
+        plans = [
+            self.explain(query['sql']) for query in ctx.captured_queries
+            if query['sql'].startswith('SELECT') and f'FROM "{table}"' in query['sql']
+        ]
+        self.assertTrue(plans, f"No {table} query was captured.")
+        return plans
+
+    def assert_uses_index(self, operation, expected=COMPOSITE_INDEXES, table='app_expenses_transaction'):
+        for plan in self.query_plans(operation, table):
+            self.assertTrue(any(name in plan for name in expected), plan)
+
+    def test_transaction_list_page_uses_user_date_index(self):
+        """Index: newest first list page is served by (user, -date, -id)"""
+        trx_list = user_transactions.get_all_transactions(self.user)
+        self.assert_uses_index(lambda: list(KeysetPaginator(trx_list, 25).get_page()), ['trx_user_date_idx'])
+
+    def test_fund_account_list_page_uses_fund_account_index(self):
+        """Index: fund account list page is served by (user, fund_account, -date, -id)"""
+        trx_list = user_transactions.get_all_transactions(self.user).filter(fund_account=self.fund_account)
+        self.assert_uses_index(lambda: list(KeysetPaginator(trx_list, 25).get_page()), ['trx_user_fund_account_date_idx'])
+
+    def test_category_list_page_uses_category_index(self):
+        """Index: category list page is served by (user, category, -date, -id)"""
+        trx_list = user_transactions.get_all_transactions(self.user).filter(category=self.category)
+        self.assert_uses_index(lambda: list(KeysetPaginator(trx_list, 25).get_page()), ['trx_user_category_date_idx'])
+
+    def test_credit_debit_summary_uses_rollup_index(self):
+        """Index: credit/debit summaries of every list view read the daily rollups by user"""
+        self.assert_uses_index(lambda: user_transactions.get_credit_debit_summary(self.user), ROLLUP_INDEXES, 'app_expenses_dailyrollup')
+        self.assert_uses_index(lambda: user_transactions.get_transactions_by_fund_account(self.user, self.fund_account.id), ROLLUP_INDEXES, 'app_expenses_dailyrollup')
+        self.assert_uses_index(lambda: user_transactions.get_transactions_by_category(self.user, self.category.id), ROLLUP_INDEXES, 'app_expenses_dailyrollup')
+
+    def test_monthly_csv_uses_date_range_on_index(self):
+        """Index: monthly CSV export filters a date range on (user, -date, -id)"""
+        self.assert_uses_index(lambda: list(get_csv(self.user, "01", "2025")[1]), ['trx_user_date_idx'])
+
+    def test_report_total_calculation_uses_rollup_index(self):
+        """Index: report totals (signals.calculate_total) read a date range of the daily rollups"""
+        self.assert_uses_index(lambda: Report.objects.create(user=self.user, month=1, year=2025), ROLLUP_INDEXES, 'app_expenses_dailyrollup')
@@ -1,6 +1,7 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
-from django.core.exceptions import ValidationError
+from django.core.exceptions import ValidationError, PermissionDenied
+from django.db import transaction as db_transaction
 from app_expenses.models import Transaction, FundAccount, Category, Currency, TransactionType
 from datetime import date
 
@@ -284,3 +285,36 @@ class TransactionModelTest(TestCase):
         self.assertEqual(self.fund_account.balance, expected_balance)
 
 
+
+    def test_transaction_update_by_reads_old_row_once(self):
+        """Transaction: update_by checks the owner in the UPDATE and the save pipeline reads the old row once"""
+        trx = Transaction.objects.create(user=self.user1, category=self.category, amount=300, fund_account=self.fund_account, type=TransactionType.DEBIT)
+        trx = Transaction.objects.get(pk=trx.pk)
+        trx.amount = 200
+        # save_obj: category & fund account, loaded once for validation and save (uniqueness and check constraints left to the database)
+        # update_by: savepoint, release
+        # save: old row with fund account, update, report totals, daily rollup,
+        # data version, balance update + refresh, checkpoints
+        with self.assertNumQueries(12):
+            trx.update_by(self.user1)
+        self.fund_account.refresh_from_db()
+        self.assertEqual(self.fund_account.balance, 4800)
+
+    def test_transaction_update_by_reuses_locked_row(self):
+        """Transaction: a row read with get_for_update is not read again by the save"""
+        trx = Transaction.objects.create(user=self.user1, category=self.category, amount=300, fund_account=self.fund_account, type=TransactionType.DEBIT)
+        with db_transaction.atomic():
+            with self.assertNumQueries(1):
+                trx = Transaction.get_for_update(self.user1, trx.pk)
+            trx.amount = 200
+            # as above, without the old row: it was read locked, with the category and fund account
+            with self.assertNumQueries(9):
+                trx.update_by(self.user1)
+        self.fund_account.refresh_from_db()
+        self.assertEqual(self.fund_account.balance, 4800)
+
+    def test_get_for_update_checks_owner(self):
+        """Transaction: get_for_update refuses a transaction of another user"""
+        trx = Transaction.objects.create(user=self.user1, category=self.category, amount=300, fund_account=self.fund_account, type=TransactionType.DEBIT)
+        with self.assertRaises(PermissionDenied):
+            Transaction.get_for_update(self.user2, trx.pk)
@@ -0,0 +1,83 @@
+from datetime import date
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from app_expenses.models import Transaction, FundAccount, Category, Currency, TransactionType
+from app_expenses.custom_paginators import KeysetPaginator, encode_cursor
+
+User = get_user_model()
+
+class KeysetPaginatorTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user1")
+        self.category = Category.objects.create(user=self.user, name="Food")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        self.fund_account = FundAccount.objects.create(user=self.user, name="Bank", currency=self.currency, balance=0)
+        # 3 transactions per day over 9 days, so pages split inside a day
+        for day in range(1, 10):
+            for _ in range(3):
+                Transaction.objects.create(
+                    user=self.user,
+                    category=self.category,
+                    amount=10,
+                    fund_account=self.fund_account,
+                    date=date(2025, 1, day),
+                    type=TransactionType.CREDIT
+                )
+        self.trx_list = Transaction.objects.filter(user=self.user)
+        self.expected = list(self.trx_list.order_by('-date', '-id').values_list('id', flat=True))
+
+    def test_walking_next_cursors_visits_every_row_once_in_order(self):
+        """KeysetPaginator: following next cursors returns all rows in (-date, -id) order"""
+        paginator = KeysetPaginator(self.trx_list, 10)
+        seen = []
+        page = paginator.get_page()
+        self.assertFalse(page.has_previous())
+        while True:
+            seen.extend(trx.id for trx in page)
+            if not page.has_next():
+                break
+            page = paginator.get_page(page.next_cursor)
+        self.assertEqual(seen, self.expected)
+
+    def test_previous_cursor_returns_previous_page(self):
+        """KeysetPaginator: previous cursor of page 3 returns page 2"""
+        paginator = KeysetPaginator(self.trx_list, 10)
+        page_1 = paginator.get_page()
+        page_2 = paginator.get_page(page_1.next_cursor)
+        page_3 = paginator.get_page(page_2.next_cursor)
+        self.assertEqual(len(page_3), 7)
+        self.assertFalse(page_3.has_next())
+
+        back = paginator.get_page(page_3.previous_cursor)
+        self.assertEqual([trx.id for trx in back], [trx.id for trx in page_2])
+        self.assertTrue(back.has_previous())
+        self.assertTrue(back.has_next())
+
+        first = paginator.get_page(back.previous_cursor)
+        self.assertEqual([trx.id for trx in first], [trx.id for trx in page_1])
+        self.assertFalse(first.has_previous())
+
+    def test_invalid_cursor_returns_first_page(self):
+        """KeysetPaginator: a tampered cursor falls back to the first page"""
+        paginator = KeysetPaginator(self.trx_list, 10)
+        page = paginator.get_page("not-a-valid-cursor")
+        self.assertEqual([trx.id for trx in page], self.expected[:10])
+
+    def test_cursor_with_invalid_id_returns_first_page(self):
+        """KeysetPaginator: a cursor with a valid date but a non-UUID id falls back to the first page"""
+        paginator = KeysetPaginator(self.trx_list, 10)
+        page = paginator.get_page(encode_cursor('next', date(2025, 1, 1), "not-a-uuid"))
+        self.assertEqual([trx.id for trx in page], self.expected[:10])
+
+    def test_page_cost_is_constant(self):
+        """KeysetPaginator: a deep page is a single query without COUNT(*)"""
+        paginator = KeysetPaginator(self.trx_list, 10)
+        cursor = paginator.get_page(paginator.get_page().next_cursor).next_cursor
+        with self.assertNumQueries(1):
+            page = paginator.get_page(cursor)
+            self.assertIsNone(page.approximate_total)
+
+    def test_approximate_total_only_when_requested(self):
+        """KeysetPaginator: total is computed only when 'with_total' is set"""
+        page = KeysetPaginator(self.trx_list, 10, with_total=True).get_page()
+        self.assertEqual(page.approximate_total, 27)
@@ -0,0 +1,68 @@
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from app_expenses.models import Transaction, FundAccount, Category, Currency, Report, TransactionType
+from app_expenses.services.transaction_services.transaction_summary import get_summary
+
+User = get_user_model()
+
+class TransactionSummaryTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="user1")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        self.bank = FundAccount.objects.create(user=self.user, name="Bank", currency=self.currency, balance=1000)
+        self.wallet = FundAccount.objects.create(user=self.user, name="Wallet", currency=self.currency, balance=1000)
+        self.food = Category.objects.create(user=self.user, name="Food")
+        self.travel = Category.objects.create(user=self.user, name="Travel")
+        for fund_account, category, amount, trx_type, trx_date in [
+            (self.bank, self.food, 100, TransactionType.CREDIT, date(2025, 1, 5)),
+            (self.bank, self.food, 40, TransactionType.DEBIT, date(2025, 1, 6)),
+            (self.wallet, self.travel, 25, TransactionType.DEBIT, date(2025, 2, 1)),
+            (self.wallet, self.food, 10, TransactionType.CREDIT, date(2025, 2, 9)),
+        ]:
+            Transaction.objects.create(user=self.user, fund_account=fund_account, category=category, amount=amount, type=trx_type, date=trx_date)
+        self.trx_list = Transaction.objects.filter(user=self.user)
+
+    def test_summary_is_a_single_query(self):
+        """Summary: credit, debit, net and count come from one query"""
+        with self.assertNumQueries(1):
+            summary = get_summary(self.trx_list)
+        self.assertEqual(summary, {'total_credit': Decimal('110'), 'total_debit': Decimal('65'), 'net': Decimal('45'), 'count': 4})
+
+    def test_summary_of_empty_list_is_zero(self):
+        """Summary: no transactions gives zero totals instead of None"""
+        summary = get_summary(self.trx_list.filter(amount__gt=1000))
+        self.assertEqual(summary, {'total_credit': 0, 'total_debit': 0, 'net': 0, 'count': 0})
+
+    def test_summary_grouped_by_fund_account(self):
+        """Summary: grouped by fund account in one query"""
+        with self.assertNumQueries(1):
+            rows = {row['fund_account']: row for row in get_summary(self.trx_list, group_by='fund_account')}
+        self.assertEqual(rows[self.bank.id]['net'], Decimal('60'))
+        self.assertEqual(rows[self.wallet.id]['net'], Decimal('-15'))
+
+    def test_summary_grouped_by_category(self):
+        """Summary: grouped by category"""
+        rows = {row['category']: row for row in get_summary(self.trx_list, group_by='category')}
+        self.assertEqual(rows[self.food.id]['count'], 3)
+        self.assertEqual(rows[self.travel.id]['total_debit'], Decimal('25'))
+
+    def test_summary_grouped_by_month(self):
+        """Summary: grouped by month, ordered by month"""
+        rows = get_summary(self.trx_list, group_by='month')
+        self.assertEqual([row['month'] for row in rows], [date(2025, 1, 1), date(2025, 2, 1)])
+        self.assertEqual([row['net'] for row in rows], [Decimal('60'), Decimal('-15')])
+
+    def test_summary_invalid_group_by_fails(self):
+        """Summary: unknown group by raises ValueError"""
+        with self.assertRaises(ValueError):
+            get_summary(self.trx_list, group_by='tags')
+
+    def test_report_save_uses_single_summary_query(self):
+        """Summary: Report pre_save computes both totals with one aggregate"""
+        report = Report(user=self.user, month=1, year=2025)
+        # summary aggregate + insert
+        with self.assertNumQueries(2):
+            report.save()
+        self.assertEqual((report.total_credit, report.total_debit), (Decimal('100'), Decimal('40')))
@@ -0,0 +1,191 @@
+from datetime import date
+from django.test import TestCase
+from django.core.cache import cache
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from app_expenses.models import Transaction, FundAccount, Category, Currency, Tag, TransactionType, DataVersion
+
+User = get_user_model()
+
+class TransactionListQueryBudgetTest(TestCase):
+    """
+    The list views must render a full page of transaction cards in a fixed number of queries:
+    session + user + data version + summary + page rows + tags prefetch (+ selected fund account / category).
+    """
+    def setUp(self):
+        self.user = User.objects.create(username="user1")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        self.fund_account = FundAccount.objects.create(user=self.user, name="Bank", currency=self.currency, balance=0)
+        self.category = Category.objects.create(user=self.user, name="Food")
+        self.tags = [Tag.objects.create(user=self.user, name=f"tag{i}") for i in range(3)]
+        for day in range(1, 31):
+            trx = Transaction.objects.create(
+                user=self.user,
+                category=self.category,
+                amount=10,
+                fund_account=self.fund_account,
+                date=date(2025, 1, day),
+                type=TransactionType.CREDIT
+            )
+            trx.tags.set(self.tags)
+        self.client.force_login(self.user)
+
+    def assert_page_renders_all_cards(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page_obj']), 25)
+        self.assertContains(response, "₹ 10.00", count=25)
+        self.assertContains(response, "tag2", count=25)
+
+    def test_transactions_query_budget(self):
+        """transactions: constant number of queries for a full page"""
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse('transactions'))
+        self.assert_page_renders_all_cards(response)
+
+    def test_transactions_by_fund_account_query_budget(self):
+        """transactions_by_fund_account: constant number of queries for a full page"""
+        with self.assertNumQueries(7):
+            response = self.client.get(reverse('transactions_by_fund_account', args=[self.fund_account.id]))
+        self.assert_page_renders_all_cards(response)
+
+    def test_transactions_by_category_query_budget(self):
+        """transactions_by_category: constant number of queries for a full page"""
+        with self.assertNumQueries(7):
+            response = self.client.get(reverse('transactions_by_category', args=[self.category.id]))
+        self.assert_page_renders_all_cards(response)
+
+    def test_next_page_query_budget(self):
+        """transactions: following the next cursor costs the same as the first page"""
+        first = self.client.get(reverse('transactions'))
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse('transactions'), {'cursor': first.context['page_obj'].next_cursor})
+        self.assertEqual(len(response.context['page_obj']), 5)
+
+
+class TransactionFormOptionsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="user1")
+        self.other_user = User.objects.create(username="user2")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        FundAccount.objects.create(user=self.user, name="Bank", currency=self.currency, balance=0)
+        FundAccount.objects.create(user=self.other_user, name="Other Bank", currency=self.currency, balance=0)
+        Category.objects.create(user=None, name="Predefined")
+        Category.objects.create(user=self.other_user, name="Other Food")
+        self.category = Category.objects.create(user=self.user, name="Food")
+        Tag.objects.create(user=self.other_user, name="other-tag")
+        self.client.force_login(self.user)
+
+    def option_names(self, response, name):
+        return [option['name'] for option in response.context[name]]
+
+    def test_form_lists_only_own_and_predefined_options(self):
+        """create_transaction: options are the user's rows plus the predefined ones"""
+        response = self.client.get(reverse('create_transaction'))
+        self.assertEqual(self.option_names(response, 'fund_account_list'), ["Bank"])
+        self.assertEqual(self.option_names(response, 'category_list'), ["Food", "Predefined"])
+        self.assertEqual(self.option_names(response, 'tag_list'), [])
+
+    def test_warm_form_reads_only_versions(self):
+        """create_transaction: a warm form costs session, user and one version query"""
+        self.client.get(reverse('create_transaction'))
+        with self.assertNumQueries(3):
+            self.client.get(reverse('create_transaction'))
+
+    def test_changes_invalidate_options(self):
+        """create_transaction: created, renamed and predefined rows show up on the next form"""
+        self.client.get(reverse('create_transaction'))
+        Tag(user=self.user, name="weekly").create_by(self.user)
+        self.category.name = "Groceries"
+        self.category.update_by(self.user)
+        Category.objects.create(user=None, name="Bills")
+        response = self.client.get(reverse('create_transaction'))
+        self.assertEqual(self.option_names(response, 'tag_list'), ["weekly"])
+        self.assertEqual(self.option_names(response, 'category_list'), ["Bills", "Groceries", "Predefined"])
+
+    def test_new_transaction_keeps_options_cached(self):
+        """create_transaction: saving a transaction does not invalidate the options"""
+        self.client.get(reverse('create_transaction'))
+        self.client.post(reverse('create_transaction'), {
+            'fund_account': FundAccount.objects.get(user=self.user).pk, 'amount': 10, 'date': '2025-01-05',
+            'type': TransactionType.CREDIT, 'category': self.category.pk, 'description': 'Salary',
+        })
+        self.assertTrue(Transaction.objects.filter(user=self.user).exists())
+        with self.assertNumQueries(3):
+            self.client.get(reverse('create_transaction'))
+
+    def test_update_form_marks_selected_options(self):
+        """update_transaction: the transaction's fund account, category and tags are selected"""
+        tag = Tag.objects.create(user=self.user, name="weekly")
+        trx = Transaction.objects.create(user=self.user, category=self.category, amount=10, fund_account=FundAccount.objects.get(user=self.user), date=date(2025, 1, 5), type=TransactionType.CREDIT)
+        trx.tags.set([tag])
+        response = self.client.get(reverse('update_transaction', args=[trx.pk]))
+        self.assertEqual(response.context['selected_tag_ids'], {tag.pk})
+        self.assertContains(response, f'value="{tag.pk}" checked')
+        self.assertContains(response, f'<option value="{self.category.pk}" selected>')
+
+
+class TransactionWriteQueryBudgetTest(TestCase):
+    """
+    Creating or updating a transaction costs a fixed number of queries, whatever the number of tags:
+    the fund account, category and tags are read once and carried through validation and save.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="user1")
+        self.other_user = User.objects.create(username="user2")
+        self.currency = Currency.objects.create(id="INR", symbol="₹", name="Indian Rupee")
+        self.fund_account = FundAccount.objects.create(user=self.user, name="Bank", currency=self.currency, balance=1000)
+        self.category = Category.objects.create(user=self.user, name="Food")
+        self.tags = [Tag.objects.create(user=self.user, name=f"tag{i}") for i in range(5)]
+        # an earlier transaction of the day, so its daily rollup row and the data version exist
+        self.trx = Transaction(user=self.user, category=self.category, amount=10, fund_account=self.fund_account, date=date(2025, 1, 5), type=TransactionType.DEBIT)
+        self.trx.create_by(self.user)
+        self.client.force_login(self.user)
+        self.client.get(reverse('create_transaction'))
+
+    def post_data(self, tags, amount=10):
+        return {
+            'fund_account': self.fund_account.pk, 'amount': amount, 'date': '2025-01-05', 'type': TransactionType.DEBIT,
+            'category': self.category.pk, 'description': 'Lunch', 'tags': [tag.pk for tag in tags],
+        }
+
+    def test_create_query_budget(self):
+        """create_transaction: constant number of queries for any number of tags"""
+        # session, user, options version, fund account, category, tags,
+        # savepoint, insert, report totals (marked dirty), daily rollup, data version,
+        # balance update + refresh, checkpoints, tag rows, release
+        for tags in (self.tags[:1], self.tags):
+            with self.subTest(tags=len(tags)), self.assertNumQueries(16):
+                response = self.client.post(reverse('create_transaction'), self.post_data(tags))
+            self.assertNotIn('errors', response.context)
+        self.assertEqual(Transaction.tags.through.objects.filter(tag__in=self.tags).count(), 6)
+
+    def test_update_query_budget(self):
+        """update_transaction: constant number of queries for any number of tags"""
+        # session, user, options version, savepoint (the view's transaction, a BEGIN outside tests),
+        # transaction locked with its fund account and category, tags,
+        # savepoint, update, report totals (marked dirty), daily rollup, data version,
+        # balance update + refresh, checkpoints, stale tag rows, tag rows, release, release
+        for tags, amount in ((self.tags, 20), (self.tags[:1], 30)):
+            with self.subTest(tags=len(tags)), self.assertNumQueries(18):
+                response = self.client.post(reverse('update_transaction', args=[self.trx.pk]), self.post_data(tags, amount=amount))
+            self.assertNotIn('errors', response.context)
+            self.assertEqual(set(self.trx.tags.values_list('id', flat=True)), {tag.pk for tag in tags})
+            self.assertEqual(response.context['selected_tag_ids'], {tag.pk for tag in tags})
+        self.fund_account.refresh_from_db()
+        self.assertEqual(self.fund_account.balance, 970)
+
+    def test_tags_bump_data_version_with_the_row(self):
+        """update_transaction: the row and its tags change the user's data version once"""
+        version, _ = DataVersion.objects.current(DataVersion.user_key(self.user.pk))
+        self.client.post(reverse('update_transaction', args=[self.trx.pk]), self.post_data(self.tags[:2]))
+        self.assertEqual(DataVersion.objects.current(DataVersion.user_key(self.user.pk))[0], version + 1)
+        self.assertEqual(set(self.trx.tags.all()), set(self.tags[:2]))
+
+    def test_other_users_tag_fails(self):
+        """create_transaction: a tag of another user is rejected"""
+        other_tag = Tag.objects.create(user=self.other_user, name="other-tag")
+        response = self.client.post(reverse('create_transaction'), self.post_data([other_tag]))
+        self.assertIn('tags', response.context['errors'].message_dict)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
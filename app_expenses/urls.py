@@ -19,9 +19,13 @@ urlpatterns = [
     path('update-transaction/<uuid:id>/', update_transaction, name="update_transaction"),
     path('reports/', report, name="report"),
     path('reports/update/<uuid:id>/', update_report, name="update_report"),
+    path('exports/', exports, name="exports"),
+    path('exports/<uuid:id>/status/', export_status, name="export_status"),
+    path('exports/<uuid:id>/download/', export_download, name="export_download"),
     # path('shortcuts/', shortcuts, name="shortcuts"),
     # path('loans/', loans, name="loans"),
     path('login/', login, name="login"),
+    path('login/throttle/', login_throttle_status, name="login_throttle_status"),
     path('logout/', logout, name="logout"),
     path('register/', register, name="register"),
     path('404-not-found/', not_found_404, name="404_not_found"),
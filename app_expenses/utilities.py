@@ -1,53 +1,79 @@
-import io
 import csv
-from .models import Currency, FundAccount, Category, Tag
+import hashlib
+import calendar
+from datetime import date
+from .models import FundAccount, Category, Tag, DataVersion, catalog, identity_map
+from .auth_backends import users_by_email
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.contrib import messages
+from django.views.decorators.http import condition
+from django.views.decorators.cache import cache_control
 
 def email_exists(email):
-    return get_user_model().objects.filter(email=email).exists()
+    return users_by_email(email).exists()
 
 def get_currency_list():
-    return Currency.objects.all()
+    return catalog.currency_list()
 
 def get_currency_by_id(id):
-    try:
-        return Currency.objects.get(id=id)
-    except Currency.DoesNotExist:
-        raise ValidationError({'currency': 'Currency ID: {id} is invalid!'})
-    except Exception as e:
-        raise ValidationError({'currency': str(e)})
+    currency = catalog.get_currency(id)
+    if currency is None:
+        raise ValidationError({'currency': f'Currency ID: {id} is invalid!'})
+    return currency
+
+FORM_OPTIONS_TIMEOUT = 60 * 60 * 24
 
-def get_fund_account_list():
-    return FundAccount.objects.all()
+def get_form_options(requested_user):
+    """
+    (id, name) options of the user's fund accounts, and of the user's plus the predefined categories and tags.
+    Cached under the user's options version and the catalog version, so a warm call costs only the version check
+    and any create, update or delete of one of these rows is seen right away, in every worker.
+    """
+    versions = DataVersion.objects.versions([DataVersion.options_key(requested_user.pk), DataVersion.CATALOG_KEY])
+    cache_key = "form_options:{}:{}:{}".format(requested_user.pk, *versions.values())
+    options = cache.get(cache_key)
+    if options is None:
+        owned_or_predefined = Q(user=requested_user) | Q(user=None)
+        options = {
+            'fund_accounts': list(FundAccount.objects.filter(user=requested_user).order_by('name').values('id', 'name')),
+            'categories': list(Category.objects.filter(owned_or_predefined).order_by('name').values('id', 'name')),
+            'tags': list(Tag.objects.filter(owned_or_predefined).order_by('name').values('id', 'name')),
+        }
+        cache.set(cache_key, options, FORM_OPTIONS_TIMEOUT)
+    return options
+
+def get_fund_account_list(requested_user):
+    return get_form_options(requested_user)['fund_accounts']
 
 def get_fund_account_by_id(id):
     try:
-        return FundAccount.objects.get(id=id)
+        return identity_map.get_by_pk(FundAccount, id)
     except FundAccount.DoesNotExist:
-        raise ValidationError({'fund_account': 'Fund Account ID: {id} is invalid!'})
+        raise ValidationError({'fund_account': f'Fund Account ID: {id} is invalid!'})
     except Exception as e:
         raise ValidationError({'fund_account': e})
 
-def get_category_list():
-    return Category.objects.all()
+def get_category_list(requested_user):
+    return get_form_options(requested_user)['categories']
 
 def get_category_by_id(id):
     try:
-        return Category.objects.get(id=id)
+        return identity_map.get_by_pk(Category, id)
     except Category.DoesNotExist:
-        raise ValidationError({'category': 'Category ID: {id} is invalid!'})
+        raise ValidationError({'category': f'Category ID: {id} is invalid!'})
     except Exception as e:
         raise ValidationError({'category': e})
 
-def get_tag_list():
-    return Tag.objects.all()
+def get_tag_list(requested_user):
+    return get_form_options(requested_user)['tags']
 
 def get_tag_by_id(id):
     try:
-        return Tag.objects.get(id=id)
+        return identity_map.get_by_pk(Tag, id)
     except Tag.DoesNotExist:
-        raise ValidationError({'tag': 'Tag ID: {id} is invalid!'})
+        raise ValidationError({'tag': f'Tag ID: {id} is invalid!'})
     except Exception as e:
         raise ValidationError({'tag': e})
     
@@ -56,16 +82,71 @@ def is_valid_for_report(month, year):
         return False
     return True
 
-def monthly_report_csv(filtered_trx_list):
-    csv_report_columns = ['id', 'amount', 'type', 'date', 'currency', 'fund_account_id', 'fund_account_name', 'category_id', 'category_name', 'description', 'tags']
-    buffer = io.StringIO()
-    if len(filtered_trx_list) > 0:
-        data = []
-        for trx in filtered_trx_list:
-            data_row = [trx.id, trx.amount, trx.type, trx.date, trx.fund_account.currency.id, trx.fund_account.id, trx.fund_account.name,
-                trx.category.id, trx.category.name, trx.description]
-            data.append(data_row)
-        writer = csv.writer(buffer, csv_report_columns)
-        writer.writerow(csv_report_columns)
-        writer.writerows(data)
-    return buffer.getvalue()
\ No newline at end of file
+def month_date_range(year, month):
+    # (first day, last day) of the month, for sargable date range filters
+    last_day = calendar.monthrange(year, month)[1]
+    return (date(year, month, 1), date(year, month, last_day))
+
+MONTHLY_REPORT_CSV_COLUMNS = ['id', 'amount', 'type', 'date', 'currency', 'fund_account_id', 'fund_account_name', 'category_id', 'category_name', 'description', 'tags']
+
+class _Echo:
+    # file-like object for csv.writer, hands every formatted line back instead of buffering it
+    def write(self, value):
+        return value
+
+def monthly_report_csv(filtered_trx_list, chunk_size=2000):
+    """
+    Yield the monthly report CSV line by line, for a StreamingHttpResponse.
+    Transactions are read in chunks with their fund account, category and tags
+    loaded per chunk, so memory and queries do not grow with the number of rows.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(MONTHLY_REPORT_CSV_COLUMNS)
+    trx_list = filtered_trx_list.select_related('fund_account', 'category').prefetch_related('tags')
+    for trx in trx_list.iterator(chunk_size=chunk_size):
+        fund_account, category = trx.fund_account, trx.category
+        yield writer.writerow([
+            trx.id, trx.amount, trx.type, trx.date,
+            fund_account.currency_id if fund_account else '',
+            fund_account.id if fund_account else '',
+            fund_account.name if fund_account else '',
+            category.id if category else '',
+            category.name if category else '',
+            trx.description,
+            # same separator the import command reads
+            '|'.join(tag.name for tag in trx.tags.all())
+        ])
+
+def get_user_data_version(request):
+    # read once per request, shared by the ETag and Last-Modified checks.
+    # The catalog is included, pages show currency symbols and predefined names
+    if not hasattr(request, '_data_version'):
+        request._data_version = DataVersion.objects.current_versions([DataVersion.user_key(request.user.pk), DataVersion.CATALOG_KEY])
+    return request._data_version
+
+def _can_answer_not_modified(request):
+    # pending messages are shown on the next rendered page, so that page is rendered again
+    return request.user.is_authenticated and not len(messages.get_messages(request))
+
+def user_data_etag(request, *args, **kwargs):
+    if not _can_answer_not_modified(request):
+        return None
+    versions, updated_at = get_user_data_version(request)
+    # the CSRF secret changes on login, forms of a cached page would be rejected after it
+    csrf_secret = request.META.get('CSRF_COOKIE', '')
+    version = versions[DataVersion.user_key(request.user.pk)]
+    return hashlib.md5(f"{request.user.pk}:{version}:{versions[DataVersion.CATALOG_KEY]}:{csrf_secret}".encode()).hexdigest()
+
+def user_data_last_modified(request, *args, **kwargs):
+    if not _can_answer_not_modified(request):
+        return None
+    return get_user_data_version(request)[1]
+
+def conditional_on_user_data(view):
+    """
+    Answer GET requests with '304 Not Modified' while the user's data and catalog versions are unchanged,
+    checked with one query and before the view runs. Responses carry ETag and Last-Modified
+    and must be revalidated by the browser.
+    """
+    view = condition(etag_func=user_data_etag, last_modified_func=user_data_last_modified)(view)
+    return cache_control(private=True, no_cache=True)(view)
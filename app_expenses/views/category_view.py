@@ -3,9 +3,11 @@ from django.core.exceptions import ValidationError
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from ..models import Category
+from ..utilities import conditional_on_user_data
 
 
 @login_required(login_url='login')
+@conditional_on_user_data
 def categories(request):
     categories_list = Category.get_for_user(requested_user=request.user)
     return render(request, 'category/index.html', {'categories_list': categories_list})
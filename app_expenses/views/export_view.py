@@ -0,0 +1,63 @@
+from django.shortcuts import render, redirect
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.core.exceptions import ValidationError, PermissionDenied
+from django.http import JsonResponse, FileResponse
+from django.urls import reverse
+from ..models import ExportJob, ExportStatus, ExportCompression
+from ..services import export_jobs
+
+
+def export_status_data(job):
+    data = {'id': str(job.pk), 'status': job.status, 'download_url': None, 'error': job.error}
+    if job.status == ExportStatus.DONE:
+        data['download_url'] = reverse('export_download', args=[job.pk])
+    return data
+
+@login_required(login_url='login')
+def exports(request):
+    context = {}
+    if request.POST:
+        try:
+            job = export_jobs.submit_export(
+                request.user,
+                request.POST.get('date_from'),
+                request.POST.get('date_to'),
+                request.POST.get('compression') or ExportCompression.NONE
+            )
+            if job.status == ExportStatus.DONE:
+                messages.success(request, 'This export is ready to download!!!')
+            else:
+                messages.success(request, 'Export started, it will be ready to download shortly!!!')
+            return redirect('exports')
+        except ValidationError as ve:
+            context['errors'] = ve
+        except Exception as e:
+            messages.error(request, str(e))
+    context['compression_choices'] = ExportCompression.choices
+    context['export_list'] = ExportJob.get_for_user(requested_user=request.user)
+    return render(request, 'export/index.html', context)
+
+@login_required(login_url='login')
+def export_status(request, id):
+    try:
+        job = ExportJob.get_for_user(requested_user=request.user, id=id)
+    except ExportJob.DoesNotExist:
+        return JsonResponse({'error': 'Export does not exist.'}, status=404)
+    except PermissionDenied as e:
+        return JsonResponse({'error': str(e)}, status=403)
+    return JsonResponse(export_status_data(job))
+
+@login_required(login_url='login')
+def export_download(request, id):
+    try:
+        job = ExportJob.get_for_user(requested_user=request.user, id=id)
+    except ExportJob.DoesNotExist:
+        return redirect('404_not_found')
+    except PermissionDenied:
+        return redirect('no_permission')
+    path = export_jobs.export_file_path(job)
+    if job.status != ExportStatus.DONE or not path.exists():
+        messages.error(request, 'This export is not available anymore, please export it again.')
+        return redirect('exports')
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=job.filename)
@@ -3,9 +3,10 @@ from django.core.exceptions import ValidationError
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from ..models import FundAccount
-from ..utilities import get_currency_by_id, get_currency_list
+from ..utilities import get_currency_by_id, get_currency_list, conditional_on_user_data
 
 @login_required(login_url='login')
+@conditional_on_user_data
 def fund_accounts(request):
     fund_accounts_list = FundAccount.get_for_user(requested_user=request.user)
     return render(request, 'fund_account/index.html', {'fund_accounts_list': fund_accounts_list})
@@ -43,7 +44,7 @@ def update_fund_account(request, id):
         }
         if request.POST:
             context['fund_account'].name = request.POST.get('name')
-            context['fund_account'].balance = request.POST.get('balance')
+            context['fund_account'].correct_balance(request.POST.get('balance'))
             context['fund_account'].currency = get_currency_by_id(request.POST.get('currency'))
             context['fund_account'] = context['fund_account'].update_by(requested_user=request.user)
             messages.success(request, 'Fund Account updated successfully!!!')
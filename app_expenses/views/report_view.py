@@ -2,36 +2,35 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.exceptions import ValidationError
-from django.http import HttpResponse
-from django.db.models import Sum
+from django.http import StreamingHttpResponse
 from datetime import date
 from ..models import Transaction, Report
-from ..utilities import is_valid_for_report, monthly_report_csv
+from ..utilities import is_valid_for_report, monthly_report_csv, month_date_range, conditional_on_user_data
 
 
 def get_csv(user, month, year):
     if not is_valid_for_report(month, year):
         raise ValidationError({'month': f'{month}-{year} is invalid month year'})
-    trx_list = Transaction.get_for_user(requested_user=user).filter(date__year=int(year), date__month=int(month))
+    trx_list = Transaction.get_for_user(requested_user=user).filter(date__range=month_date_range(int(year), int(month)))
     month = date(year=int(year), month=int(month), day=1).strftime("%b")
     FILENAME = month+year+"_transations.csv"
-    report_content = monthly_report_csv(trx_list)
-    csv_report = HttpResponse(content=report_content, content_type="text/csv")
+    csv_report = StreamingHttpResponse(monthly_report_csv(trx_list), content_type="text/csv")
     csv_report["Content-Disposition"] = (f'attachment; filename={FILENAME}')
     return csv_report, trx_list
 
 @login_required(login_url='login')
+@conditional_on_user_data
 def report(request):
     context = {}
-    if request.POST:
+    # a GET with 'month' downloads the CSV only, so it can be answered from the browser cache
+    if request.POST or request.GET.get('month'):
         try:
-            year, month = request.POST.get('month').split('-')
+            year, month = (request.POST.get('month') or request.GET.get('month')).split('-')
             csv_report, trx_list = get_csv(request.user, month, year)
 
             if request.POST.get('generate_report'):
-                total_credit_amount = trx_list.filter(type='credit').aggregate(total_credit_amount=Sum('amount'))['total_credit_amount']
-                total_debit_amount = trx_list.filter(type='credit').aggregate(total_debit_amount=Sum('amount'))['total_debit_amount']
-                report = Report(user=request.user, month=int(month), year=int(year), total_credit=total_credit_amount, total_debit=total_debit_amount)
+                # totals are computed once on insert, then kept current by transaction signals
+                report = Report(user=request.user, month=int(month), year=int(year))
                 report = report.create_by(requested_user=request.user)
             return csv_report
         except ValidationError as ve:
@@ -50,8 +49,7 @@ def update_report(request, id):
             year, month = request.POST.get('month').split('-')
             csv_report, trx_list = get_csv(request.user, month, year)
 
-            report.total_credit = trx_list.filter(type='credit').aggregate(total_credit_amount=Sum('amount'))['total_credit_amount']
-            report.total_debit = trx_list.filter(type='credit').aggregate(total_debit_amount=Sum('amount'))['total_debit_amount']
+            # totals are already current, only the CSV is regenerated
             report.is_dirty = False
             report = report.update_by(requested_user=request.user)
 
@@ -2,24 +2,25 @@ from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.exceptions import ValidationError
-from django.core.paginator import Paginator
+from django.db import transaction as db_transaction
 from ..models import Transaction, TransactionType, Tag
-from ..utilities import get_fund_account_list, get_category_list, get_tag_list, get_fund_account_by_id, get_category_by_id, get_tag_by_id
+from ..utilities import get_form_options, get_fund_account_by_id, get_category_by_id, get_tag_by_id, conditional_on_user_data
 from ..services import user_transactions
+from ..custom_paginators import KeysetPaginator
 
-def get_form_common_context():
+def get_form_common_context(requested_user):
+    options = get_form_options(requested_user)
     context = {
-        'fund_account_list': get_fund_account_list(),
-        'category_list': get_category_list(),
-        'tag_list': get_tag_list(),
+        'fund_account_list': options['fund_accounts'],
+        'category_list': options['categories'],
+        'tag_list': options['tags'],
         'trx_type': TransactionType.choices
     }
     return context
 
 def paginated_transaction_list(request, trx_list):
-    paginator = Paginator(trx_list, 25)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(trx_list, 25, with_total=bool(request.GET.get('total')))
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     return page_obj
 
 def form_proccessing(request):
@@ -31,7 +32,8 @@ def form_proccessing(request):
     data['tags'] = request.POST.getlist("tags")
 
     try:
-        valid_tags = Tag.objects.filter(id__in=data['tags'])
+        # own and predefined tags only, in one query
+        valid_tags = list(Tag.objects.for_user(request.user, include_predefined=True).filter(id__in=data['tags']))
     except Exception as e:
         raise ValidationError({'tags': e})
     if len(valid_tags) != len(data['tags']):
@@ -48,11 +50,12 @@ def form_proccessing(request):
     return (trx, valid_tags)
 
 @login_required(login_url='login')
+@conditional_on_user_data
 def transactions(request): 
     context = {}
     try:
         trx_list = user_transactions.get_all_transactions(requested_user=request.user)
-        context['total_credit'], context['total_debit'] = user_transactions.get_credit_debit_summary(trx_list)
+        context['total_credit'], context['total_debit'] = user_transactions.get_credit_debit_summary(request.user)
         context['page_obj'] = paginated_transaction_list(request, trx_list)
     except ValidationError as ve:
         context['errors'] = ve
@@ -61,6 +64,7 @@ def transactions(request):
     return render(request, 'transaction/index.html', context)
 
 @login_required(login_url='login')
+@conditional_on_user_data
 def transactions_by_fund_account(request, fund_acct_id):
     context = {}
     try:
@@ -77,6 +81,7 @@ def transactions_by_fund_account(request, fund_acct_id):
     return render(request, 'transaction/index.html', context)
 
 @login_required(login_url='login')
+@conditional_on_user_data
 def transactions_by_category(request, category_id):
     context = {}
     try:
@@ -95,12 +100,12 @@ def transactions_by_category(request, category_id):
 @login_required(login_url='login')
 def create_transaction(request):
     try:
-        context = get_form_common_context()
+        context = get_form_common_context(request.user)
         if request.POST:
             trx, valid_tags = form_proccessing(request)
             trx.user = request.user
+            trx.set_tags(valid_tags)
             trx = trx.create_by(requested_user=request.user)
-            trx.tags.set(valid_tags)
             messages.success(request, 'Transaction added successfully!!!')
     except ValidationError as ve:
         context['errors'] = ve
@@ -111,19 +116,25 @@ def create_transaction(request):
 @login_required(login_url='login')
 def update_transaction(request, id):
     try:
-        context = get_form_common_context()
-        context['trx'] = user_transactions.get_transaction_by_id(requested_user=request.user, id=id)
+        context = get_form_common_context(request.user)
         if request.POST:
-            trx, valid_tags = form_proccessing(request)
-            context['trx'].amount = trx.amount
-            context['trx'].fund_account = trx.fund_account
-            context['trx'].category = trx.category
-            context['trx'].date = trx.date
-            context['trx'].type = trx.type
-            context['trx'].description = trx.description
-            context['trx'] = context['trx'].update_by(requested_user=request.user)
-            context['trx'].tags.set(valid_tags)
+            with db_transaction.atomic():
+                # read locked with its fund account and category, the save does not read it again
+                context['trx'] = user_transactions.get_transaction_by_id(requested_user=request.user, trx_id=id, for_update=True)
+                trx, valid_tags = form_proccessing(request)
+                context['trx'].amount = trx.amount
+                context['trx'].fund_account = trx.fund_account
+                context['trx'].category = trx.category
+                context['trx'].date = trx.date
+                context['trx'].type = trx.type
+                context['trx'].description = trx.description
+                context['trx'].set_tags(valid_tags)
+                context['trx'] = context['trx'].update_by(requested_user=request.user)
+            context['selected_tag_ids'] = {tag.pk for tag in valid_tags}
             messages.success(request, 'Transaction updated successfully!!!')
+        else:
+            context['trx'] = user_transactions.get_transaction_by_id(requested_user=request.user, trx_id=id)
+            context['selected_tag_ids'] = set(context['trx'].tags.values_list('id', flat=True))
     except ValidationError as ve:
         context['errors'] = ve
     except Exception as e:
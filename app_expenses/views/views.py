@@ -1,7 +1,10 @@
 from django.shortcuts import render, redirect
+from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
 from ..services import user_login_service, user_register_service
+from ..services.auth_services.login_throttle import login_throttle
 from ..model_forms import MyLoginForm, MyUserRegisterForm
 
 
@@ -28,6 +31,7 @@ def login(request):
             if success:
                 messages.success(request, msg)
                 return redirect('dashboard')
+            messages.error(request, msg)
         else:
             if form.errors:
                 for field_errors in form.errors.as_data.get('__all__', []):
@@ -35,6 +39,11 @@ def login(request):
                         messages.error(request, err)
     return render(request, 'authentication/login.html', context={'form': form})
 
+@staff_member_required
+def login_throttle_status(request):
+    # this worker's counters, for monitoring
+    return JsonResponse(login_throttle.counters())
+
 @login_required(login_url='login')
 def logout(request):
     return render(request, 'authentication/logout.html')
@@ -39,6 +39,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'app_expenses.middleware.IdentityMapMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -81,6 +82,21 @@ DATABASES = {
     }
 }
 
+# login by email, by username for the admin
+AUTHENTICATION_BACKENDS = [
+    'app_expenses.auth_backends.EmailBackend',
+    'app_expenses.auth_backends.CachedUserBackend',
+]
+
+# 'db', 'cached_db' (read from SESSION_CACHE_ALIAS, written through to the database) or 'signed_cookies' (kept by the client)
+SESSION_STORE = os.getenv('SESSION_STORE', 'db')
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_STORE}'
+
+# cache alias request.user is loaded from (seconds), unset reads it from the database.
+# Like cached_db sessions it needs a cache shared by all workers, a logout or password change is missed otherwise
+AUTH_USER_CACHE = os.getenv('AUTH_USER_CACHE') or None
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 60))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -115,6 +131,27 @@ STATICFILES_DIRS = [
 STATIC_ROOT = BASE_DIR / 'static_root'
 STATIC_ROOT.mkdir(exist_ok=True, parents=True)
 
+# background transaction exports (app_expenses.services.export_services)
+EXPORT_ROOT = Path(os.getenv('EXPORT_ROOT', BASE_DIR / 'exports'))
+EXPORT_WORKERS = int(os.getenv('EXPORT_WORKERS', 2))
+# seconds a pending or running export may take before an identical request replaces it (its worker is assumed gone)
+EXPORT_JOB_TIMEOUT = int(os.getenv('EXPORT_JOB_TIMEOUT', 1800))
+
+# seconds a worker serves currencies and predefined categories/tags from memory before checking the catalog version
+CATALOG_CHECK_INTERVAL = float(os.getenv('CATALOG_CHECK_INTERVAL', 5))
+
+# login attempts allowed per client IP and per email: a burst, then a rate per minute (checked before hashing)
+LOGIN_THROTTLE_IP_BURST = int(os.getenv('LOGIN_THROTTLE_IP_BURST', 20))
+LOGIN_THROTTLE_IP_RATE = float(os.getenv('LOGIN_THROTTLE_IP_RATE', 10))
+LOGIN_THROTTLE_EMAIL_BURST = int(os.getenv('LOGIN_THROTTLE_EMAIL_BURST', 5))
+LOGIN_THROTTLE_EMAIL_RATE = float(os.getenv('LOGIN_THROTTLE_EMAIL_RATE', 5))
+# cache alias shared by all workers (e.g. redis), unset to keep the counts in each worker's memory
+LOGIN_THROTTLE_CACHE = os.getenv('LOGIN_THROTTLE_CACHE') or None
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv('LOGIN_THROTTLE_MAX_KEYS', 10000))
+# proxies in front of the app that append to X-Forwarded-For (e.g. 1 behind Render's load balancer),
+# the client IP is the address the outermost of them appended. 0 (default) uses REMOTE_ADDR and ignores the header
+TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', 0))
+
 if not DEBUG:
     STORAGES = {"staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"}}
 